@@ -20,6 +20,7 @@ from datagen.api.requests.director import DataRequestDirector
 from datagen.config import settings
 from datagen.core.tasks import TaskContainer
 from datagen.core.tasks.task_runner import TaskRunner
+from datagen.dev import json_backends
 from datagen.dev.logging import get_logger
 
 logger = get_logger(__name__)
@@ -49,7 +50,7 @@ class DatagenAPI:
 
     def load(self, path: Union[Path, str]) -> GenerationRequest:
         path = DatagenAPI._get_request_json_path(path=path)
-        request_dict = json.loads(path.read_text())
+        request_dict = json_backends.load_file(path)
         return DataRequest(**request_dict) if "datapoints" in request_dict else SequenceRequest(**request_dict)
 
     def generate(
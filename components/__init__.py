@@ -2,4 +2,4 @@ from datagen.components.datasource import DataSource
 from datagen.components.datasource import SourcesRepository
 from datagen.components.camera import Camera
 from datagen.components.scene import Scene
-from datagen.components.dataset import Dataset
+from datagen.components.dataset import Dataset, DatasetView
@@ -0,0 +1,361 @@
+import dataclasses
+import json
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from datagen.components.datapoint import DataPoint
+from datagen.components.scene import Scene
+from datagen.dev import __version__
+from datagen.modalities.descriptors import TextualModalityDescriptor
+from datagen.modalities.sidecar import SidecarEncodingError, decode, encode
+from datagen.modalities.textual.common.flatten import SCALAR_TYPES, flatten, iter_children
+
+DEFAULT_EXPORTED_MODALITIES = (
+    "camera_metadata",
+    "lights_metadata",
+    "actor_metadata",
+    "keypoints",
+    "_center_of_geometry",
+)
+
+DEFAULT_EXPORT_WORKERS = 8
+
+ARRAY_STORE_VERSION = 2
+
+STORE_META_FILE_NAME = "store.json"
+
+STORE_INDEX_FILE_NAME = "index.npz"
+
+STORE_CHUNKS_DIR_NAME = "chunks"
+
+# The datapoints' columns of the store's index, besides their modalities' files.
+INDEX_COLUMNS = ("scene", "camera", "frame_num", "image_name")
+
+# A chunk's modalities, grouped by their structure: {modality: [(files, factory name, template, paths, columns)]}
+ChunkGroups = Dict[str, List[Tuple[np.ndarray, str, Any, np.ndarray, List[np.ndarray]]]]
+
+# (chunk, modality, group, row) of a modality file within the store
+Location = Tuple[int, str, int, int]
+
+
+class ArrayStoreError(ValueError):
+    ...
+
+
+@dataclass
+class ArrayStoreExporter:
+    """
+    Exports the textual modalities of whole datasets to a columnar array store.
+    Every scene is exported to a chunk of its own, in parallel. Within a chunk, the modality files of the same
+    structure (e.g. the keypoints of all of the scene's frames) form a group, whose arrays & scalars are stacked
+    into one column per path (e.g. "face/dense/coords_2d"), so a column can be read for the whole dataset at once.
+    Each modality file is exported once, even if shared by several datapoints (e.g. the scene's actor_metadata.json).
+    """
+
+    modalities: Sequence[str] = DEFAULT_EXPORTED_MODALITIES
+    workers: int = DEFAULT_EXPORT_WORKERS
+
+    def export(self, scenes: Sequence[Scene], path: Union[str, Path]) -> "ArrayStore":
+        path = Path(path)
+        if path.joinpath(STORE_META_FILE_NAME).exists():
+            raise ArrayStoreError(f"An array store already exists in '{path}'")
+        path.joinpath(STORE_CHUNKS_DIR_NAME).mkdir(parents=True, exist_ok=True)
+        chunks = [(chunk_idx, scene) for chunk_idx, scene in enumerate(scenes)]
+        with ThreadPoolExecutor(max_workers=max(min(self.workers, len(chunks)), 1)) as executor:
+            chunks_index = list(executor.map(lambda chunk: self._export_scene(path, *chunk), chunks))
+        self._write_index(path, [row for chunk_index in chunks_index for row in chunk_index])
+        # Written last, an interrupted export does not leave a readable store behind.
+        with open(path.joinpath(STORE_META_FILE_NAME), "w") as f:
+            json.dump(
+                {
+                    "version": ARRAY_STORE_VERSION,
+                    "sdk_version": __version__,
+                    "modalities": list(self.modalities),
+                    "chunks": len(chunks),
+                },
+                f,
+            )
+        return ArrayStore(path)
+
+    def _export_scene(self, path: Path, chunk_idx: int, scene: Scene) -> List[dict]:
+        groups: Dict[str, Dict[Hashable, dict]] = {modality: {} for modality in self.modalities}
+        exported_files = set()
+        index = []
+        for dp in scene:
+            row = {
+                "scene": str(dp.scene_path),
+                "camera": dp.camera,
+                "frame_num": dp.frame_num,
+                "image_name": dp.visible_spectrum_image_name,
+            }
+            for modality in self.modalities:
+                modality_file_path = self._export_modality(dp, modality, groups[modality], exported_files)
+                row[_get_file_column(modality)] = modality_file_path or ""
+            index.append(row)
+        self._write_chunk(path, chunk_idx, groups)
+        return index
+
+    @staticmethod
+    def _export_modality(
+        dp: DataPoint, modality: str, groups: Dict[Hashable, dict], exported_files: set
+    ) -> Optional[str]:
+        descriptor = getattr(type(dp), modality, None)
+        if not isinstance(descriptor, TextualModalityDescriptor):
+            return None
+        # Read first, since some modalities' files are only created when they are first read (pre-processes).
+        value = getattr(dp, modality)
+        modality_file_path = descriptor.get_file_path(dp)
+        if value is None or modality_file_path is None or (modality, modality_file_path) in exported_files:
+            return modality_file_path
+        exported_files.add((modality, modality_file_path))
+        leaves = flatten(value)
+        signature = tuple((leaf_path, _get_dtype_key(leaf), leaf.shape) for leaf_path, leaf in leaves)
+        group = groups.get(signature)
+        if group is None:
+            template_arrays = {}
+            try:
+                template = encode(strip(value), template_arrays)
+            except SidecarEncodingError as e:
+                raise ArrayStoreError(f"'{modality}' of '{modality_file_path}' cannot be exported: {e}") from e
+            group = groups[signature] = {
+                "factory": descriptor.get_modality(dp).factory_name,
+                "template": template,
+                "template_arrays": template_arrays,
+                "paths": [leaf_path for leaf_path, _ in leaves],
+                "files": [],
+                "columns": [[] for _ in leaves],
+            }
+        group["files"].append(modality_file_path)
+        for column, (_, leaf) in zip(group["columns"], leaves):
+            column.append(leaf)
+        return modality_file_path
+
+    @staticmethod
+    def _write_chunk(path: Path, chunk_idx: int, groups: Dict[str, Dict[Hashable, dict]]) -> None:
+        arrays = {}
+        for modality, modality_groups in groups.items():
+            for group_idx, group in enumerate(modality_groups.values()):
+                prefix = f"{modality}/{group_idx}"
+                arrays[f"{prefix}/files"] = np.array(group["files"])
+                arrays[f"{prefix}/factory"] = np.array(group["factory"])
+                # Stored as JSON rather than pickled, so that reading a store never runs code.
+                arrays[f"{prefix}/template"] = np.array(json.dumps(group["template"]))
+                for array_key, array in group["template_arrays"].items():
+                    arrays[f"{prefix}/template_arrays/{array_key}"] = array
+                arrays[f"{prefix}/paths"] = np.array(group["paths"], dtype=str)
+                for leaf_idx, column in enumerate(group["columns"]):
+                    arrays[f"{prefix}/columns/{leaf_idx}"] = np.stack(column)
+        chunk_path = _get_chunk_path(path, chunk_idx)
+        temp_path = chunk_path.with_suffix(".tmp.npz")
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, chunk_path)
+
+    def _write_index(self, path: Path, index: List[dict]) -> None:
+        columns = list(INDEX_COLUMNS) + [_get_file_column(modality) for modality in self.modalities]
+        arrays = {column: np.array([row[column] for row in index]) for column in columns}
+        arrays["frame_num"] = arrays["frame_num"].astype(int)
+        np.savez(path.joinpath(STORE_INDEX_FILE_NAME), **arrays)
+
+
+class ArrayStore:
+    """
+    Reads an array store exported by ArrayStoreExporter, either as whole columns or as textual modalities.
+    Plug it into a dataset with DatasetConfig(array_store=...) in order for its datapoints to read their textual
+    modalities from the store instead of parsing their files. Files missing from the store are parsed as usual.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        meta_path = self.path.joinpath(STORE_META_FILE_NAME)
+        if not meta_path.exists():
+            raise ArrayStoreError(f"No array store found in '{self.path}'")
+        with open(meta_path) as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != ARRAY_STORE_VERSION:
+            raise ArrayStoreError(f"Unsupported array store version: {self.meta['version']}")
+        self.modalities: List[str] = self.meta["modalities"]
+        with np.load(self.path.joinpath(STORE_INDEX_FILE_NAME), allow_pickle=False) as index:
+            self.index: Dict[str, np.ndarray] = {column: index[column] for column in index.files}
+        self._chunks: Dict[int, ChunkGroups] = {}
+        self._locations: Dict[Tuple[str, str], Location] = {}
+        self._factories_locations: Dict[Tuple[str, str], Location] = {}
+        self._lock = threading.Lock()
+        for chunk_idx in range(self.meta["chunks"]):
+            self._locate(chunk_idx)
+
+    def __len__(self):
+        """
+        :returns the number of exported datapoints
+        """
+        return len(self.index["scene"])
+
+    def read(self, modality_factory_name: str, modality_file_path: str) -> Optional[Any]:
+        """
+        :returns the textual modality parsed from the given file, or None if the file is not in the store.
+        Its arrays are views of the store's columns.
+        """
+        location = self._factories_locations.get((modality_factory_name, str(modality_file_path)))
+        return None if location is None else self._read(*location)
+
+    def get_paths(self, modality: str) -> List[str]:
+        """
+        :returns the paths of the given modality's columns, e.g. "face/dense/coords_2d"
+        """
+        paths = {}
+        for chunk_idx in range(self.meta["chunks"]):
+            for _, _, _, group_paths, _ in self._get_chunk(chunk_idx).get(modality, []):
+                paths.update(dict.fromkeys(group_paths.tolist()))
+        return list(paths)
+
+    def get_column(self, modality: str, path: str) -> np.ndarray:
+        """
+        :param modality: The modality's name, e.g. "keypoints"
+        :param path: The column's path within the modality, e.g. "face/dense/coords_2d"
+        :returns the column's values of all of the exported datapoints, stacked in the store's index order
+        """
+        files = self.index.get(_get_file_column(modality))
+        if files is None:
+            raise ArrayStoreError(f"'{modality}' was not exported, exported modalities: {self.modalities}")
+        groups_columns: Dict[Tuple[int, int], np.ndarray] = {}
+        values = []
+        for file_path in files.tolist():
+            location = self._locations.get((modality, file_path))
+            if location is None:
+                raise ArrayStoreError(f"'{modality}' of a datapoint is missing from the store")
+            chunk_idx, _, group_idx, row = location
+            column = groups_columns.get((chunk_idx, group_idx))
+            if column is None:
+                _, _, _, group_paths, columns = self._get_chunk(chunk_idx)[modality][group_idx]
+                if path not in group_paths:
+                    raise ArrayStoreError(f"'{modality}' of '{file_path}' has no '{path}' column")
+                column = groups_columns[(chunk_idx, group_idx)] = columns[group_paths.tolist().index(path)]
+            values.append(column[row])
+        try:
+            return np.stack(values) if values else np.empty(0)
+        except ValueError as e:
+            raise ArrayStoreError(f"'{modality}/{path}' values are of different shapes: {e}") from e
+
+    def _read(self, chunk_idx: int, modality: str, group_idx: int, row: int) -> Any:
+        _, _, template, _, columns = self._get_chunk(chunk_idx)[modality][group_idx]
+        return rebuild(template, (column[row, ...] for column in columns))
+
+    def _locate(self, chunk_idx: int) -> None:
+        with np.load(_get_chunk_path(self.path, chunk_idx), allow_pickle=False) as chunk:
+            for key in chunk.files:
+                modality, group_idx, name = key.rsplit("/", 2)
+                if name != "files":
+                    continue
+                factory_name = str(chunk[f"{modality}/{group_idx}/factory"])
+                for row, file_path in enumerate(chunk[key].tolist()):
+                    location = (chunk_idx, modality, int(group_idx), row)
+                    self._locations[(modality, file_path)] = location
+                    self._factories_locations[(factory_name, file_path)] = location
+
+    def _get_chunk(self, chunk_idx: int) -> ChunkGroups:
+        chunk_groups = self._chunks.get(chunk_idx)
+        if chunk_groups is None:
+            with self._lock:
+                chunk_groups = self._chunks.get(chunk_idx)
+                if chunk_groups is None:
+                    chunk_groups = self._chunks[chunk_idx] = _load_chunk(_get_chunk_path(self.path, chunk_idx))
+        return chunk_groups
+
+
+def _load_chunk(chunk_path: Path) -> ChunkGroups:
+    chunk_groups = defaultdict(list)
+    with np.load(chunk_path, allow_pickle=False) as chunk:
+        arrays = {key: chunk[key] for key in chunk.files}
+    groups_keys = sorted(
+        {tuple(key.split("/", 2)[:2]) for key in arrays}, key=lambda modality_group: int(modality_group[1])
+    )
+    for modality, group_idx in groups_keys:
+        prefix = f"{modality}/{group_idx}"
+        paths = arrays[f"{prefix}/paths"]
+        template_prefix = f"{prefix}/template_arrays/"
+        template_arrays = {
+            key[len(template_prefix) :]: array for key, array in arrays.items() if key.startswith(template_prefix)
+        }
+        try:
+            template = decode(json.loads(str(arrays[f"{prefix}/template"])), template_arrays)
+        except SidecarEncodingError as e:
+            raise ArrayStoreError(f"Unsupported '{modality}' template in '{chunk_path}': {e}") from e
+        chunk_groups[modality].append(
+            (
+                arrays[f"{prefix}/files"],
+                str(arrays[f"{prefix}/factory"]),
+                template,
+                paths,
+                [arrays[f"{prefix}/columns/{leaf_idx}"] for leaf_idx in range(len(paths))],
+            )
+        )
+    return dict(chunk_groups)
+
+
+def strip(modality: Any) -> Any:
+    """
+    :returns a template of the modality, whose arrays are replaced by empty ones, to be rebuilt with its leaves
+    """
+    leaves = (
+        np.empty(0, dtype=leaf.dtype) if isinstance(value, np.ndarray) else leaf
+        for value, leaf in _iter_leaves(modality)
+    )
+    return rebuild(modality, leaves)
+
+
+def rebuild(template: Any, leaves: Iterable[np.ndarray]) -> Any:
+    """
+    The inverse of flatten - a copy of the template with the given leaves (in flatten's order).
+    """
+    return _rebuild(template, iter(leaves))
+
+
+def _rebuild(template: Any, leaves: Iterator[np.ndarray]) -> Any:
+    if isinstance(template, np.ndarray):
+        return next(leaves)
+    if isinstance(template, SCALAR_TYPES):
+        return type(template)(next(leaves).item())
+    if isinstance(template, (list, tuple)):
+        return type(template)(_rebuild(item, leaves) for item in template)
+    if isinstance(template, dict):
+        return {key: _rebuild(value, leaves) for key, value in template.items()}
+    if dataclasses.is_dataclass(template):
+        # Set rather than passed to __init__, so that fields which aren't init arguments are rebuilt as well.
+        modality = object.__new__(type(template))
+        for field_ in dataclasses.fields(template):
+            modality.__dict__[field_.name] = _rebuild(template.__dict__[field_.name], leaves)
+        if hasattr(modality, "__post_init__"):
+            # e.g. the named segments' indexes
+            modality.__post_init__()
+        return modality
+    return template
+
+
+def _iter_leaves(modality: Any) -> Iterator[Tuple[Any, np.ndarray]]:
+    if isinstance(modality, np.ndarray):
+        yield modality, modality
+    elif isinstance(modality, SCALAR_TYPES):
+        yield modality, np.asarray(modality)
+    else:
+        for _, value in iter_children(modality):
+            yield from _iter_leaves(value)
+
+
+def _get_dtype_key(leaf: np.ndarray) -> str:
+    # Strings of different lengths are stacked into the same column.
+    return leaf.dtype.kind if leaf.dtype.kind in "SU" else leaf.dtype.str
+
+
+def _get_file_column(modality: str) -> str:
+    return f"file:{modality}"
+
+
+def _get_chunk_path(path: Path, chunk_idx: int) -> Path:
+    return path.joinpath(STORE_CHUNKS_DIR_NAME, f"{chunk_idx:06d}.npz")
+
@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+
+from datagen.components.datapoint import DataPoint
+from datagen.imaging.base import ImageBufferMismatchError
+from datagen.modalities.descriptors import TextualModalityDescriptor, VisualModalityDescriptor
+from datagen.modalities.textual.common.flatten import flatten
+
+DEFAULT_LOAD_WORKERS = 8
+
+
+class BatchLoadError(ValueError):
+    ...
+
+
+@dataclass
+class BatchLoader:
+    """
+    Loads modalities of several datapoints into stacked arrays, one per visual modality and one per
+    array of each textual modality (e.g. every keypoints segment's coordinates).
+    Visual modalities are decoded concurrently, straight into a single preallocated buffer per modality.
+    """
+
+    workers: int = DEFAULT_LOAD_WORKERS
+
+    def load(
+        self, datapoints: List[DataPoint], modalities: Sequence[str]
+    ) -> Dict[str, Union[np.ndarray, Dict[str, np.ndarray]]]:
+        """
+        :param datapoints: The batch's datapoints
+        :param modalities: Names of the modalities to load, e.g. ("visible_spectrum", "depth", "keypoints")
+        :returns for every visual modality - a (B,H,W,C) array (or (B,H,W) for single channel images),
+        for every textual modality - a mapping of its arrays' paths (e.g. "face/dense/coords_2d")
+        to the stacked arrays.
+        """
+        if not datapoints:
+            raise BatchLoadError("Cannot load an empty batch")
+        with ThreadPoolExecutor(max_workers=max(self.workers, 1)) as executor:
+            return {modality: self._load_modality(executor, datapoints, modality) for modality in modalities}
+
+    def _load_modality(self, executor: ThreadPoolExecutor, datapoints: List[DataPoint], modality: str) -> Any:
+        descriptor = getattr(type(datapoints[0]), modality, None)
+        if isinstance(descriptor, VisualModalityDescriptor):
+            return self._load_visual_modality(executor, datapoints, modality)
+        elif isinstance(descriptor, TextualModalityDescriptor):
+            return self._load_textual_modality(executor, datapoints, modality)
+        else:
+            raise BatchLoadError(f"'{modality}' is not a modality of {type(datapoints[0]).__module__} datapoints")
+
+    def _load_visual_modality(
+        self, executor: ThreadPoolExecutor, datapoints: List[DataPoint], modality: str
+    ) -> np.ndarray:
+        # The first image determines the batch's buffer shape & dtype, the others are decoded straight into it.
+        first_img = _read_modality(datapoints[0], modality)
+        batch = np.empty((len(datapoints), *first_img.shape), dtype=first_img.dtype)
+        batch[0] = first_img
+        descriptor: VisualModalityDescriptor = getattr(type(datapoints[0]), modality)
+
+        def read_into_batch(idx: int) -> None:
+            try:
+                img = descriptor.read_into(datapoints[idx], batch[idx])
+            except ImageBufferMismatchError as e:
+                raise BatchLoadError(f"Cannot stack '{modality}' of datapoint {datapoints[idx]}: {e}") from e
+            if img is None:
+                raise BatchLoadError(f"'{modality}' not found for datapoint {datapoints[idx]}")
+
+        list(executor.map(read_into_batch, range(1, len(datapoints))))
+        return batch
+
+    @staticmethod
+    def _load_textual_modality(
+        executor: ThreadPoolExecutor, datapoints: List[DataPoint], modality: str
+    ) -> Dict[str, np.ndarray]:
+        # The same paths as the modality's columns in array stores, which hold its scalars as well.
+        datapoints_arrays = list(
+            executor.map(lambda dp: dict(flatten(_read_modality(dp, modality), scalars=False)), datapoints)
+        )
+        paths = datapoints_arrays[0].keys()
+        if any(dp_arrays.keys() != paths for dp_arrays in datapoints_arrays):
+            raise BatchLoadError(f"Cannot stack '{modality}' of datapoints with different segments")
+        try:
+            return {path: np.stack([dp_arrays[path] for dp_arrays in datapoints_arrays]) for path in paths}
+        except ValueError as e:
+            raise BatchLoadError(f"Cannot stack '{modality}': {e}") from e
+
+
+def _read_modality(dp: DataPoint, modality: str) -> Any:
+    value = getattr(dp, modality)
+    if value is None:
+        raise BatchLoadError(f"'{modality}' not found for datapoint {dp}")
+    return value
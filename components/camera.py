@@ -1,11 +1,10 @@
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
-
-from dependency_injector.wiring import inject, Provide
+from typing import List, Optional
 
 from datagen.components.datapoint import DataPoint
-from datagen.components.datapoint import DatapointsRepository
+from datagen.components.datapoint import DatapointsRepository, DatapointRecord
+from datagen.components.scanner import SceneLayout
 from datagen.components.sequence import Sequence
 
 
@@ -13,14 +12,34 @@ from datagen.components.sequence import Sequence
 class Camera:
     name: str
     scene_path: Path
-    datapoints: List[DataPoint] = field(init=False, repr=False)
+    repo: DatapointsRepository = field(repr=False)
+    records: Optional[List[DatapointRecord]] = field(default=None, repr=False)
+    scene_layout: Optional[SceneLayout] = field(default=None, repr=False)
+    lazy: bool = field(default=False, repr=False)
+    _datapoints: Optional[List[DataPoint]] = field(default=None, init=False, repr=False)
 
     def __post_init__(self):
-        self.datapoints = self._init_datapoints()
+        if not self.lazy:
+            self._datapoints = self._init_datapoints()
+
+    @property
+    def datapoints(self) -> List[DataPoint]:
+        if self._datapoints is None:
+            self._datapoints = self._init_datapoints()
+        return self._datapoints
+
+    def get_records(self) -> List[DatapointRecord]:
+        if self.records is None:
+            self.records = self._read_records()
+        return self.records
+
+    def _read_records(self) -> List[DatapointRecord]:
+        return self.repo.get_records(
+            scene_path=self.scene_path, camera_name=self.name, scene_layout=self.scene_layout
+        )
 
-    @inject
-    def _init_datapoints(self, repo: DatapointsRepository = Provide["repo"]) -> List[DataPoint]:
-        return repo.get_datapoints(scene_path=self.scene_path, camera_name=self.name)
+    def _init_datapoints(self) -> List[DataPoint]:
+        return self.repo.get_datapoints(scene_path=self.scene_path, camera_name=self.name, records=self.get_records())
 
     def get_sequence(self, **env_attributes) -> Sequence:
         """"
@@ -40,4 +59,4 @@ class Camera:
         return self.datapoints[key]
 
     def __len__(self):
-        return len(self.datapoints)
+        return len(self.get_records())
@@ -1,5 +1,5 @@
 from .entity.base import DataPoint
 from .entity.hic import DataPoint as HICDataPoint
 from .entity.identities import DataPoint as IdentitiesDataPoint
-from .repo import DatapointsRepository
+from .repo import DatapointsRepository, DatapointRecord
 from .container import DatapointsContainer
@@ -1,5 +1,8 @@
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
 
 from datagen import modalities
 from datagen.modalities.containers import DatapointModalitiesContainer
@@ -20,7 +23,7 @@ class DataPoint:
 
     @property
     def camera_path(self) -> Path:
-        if self.frame_path.exists():
+        if self.modalities_container.listings().exists(self.frame_path):
             return self.frame_path.joinpath(self.camera)
         else:
             return self.scene_path.joinpath(self.camera)
@@ -41,6 +44,17 @@ class DataPoint:
     def semantic_segmentation_metadata(self) -> modalities.TextualModality:
         return modalities.TextualModality(factory_name="segmentation", file_name="semantic_segmentation_metadata.json")
 
+    def semantic_label_map(self, segments: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, Dict[int, str]]:
+        """
+        Converts the semantic segmentation image to training labels.
+        :param segments: Paths of the segments to label, e.g. ["human/head", "background"], in order for their
+        class ids to be the same across datapoints. Defaults to all of the segmentation metadata's colored segments.
+        :returns a (H,W) uint16 map of class ids (0 for unlabeled pixels) & the class ids' segments' paths
+        """
+        labels = self.semantic_segmentation_metadata.get_labels(segments)
+        channel_order = type(self).semantic_segmentation.get_channel_order(self)
+        return labels.apply(self.semantic_segmentation, channel_order), labels.segments
+
     @modalities.visual_modality
     def infrared_spectrum(self) -> modalities.VisualModality:
         return modalities.VisualModality("infrared_spectrum.png", convert_to_uint8=True)
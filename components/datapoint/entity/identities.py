@@ -1,12 +1,18 @@
-import json
 import os
 from dataclasses import dataclass
-from pathlib import Path
-from typing import ClassVar
+from typing import ClassVar, Optional
+
+import numpy as np
 
 from datagen import modalities
 from datagen.api.assets import HumanDatapoint
 from datagen.components.datapoint.entity import base
+from datagen.modalities.textual.identities.containers import (
+    V1_DENSE_KEYPOINTS_FILE_NAME,
+    V1_STANDARD_KEYPOINTS_FILE_NAME,
+)
+
+KEYPOINTS_FILE_NAME = os.path.join("key_points", "all_key_points.json")
 
 
 @dataclass
@@ -25,12 +31,36 @@ class DataPoint(base.DataPoint):
     def face_bounding_box(self) -> modalities.TextualModality:
         return modalities.TextualModality(factory_name="face_bounding_box", file_name="face_bounding_box.json")
 
+    def face_crop(self, modality: str = "visible_spectrum", reduction: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Reads only the face bounding box's region of a visual modality, e.g. for face models.
+        Crops are converted & cached on their own (see DatasetConfig.visual_cache_size), rather than as full frames.
+        :param modality: The visual modality's name, e.g. "visible_spectrum" or "depth"
+        :param reduction: 1, 2, 4 or 8 - the factor the crop is scaled down by, defaults to the modality's
+        """
+        box = self.face_bounding_box
+        # The bounding box includes its max pixels.
+        roi = (box.min_x, box.min_y, box.max_x + 1, box.max_y + 1)
+        return getattr(type(self), modality).read(self, reduction=reduction, roi=roi)
+
     @modalities.textual_modality
     def keypoints(self) -> modalities.TextualModality:
-        return modalities.TextualModality(
-            factory_name="keypoints",
-            file_name=os.path.join("key_points", "all_key_points.json"),
-            pre_process=CreateV1AllKeypointsFile(self),
+        if self._has_v1_keypoints():
+            return modalities.TextualModality(
+                factory_name="keypoints_v1",
+                file_name=V1_STANDARD_KEYPOINTS_FILE_NAME,
+                extra_file_names=(V1_DENSE_KEYPOINTS_FILE_NAME,),
+            )
+        return modalities.TextualModality(factory_name="keypoints", file_name=KEYPOINTS_FILE_NAME)
+
+    def _has_v1_keypoints(self) -> bool:
+        """
+        V1 keypoints come in two separate files: standard_keypoints.json & dense_keypoints.json,
+        which are merged in memory when read, instead of the single key_points/all_key_points.json of v2.
+        """
+        listings = self.modalities_container.listings()
+        return not listings.exists(self.camera_path.joinpath(KEYPOINTS_FILE_NAME)) and listings.exists(
+            self.camera_path.joinpath(V1_STANDARD_KEYPOINTS_FILE_NAME)
         )
 
     @modalities.textual_modality
@@ -43,35 +73,3 @@ class DataPoint(base.DataPoint):
     @property
     def datapoint_request(self) -> HumanDatapoint:
         return self._datapoint_request.datapoints[0]
-
-
-class CreateV1AllKeypointsFile(modalities.ModalityPreProcess):
-    """
-    V1 keypoints content comes in two separate files: standard_keypoints.json & dense_keypoints.json
-    which have to be consolidated into a single json since the SDK assumes that the content of
-    any given modality will always appear in a single json file. We consolidate both files into
-    '<DATAPOINT_CAMERA_PATH>/key_points/all_key_points.json', To match v2 keypoints json file location.
-    """
-
-    def __init__(self, dp: DataPoint):
-        self._dp = dp
-
-    def __call__(self):
-        is_v1_keypoints = not self._get_all_keypoints_file().exists()
-        if is_v1_keypoints:
-            self._create_all_keypoints_file_for_v1()
-
-    def _create_all_keypoints_file_for_v1(self):
-        self._get_all_keypoints_file().parent.mkdir()
-        self._get_all_keypoints_file().write_text(self._get_keypoints_v1_file_content())
-
-    def _get_keypoints_v1_file_content(self) -> str:
-        standard_keypoints = json.loads(self._dp.camera_path.joinpath("standard_keypoints.json").read_text())
-        dense_keypoints = json.loads(self._dp.camera_path.joinpath("dense_keypoints.json").read_text())
-        keypoints_v1_file_content = json.dumps(
-            {"standard": standard_keypoints, "dense": dense_keypoints}, indent=4, sort_keys=True
-        )
-        return keypoints_v1_file_content
-
-    def _get_all_keypoints_file(self) -> Path:
-        return self._dp.camera_path.joinpath("key_points", "all_key_points.json")
@@ -1,62 +1,73 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Iterable
+from typing import List, Iterable, Optional
 
 from dependency_injector import containers
-from dependency_injector.wiring import inject
 
 from datagen.components.datapoint import DataPoint
+from datagen.components.scanner import SceneLayout, scan_scene
 
-IDENTITIES_SCENE_FRAMES_RANGE = range(1)
+
+@dataclass
+class DatapointRecord:
+    """
+    Everything needed in order to create a datapoint without touching the dataset's files.
+    """
+
+    camera: str
+    frame_num: int
+    image_name: str
+    environment: dict
 
 
-@inject
 @dataclass
 class DatapointsRepository:
     datapoints_container: containers.DeclarativeContainer
 
-    def get_datapoints(self, scene_path: Path, camera_name: str) -> List[DataPoint]:
-        datapoints = []
-        for frame_num in self._get_frames_range(scene_path):
-            for environment in self._get_datapoints_environments(scene_path, camera_name, frame_num):
-                datapoints.append(
-                    self.datapoints_container.factory(
-                        scene_path=scene_path,
+    def get_datapoints(
+        self, scene_path: Path, camera_name: str, records: Optional[List[DatapointRecord]] = None
+    ) -> List[DataPoint]:
+        if records is None:
+            records = self.get_records(scene_path, camera_name)
+        return [
+            self.datapoints_container.factory(
+                scene_path=scene_path,
+                camera=camera_name,
+                frame_num=record.frame_num,
+                visible_spectrum_image_name=record.image_name,
+            )
+            for record in records
+        ]
+
+    def get_records(
+        self, scene_path: Path, camera_name: str, scene_layout: Optional[SceneLayout] = None
+    ) -> List[DatapointRecord]:
+        if scene_layout is None:
+            scene_layout = scan_scene(scene_path)
+        records = []
+        for frame_num in scene_layout.frames:
+            for environment in self._get_datapoints_environments(scene_layout, camera_name, frame_num):
+                records.append(
+                    DatapointRecord(
                         camera=camera_name,
                         frame_num=frame_num,
-                        visible_spectrum_image_name=environment.image_name,
+                        image_name=environment.image_name,
+                        environment=dict(vars(environment)),
                     )
                 )
-        return datapoints
-
-    def _get_frames_range(self, scene_path: Path) -> range:
-        if self._is_hic_scene(scene_path):
-            return self._get_hic_scene_frames_range(scene_path)
-        else:
-            return IDENTITIES_SCENE_FRAMES_RANGE
+        return records
 
-    @staticmethod
-    def _get_hic_scene_frames_range(scene_path: Path) -> range:
-        frames_dirs = list(filter(lambda item: item.name.isnumeric(), scene_path.joinpath("frames").iterdir()))
-        frames_num = len(frames_dirs)
-        return range(1, frames_num + 1)
+    def invalidate_listings(self, path: Optional[Path] = None) -> None:
+        """
+        Forgets the cached directory listings the datapoints' modalities files are looked up in.
+        :param path: A directory to forget the listings under, all listings are forgotten if not given.
+        """
+        self.datapoints_container.modalities().listings().invalidate(path)
 
     def _get_datapoints_environments(
-        self, scene_path: Path, camera_name: str, frame_num: int
+        self, scene_layout: SceneLayout, camera_name: str, frame_num: int
     ) -> Iterable["Environment"]:
+        environments_file_path = scene_layout.get_frame_path(frame_num).joinpath(camera_name, "environment.json")
         return self.datapoints_container.modalities().read_textual_modality(
-            modality_factory_name="environments",
-            modality_file_path=self._get_environments_modality_file_path(scene_path, camera_name, frame_num),
+            modality_factory_name="environments", modality_file_path=str(environments_file_path)
         )
-
-    def _get_environments_modality_file_path(self, scene_path: Path, camera_name: str, frame_num: int) -> str:
-        if self._is_hic_scene(scene_path):
-            base_path = scene_path.joinpath("frames", str(frame_num).zfill(3))
-        else:
-            base_path = scene_path
-        return str(base_path.joinpath(camera_name, "environment.json"))
-
-    @staticmethod
-    def _is_hic_scene(scene_path: Path) -> bool:
-        frames_path = scene_path.joinpath("frames")
-        return frames_path.exists() and frames_path.is_dir()
@@ -1,18 +1,59 @@
+import operator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import field, dataclass
-from typing import List, Iterator, Optional
+from typing import Dict, List, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from dependency_injector import providers
 
-from datagen import components
 from datagen.components.datapoint import DataPoint
 from datagen.components.datapoint import DatapointsContainer
 from datagen.components import Scene
 from datagen.components import DataSource
 from datagen.components import SourcesRepository
+from datagen.components.array_store import (
+    DEFAULT_EXPORT_WORKERS,
+    DEFAULT_EXPORTED_MODALITIES,
+    ArrayStore,
+    ArrayStoreExporter,
+)
+from datagen.components.batch import DEFAULT_LOAD_WORKERS, BatchLoader
+from datagen.components.index import DatapointsIndex
+from datagen.components.prefetch import DEFAULT_PREFETCH, DEFAULT_PREFETCH_WORKERS, LoadedDatapoint, Prefetcher
+from datagen.components.manifest import DEFAULT_CACHE_DIR
+from datagen.components.offsets import CumulativeOffsets
+from datagen.components.scanner import DEFAULT_SCAN_WORKERS, SourceScanner
+from datagen.imaging.base import ChannelOrder, ImageDType, check_reduction
+from datagen.imaging.auto import AUTO_IMAGING_LIBRARY, sample_image_files, select_imaging_library
+from datagen.modalities.cache import CacheStats, LRUCache, estimate_size
+from datagen.modalities.sidecar import SidecarCache
 
 
 @dataclass
 class DatasetConfig:
+    # "opencv", "pillow", "openexr" or "auto" - the fastest installed one on a sample of the dataset's images.
     imaging_library: str = "opencv"
+    # "rgb" or "bgr" - the order of the visual modalities' color channels. BGR skips reordering OpenCV's decoded ones.
+    channel_order: str = ChannelOrder.RGB.value
+    # By visual modality name, "native", "uint8", "float16" or "float32" (see ImageDType) - e.g. {"depth": "float16"}.
+    visual_dtypes: Dict[str, str] = field(default_factory=dict)
+    # By visual modality name, the factor it's scaled down by while decoded - 1, 2, 4 or 8, e.g. {"depth": 2}.
+    visual_reductions: Dict[str, int] = field(default_factory=dict)
     environment: Optional[str] = None
+    use_manifest: bool = True
+    cache_dir: str = DEFAULT_CACHE_DIR
+    lazy: bool = False
+    scan_workers: int = DEFAULT_SCAN_WORKERS
+    # Budget in bytes of the decoded visual modalities cache, 0 disables it.
+    visual_cache_size: int = 0
+    # Limits of the parsed textual modalities cache, either can be None (unlimited). Set either to 0 to disable it.
+    # Values are only sized (by walking their objects) once textual_cache_size limits the cache.
+    textual_cache_size: Optional[int] = None
+    textual_cache_entries: Optional[int] = None
+    # Store parsed textual modalities under cache_dir, so that later runs don't parse them again.
+    use_sidecars: bool = False
+    # Path of an array store (see Dataset.export) to read the textual modalities from, instead of their files.
+    array_store: Optional[str] = None
 
     @property
     def override_environment(self) -> bool:
@@ -24,58 +65,315 @@ class Dataset:
     sources_repo: SourcesRepository = field(repr=False)
     config: DatasetConfig
     scenes: List[Scene] = field(default_factory=list, repr=False)
+    # The dataset holds a single shard of its sources' scenes, see shard(by="scene").
+    num_shards: int = field(default=1, repr=False)
+    shard_index: int = field(default=0, repr=False)
+    _offsets: Optional[CumulativeOffsets] = field(default=None, init=False, repr=False)
+    _index: Optional[DatapointsIndex] = field(default=None, init=False, repr=False)
+    _sources: List[DataSource] = field(default_factory=list, init=False, repr=False)
+    _visual_cache: Optional[LRUCache] = field(default=None, init=False, repr=False)
+    _textual_cache: Optional[LRUCache] = field(default=None, init=False, repr=False)
+    _textual_sidecars: Optional[SidecarCache] = field(default=None, init=False, repr=False)
+    _array_store: Optional[ArrayStore] = field(default=None, init=False, repr=False)
+    _imaging_library: Optional[str] = field(default=None, init=False, repr=False)
 
     def __post_init__(self):
+        _check_shard(self.num_shards, self.shard_index)
+        self._init_caches()
+        self._sources = list(self.sources_repo.get_all())
+        self._init_imaging_library()
         self._init_sources()
 
+    def _init_caches(self) -> None:
+        if self.config.visual_cache_size > 0:
+            self._visual_cache = LRUCache(max_size=self.config.visual_cache_size, sizeof=lambda img: img.nbytes)
+        if self.config.textual_cache_size != 0 and self.config.textual_cache_entries != 0:
+            self._textual_cache = LRUCache(
+                max_size=self.config.textual_cache_size,
+                max_entries=self.config.textual_cache_entries,
+                sizeof=estimate_size,
+            )
+        if self.config.use_sidecars:
+            self._textual_sidecars = SidecarCache(cache_dir=self.config.cache_dir)
+        if self.config.array_store is not None:
+            self._array_store = ArrayStore(self.config.array_store)
+
+    def _init_imaging_library(self) -> None:
+        self._imaging_library = self.config.imaging_library
+        if self._imaging_library == AUTO_IMAGING_LIBRARY:
+            self._imaging_library = select_imaging_library(sample_image_files(source.path for source in self._sources))
+
     def _init_sources(self) -> None:
-        for source in self.sources_repo.get_all():
-            self._init(source)
+        with ThreadPoolExecutor(max_workers=max(len(self._sources), 1)) as executor:
+            for source_scenes in executor.map(self._init, self._sources, self._get_sources_scenes_slices()):
+                self.scenes.extend(source_scenes)
 
-    def _init(self, source: DataSource) -> None:
-        self._init_datapoints_container(source)
-        self.scenes.extend(source.init_scenes())
+    def _init(self, source: DataSource, scenes_slice: slice) -> List[Scene]:
+        datapoints_container = self._create_datapoints_container(source)
+        return source.init_scenes(repo=datapoints_container.repo(), lazy=self.config.lazy, scenes_slice=scenes_slice)
 
-    def _init_datapoints_container(self, source: DataSource) -> None:
+    def _get_sources_scenes_slices(self) -> List[slice]:
+        """
+        :returns the scenes of each source within the dataset's shard, by the sources' scenes listings alone.
+        """
+        if self.num_shards == 1:
+            return [slice(None)] * len(self._sources)
+        scenes_counts = [source.count_scenes() for source in self._sources]
+        start, stop = _get_shard_bounds(sum(scenes_counts), self.num_shards, self.shard_index)
+        scenes_slices = []
+        for source_offset, scenes_count in zip(np.cumsum([0] + scenes_counts), scenes_counts):
+            source_start = min(max(start - source_offset, 0), scenes_count)
+            scenes_slices.append(slice(source_start, max(min(stop - source_offset, scenes_count), source_start)))
+        return scenes_slices
+
+    def _create_datapoints_container(self, source: DataSource) -> DatapointsContainer:
+        """
+        Each source gets its own container, so that its datapoints are created by its own environment's factory.
+        """
         datapoints_container = DatapointsContainer(
             config={
                 "environment": self.config.environment if self.config.override_environment else source.environment,
-                "imaging_library": self.config.imaging_library
+                "imaging_library": self._imaging_library,
+                "channel_order": ChannelOrder(self.config.channel_order).value,
+                "visual_dtypes": {name: ImageDType(dtype).value for name, dtype in self.config.visual_dtypes.items()},
+                "visual_reductions": self._get_visual_reductions(),
             }
         )
-        datapoints_container.wire(packages=[components])
+        # The caches are shared by all sources, so that their budgets are per dataset.
+        datapoints_container.modalities.visual_cache.override(providers.Object(self._visual_cache))
+        datapoints_container.modalities.textual_cache.override(providers.Object(self._textual_cache))
+        datapoints_container.modalities.textual_sidecars.override(providers.Object(self._textual_sidecars))
+        datapoints_container.modalities.array_store.override(providers.Object(self._array_store))
+        return datapoints_container
+
+    def _get_visual_reductions(self) -> Dict[str, int]:
+        for reduction in self.config.visual_reductions.values():
+            check_reduction(reduction)
+        return dict(self.config.visual_reductions)
+
+    def get_cache_stats(self) -> Dict[str, CacheStats]:
+        """
+        :returns the hits, misses, evictions and sizes of the dataset's enabled modalities caches.
+        """
+        return {name: cache.stats for name, cache in self._get_caches().items()}
+
+    def clear_caches(self) -> None:
+        for cache in self._get_caches().values():
+            cache.clear()
+
+    def _get_caches(self) -> Dict[str, LRUCache]:
+        caches = {"visual": self._visual_cache, "textual": self._textual_cache}
+        return {name: cache for name, cache in caches.items() if cache is not None}
+
+    def refresh(self) -> List[Scene]:
+        """
+        Picks up scenes, cameras and frames which were added to the dataset's sources since it was loaded,
+        and drops the removed ones, without re-scanning the scenes which were not modified.
+        New scenes are appended after the existing ones, so the indices of the existing scenes' datapoints
+        are kept as long as no scene before them was modified or removed.
+        Shards do not track their sources, refreshing them has no effect.
+        :returns the new scenes
+        """
+        if not self._sources or self.num_shards > 1:
+            return []
+        with ThreadPoolExecutor(max_workers=len(self._sources)) as executor:
+            new_scenes = [
+                scene for source_scenes in executor.map(DataSource.refresh, self._sources) for scene in source_scenes
+            ]
+        current_scenes = {id(scene) for source in self._sources for scene in source.get_scenes()}
+        self.scenes = [scene for scene in self.scenes if id(scene) in current_scenes] + new_scenes
+        self._offsets, self._index = None, None
+        return new_scenes
+
+    def export(
+        self,
+        path: str,
+        modalities: Sequence[str] = DEFAULT_EXPORTED_MODALITIES,
+        workers: int = DEFAULT_EXPORT_WORKERS,
+    ) -> ArrayStore:
+        """
+        Exports the dataset's textual modalities to a columnar array store, one chunk per scene, in parallel.
+        Load the dataset with DatasetConfig(array_store=path) in order to read them from the store afterwards.
+        :param path: A directory to create the store in
+        :param modalities: Names of the textual modalities to export, ones the datapoints don't have are skipped
+        :param workers: Number of scenes exported concurrently
+        :returns the exported store, e.g. for reading whole columns - get_column("keypoints", "face/dense/coords_2d")
+        """
+        return ArrayStoreExporter(modalities=modalities, workers=workers).export(self.scenes, path)
 
     def __iter__(self) -> Iterator[DataPoint]:
         for scene in self.scenes:
             for datapoint in scene:
                 yield datapoint
 
+    def iter(
+        self,
+        prefetch: int = DEFAULT_PREFETCH,
+        modalities: Sequence[str] = ("visible_spectrum",),
+        workers: int = DEFAULT_PREFETCH_WORKERS,
+    ) -> Iterator[LoadedDatapoint]:
+        """
+        Iterates the dataset while reading the next datapoints' modalities in the background.
+        :param prefetch: Maximal number of datapoints read ahead of the one being consumed, 0 reads synchronously
+        :param modalities: Names of the modalities to read, e.g. ("visible_spectrum", "depth", "keypoints")
+        :param workers: Number of threads reading the modalities
+        :returns an iterator of (datapoint, {modality name: modality}) pairs, in the dataset's order
+        """
+        return Prefetcher(prefetch=prefetch, workers=workers).iter(self, modalities)
+
     def __getitem__(self, key):
-        if isinstance(key, int):
-            return self._get_single_datapoint(key)
-        elif isinstance(key, slice):
+        if isinstance(key, slice):
             return self._get_multiple_datapoints(key)
+        else:
+            return self._get_single_datapoint(operator.index(key))
 
     def _get_single_datapoint(self, idx: int) -> DataPoint:
-        idx = idx % len(self)
+        if idx < 0:
+            idx += len(self)
         if not 0 <= idx < len(self):
             raise IndexError("Datapoint index exceeded dataset's size")
-        [datapoint] = self._get_datapoints(start=idx, stop=idx + 1)
-        return datapoint
+        scene_idx, scene_datapoint_idx = self._get_offsets().locate(idx)
+        return self.scenes[scene_idx][scene_datapoint_idx]
 
     def _get_multiple_datapoints(self, key: slice) -> List[DataPoint]:
-        start = key.start if key.start is not None else 0
-        stop = key.stop % len(self) if key.stop is not None else len(self) - 1
-        if not 0 <= start < stop < len(self):
-            raise IndexError("Datapoints indexes exceeded dataset's size")
-        return self._get_datapoints(start, stop)
-
-    def _get_datapoints(self, start: int, stop: int) -> List[DataPoint]:
-        datapoints = []
-        for idx, datapoint in enumerate(self):
-            if start <= idx < stop:
-                datapoints.append(datapoint)
-        return datapoints
+        return [self._get_single_datapoint(idx) for idx in range(*key.indices(len(self)))]
+
+    def _get_offsets(self) -> CumulativeOffsets:
+        if self._offsets is None:
+            self._scan_scenes()
+            self._offsets = CumulativeOffsets(len(scene) for scene in self.scenes)
+        return self._offsets
+
+    def _scan_scenes(self) -> None:
+        # Lazy scenes are scanned once their datapoints are first counted or indexed - concurrently rather than
+        # one by one. Scenes loaded from the manifest hold their records already.
+        unscanned_scenes = [scene for scene in self.scenes if scene.records is None]
+        SourceScanner(workers=self.config.scan_workers).map(Scene.get_records, unscanned_scenes)
 
     def __len__(self):
-        return sum(len(scene) for scene in self.scenes)
+        return len(self._get_offsets())
+
+    def load_batch(
+        self,
+        indices: Sequence[int],
+        modalities: Sequence[str] = ("visible_spectrum",),
+        workers: int = DEFAULT_LOAD_WORKERS,
+    ) -> Dict[str, Union[np.ndarray, Dict[str, np.ndarray]]]:
+        """
+        Loads the modalities of several datapoints into stacked arrays, concurrently.
+        :param indices: The datapoints' indices in the dataset
+        :param modalities: Names of the modalities to load, e.g. ("visible_spectrum", "depth", "keypoints")
+        :param workers: Number of threads decoding the modalities
+        :returns for every visual modality - a (B,H,W,C) array, for every textual modality - a mapping of its
+        arrays' paths (e.g. "face/dense/coords_2d") to the stacked arrays.
+        """
+        datapoints = [self[int(idx)] for idx in indices]
+        return BatchLoader(workers=workers).load(datapoints, modalities)
+
+    def filter(self, **attributes) -> "DatasetView":
+        """
+        Selects datapoints without reading any of their modalities.
+        :param attributes: Values to match - "scene", "camera", "frame_num", "image_name", any environment attribute
+        (e.g. time_of_day="day") or an actor identity label ("identity_id", "age", "ethnicity", "gender").
+        A list (or tuple/set) of values matches any of them.
+        :returns a view of the datapoints matching all of the given attributes
+        """
+        return DatasetView(dataset=self, indices=self._get_index().filter(**attributes))
+
+    def query(self, expr: str) -> "DatasetView":
+        """
+        :param expr: A pandas query expression over the datapoints' scene, camera, frame_num, image_name
+        and environment attributes, e.g. "camera == 'camera_1' and time_of_day in ['day', 'night']".
+        :returns a view of the datapoints matching the query
+        """
+        return DatasetView(dataset=self, indices=self._get_index().query(expr))
+
+    def shard(self, num_shards: int, shard_index: int, by: str = "scene") -> Union["Dataset", "DatasetView"]:
+        """
+        Deterministically splits the dataset into contiguous, evenly sized shards, e.g. for distributed workers.
+        Workers should rather load their shards in the first place - Datagen.load(..., num_shards, shard_index),
+        which only lists the sources' scenes and doesn't scan or validate the other shards' scenes at all.
+        :param num_shards: Total number of shards
+        :param shard_index: Index of the requested shard, in range [0, num_shards)
+        :param by: "scene" - Split the scenes between the shards. Returns a dataset of the shard's scenes,
+                   loaded from the dataset's sources as Datagen.load(..., num_shards, shard_index) does.
+                   "datapoint" - Split the datapoints between the shards. Returns a view of the shard's datapoints,
+                   which requires counting the datapoints of all scenes.
+        """
+        _check_shard(num_shards, shard_index)
+        if by == "scene":
+            if self.num_shards > 1:
+                raise ValueError("The dataset is a shard already, load its sources with the requested shard instead")
+            return Dataset(
+                sources_repo=self.sources_repo, config=self.config, num_shards=num_shards, shard_index=shard_index
+            )
+        elif by == "datapoint":
+            start, stop = _get_shard_bounds(len(self), num_shards, shard_index)
+            return DatasetView(dataset=self, indices=np.arange(start, stop))
+        else:
+            raise ValueError(f"Unsupported shard unit: '{by}', use either 'scene' or 'datapoint'")
+
+    def _get_index(self) -> DatapointsIndex:
+        if self._index is None:
+            self._scan_scenes()
+            self._index = DatapointsIndex.from_scenes(self.scenes)
+        return self._index
+
+
+def _check_shard(num_shards: int, shard_index: int) -> None:
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"Shard index {shard_index} out of range for {num_shards} shards")
+
+
+def _get_shard_bounds(size: int, num_shards: int, shard_index: int) -> Tuple[int, int]:
+    return size * shard_index // num_shards, size * (shard_index + 1) // num_shards
+
+
+@dataclass
+class DatasetView:
+    """
+    A subset of a dataset's datapoints, which are only created once accessed.
+    """
+
+    dataset: Dataset = field(repr=False)
+    indices: np.ndarray = field(repr=False)
+
+    def __iter__(self) -> Iterator[DataPoint]:
+        for idx in self.indices:
+            yield self.dataset[int(idx)]
+
+    def iter(
+        self,
+        prefetch: int = DEFAULT_PREFETCH,
+        modalities: Sequence[str] = ("visible_spectrum",),
+        workers: int = DEFAULT_PREFETCH_WORKERS,
+    ) -> Iterator[LoadedDatapoint]:
+        return Prefetcher(prefetch=prefetch, workers=workers).iter(self, modalities)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return DatasetView(dataset=self.dataset, indices=self.indices[key])
+        return self.dataset[int(self.indices[operator.index(key)])]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def load_batch(
+        self,
+        indices: Sequence[int],
+        modalities: Sequence[str] = ("visible_spectrum",),
+        workers: int = DEFAULT_LOAD_WORKERS,
+    ) -> Dict[str, Union[np.ndarray, Dict[str, np.ndarray]]]:
+        """
+        :param indices: The datapoints' indices in the view
+        """
+        return self.dataset.load_batch(self.indices[np.asarray(indices, dtype=int)], modalities, workers)
+
+    def filter(self, **attributes) -> "DatasetView":
+        return self._intersect(self.dataset.filter(**attributes))
+
+    def query(self, expr: str) -> "DatasetView":
+        return self._intersect(self.dataset.query(expr))
+
+    def _intersect(self, view: "DatasetView") -> "DatasetView":
+        return DatasetView(dataset=self.dataset, indices=np.intersect1d(self.indices, view.indices))
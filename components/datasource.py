@@ -1,12 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Iterator, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from datagen.components.datapoint import DatapointsRepository
+from datagen.components.manifest import SceneEntry, SourceManifest, get_scene_fingerprint
+from datagen.components.scanner import DEFAULT_SCAN_WORKERS, SourceScanner, is_hic_scene, list_scenes
 from datagen.components.scene import Scene
 
-# Older datasets scenes are named "environment_XXXXX".
-SCENE_FOLDER_NAME_PATTERNS = ["scene_*", "environment_*", "datapoint_*"]
-
 
 class CorruptedSourceError(ValueError):
     ...
@@ -15,30 +16,154 @@ class CorruptedSourceError(ValueError):
 @dataclass
 class DataSource:
     path: Path
+    manifest: Optional[SourceManifest] = field(default=None, repr=False)
+    scanner: SourceScanner = field(default_factory=SourceScanner, repr=False)
+    _scenes_paths: Optional[List[Path]] = field(default=None, init=False, repr=False)
+    _scenes: Dict[str, Tuple[Scene, SceneEntry]] = field(default_factory=dict, init=False, repr=False)
+    _repo: Optional[DatapointsRepository] = field(default=None, init=False, repr=False)
+    _lazy: bool = field(default=False, init=False, repr=False)
 
     @property
     def environment(self) -> str:
         return "hic" if self._is_hic_datasource() else "identities"
 
-    def init_scenes(self) -> List[Scene]:
-        scenes = [Scene(path=path_) for path_ in sorted(self.path.iterdir()) if self._is_path_to_scene(path_)]
-        if len(scenes) == 0:
+    def init_scenes(
+        self, repo: DatapointsRepository, lazy: bool = False, scenes_slice: slice = slice(None)
+    ) -> List[Scene]:
+        """
+        :param repo: The repository creating the source's datapoints
+        :param lazy: If True, the scenes' cameras and datapoints are only created once they're accessed.
+        :param scenes_slice: The (sorted) scenes to init, e.g. a shard's. The others are neither scanned nor validated.
+        """
+        scenes_paths = self._get_scenes_paths()
+        if len(scenes_paths) == 0:
             raise CorruptedSourceError(f"Corrupted source: {str(self.path)}")
+        self._repo, self._lazy = repo, lazy
+        if self.manifest is not None:
+            removed_scenes = set(self.manifest.entries).difference(path_.name for path_ in scenes_paths)
+            self.manifest.update([], removed_scenes)
+        return self._init_scenes(scenes_paths[scenes_slice])
+
+    def count_scenes(self) -> int:
+        """
+        :returns the number of the source's scenes, listed but not scanned
+        """
+        return len(self._get_scenes_paths())
+
+    def refresh(self) -> List[Scene]:
+        """
+        Picks up scenes which were added to the source since it was last listed, and drops the removed ones.
+        Already scanned scenes which were modified (cameras or frames added or removed) are rescanned.
+        The source's cached directory listings are forgotten, so that new modalities files are found as well.
+        :returns the new scenes
+        """
+        self._scenes_paths = None
+        self._repo.invalidate_listings(self.path)
+        scenes_names = {path_.name for path_ in self._get_scenes_paths()}
+        removed_scenes = set(self._scenes).difference(scenes_names)
+        for scene_name in removed_scenes:
+            del self._scenes[scene_name]
+        if self.manifest is not None and removed_scenes:
+            self.manifest.update([], removed_scenes)
+        new_scenes_paths = [path_ for path_ in self._get_scenes_paths() if path_.name not in self._scenes]
+        scanned_scenes = [(scene, entry) for scene, entry in self._scenes.values() if scene.records is not None]
+        is_modified = self.scanner.map(
+            lambda scene_entry: not scene_entry[1].matches(scene_entry[0].path), scanned_scenes
+        )
+        self.scanner.map(
+            lambda scene_entry: self._refresh_scene(*scene_entry),
+            [scene_entry for scene_entry, modified in zip(scanned_scenes, is_modified) if modified],
+        )
+        return self._init_scenes(new_scenes_paths)
+
+    def get_scenes(self) -> List[Scene]:
+        """
+        :returns the source's current scenes, in the order they were listed
+        """
+        return [scene for scene, _ in self._scenes.values()]
+
+    def _refresh_scene(self, scene: Scene, entry: SceneEntry) -> None:
+        # Taken before the scan and stored after it, so that a change made while scanning is picked up next time.
+        fingerprint = get_scene_fingerprint(scene.path)
+        scene.refresh()
+        entry.fingerprint = fingerprint
+        self._on_scene_scanned(entry, scene)
+
+    def _init_scenes(self, scenes_paths: List[Path]) -> List[Scene]:
+        known_entries = self.manifest.entries if self.manifest is not None else {}
+        is_up_to_date = self.scanner.map(
+            lambda path_: path_.name in known_entries and known_entries[path_.name].matches(path_), scenes_paths
+        )
+        outdated_scenes_paths = [path_ for path_, up_to_date in zip(scenes_paths, is_up_to_date) if not up_to_date]
+        outdated_entries = self.scanner.map(self._create_entry, outdated_scenes_paths)
+        outdated_scenes = iter(zip(self._scan_scenes(outdated_entries), outdated_entries))
+        scenes = []
+        for scene_path, up_to_date in zip(scenes_paths, is_up_to_date):
+            if up_to_date:
+                entry = known_entries[scene_path.name]
+                scene = Scene(path=scene_path, repo=self._repo, records=entry.records, lazy=self._lazy)
+            else:
+                scene, entry = next(outdated_scenes)
+            self._scenes[scene_path.name] = (scene, entry)
+            scenes.append(scene)
         return scenes
 
-    def _is_hic_datasource(self) -> bool:
-        scenes_paths = filter(lambda p: self._is_path_to_scene(p), self.path.iterdir())
-        return all(Scene.is_path_to_hic_scene(scene_path) for scene_path in scenes_paths)
+    def _scan_scenes(self, entries: List[SceneEntry]) -> List[Scene]:
+        if self._lazy:
+            # Lazy scenes are recorded once they're scanned.
+            return [
+                Scene(
+                    path=self.path.joinpath(entry.name),
+                    repo=self._repo,
+                    lazy=True,
+                    on_scan=partial(self._on_scene_scanned, entry),
+                )
+                for entry in entries
+            ]
+        layouts = self.scanner.scan(self.path.joinpath(entry.name) for entry in entries)
+        scenes = self.scanner.map(lambda layout: Scene(path=layout.path, repo=self._repo, layout=layout), layouts)
+        for scene, entry in zip(scenes, entries):
+            entry.records = scene.records
+        if self.manifest is not None:
+            self.manifest.update(entries)
+        return scenes
 
     @staticmethod
-    def _is_path_to_scene(path: Path) -> bool:
-        return any(path.match(pattern) for pattern in SCENE_FOLDER_NAME_PATTERNS) and path.is_dir()
+    def _create_entry(scene_path: Path) -> SceneEntry:
+        return SceneEntry(
+            name=scene_path.name, fingerprint=get_scene_fingerprint(scene_path), is_hic=is_hic_scene(scene_path)
+        )
+
+    def _on_scene_scanned(self, entry: SceneEntry, scene: Scene) -> None:
+        entry.records = scene.records
+        if self.manifest is not None:
+            self.manifest.update([entry])
+
+    def _is_hic_datasource(self) -> bool:
+        entries = self.manifest.entries if self.manifest is not None else {}
+        scenes_paths = self._get_scenes_paths()
+        known_scenes_are_hic = [entries[path_.name].is_hic for path_ in scenes_paths if path_.name in entries]
+        unknown_scenes_paths = [path_ for path_ in scenes_paths if path_.name not in entries]
+        return all(known_scenes_are_hic) and all(self.scanner.map(is_hic_scene, unknown_scenes_paths))
+
+    def _get_scenes_paths(self) -> List[Path]:
+        if self._scenes_paths is None:
+            self._scenes_paths = list_scenes(self.path)
+        return self._scenes_paths
 
 
 @dataclass
 class SourcesRepository:
     sources_paths: Tuple[str]
+    cache_dir: Optional[str] = None
+    scan_workers: int = DEFAULT_SCAN_WORKERS
 
     def get_all(self) -> Iterator[DataSource]:
+        scanner = SourceScanner(workers=self.scan_workers)
         for path in self.sources_paths:
-            yield DataSource(path=Path(path))
+            yield DataSource(path=Path(path), manifest=self._get_manifest(Path(path)), scanner=scanner)
+
+    def _get_manifest(self, source_path: Path) -> Optional[SourceManifest]:
+        if self.cache_dir is None:
+            return None
+        return SourceManifest(source_path=source_path, cache_dir=self.cache_dir)
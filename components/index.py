@@ -0,0 +1,136 @@
+import dataclasses
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from datagen.components.datapoint import DatapointRecord
+from datagen.components.scene import Scene
+from datagen.dev import json_backends
+from datagen.modalities.textual.common.identity_label import IdentityLabel
+
+IDENTITY_LABELS = tuple(f.name for f in dataclasses.fields(IdentityLabel))
+
+ACTORS_ATTRIBUTES = ("identity_id", *IDENTITY_LABELS)
+
+
+class UnknownAttributeError(KeyError):
+    ...
+
+
+class DatapointsIndex:
+    """
+    A columnar index of the datapoints' scene, camera, frame, image name and environment attributes,
+    and of their actors' identity labels, positioned by the datapoints' indices in the dataset.
+    """
+
+    def __init__(self, datapoints_df: pd.DataFrame, scenes: List[Scene]):
+        self._datapoints_df = datapoints_df
+        self._scenes = scenes
+        self._actors_df: Optional[pd.DataFrame] = None
+
+    def filter(self, **attributes) -> np.ndarray:
+        """
+        :returns the (sorted) indices of the datapoints matching all of the given attributes.
+        """
+        datapoints_attrs, actors_attrs = self._split_attributes(attributes)
+        mask = np.ones(len(self._datapoints_df), dtype=bool)
+        for attr_name, attr_value in datapoints_attrs.items():
+            mask &= self._matches(self._datapoints_df[attr_name], attr_value)
+        indices = np.flatnonzero(mask)
+        if actors_attrs:
+            indices = np.intersect1d(indices, self._filter_actors(actors_attrs))
+        return indices
+
+    def query(self, expr: str) -> np.ndarray:
+        """
+        :param expr: A pandas query expression over the datapoints' (non-actor) attributes.
+        :returns the (sorted) indices of the datapoints matching the query.
+        """
+        return self._datapoints_df.query(expr).index.to_numpy()
+
+    def _split_attributes(self, attributes: Dict[str, Any]) -> Tuple[dict, dict]:
+        datapoints_attrs, actors_attrs = {}, {}
+        for attr_name, attr_value in attributes.items():
+            if attr_name in ACTORS_ATTRIBUTES:
+                actors_attrs[attr_name] = attr_value
+            elif attr_name in self._datapoints_df.columns:
+                datapoints_attrs[attr_name] = attr_value
+            else:
+                raise UnknownAttributeError(f"Unknown datapoint attribute: '{attr_name}'")
+        return datapoints_attrs, actors_attrs
+
+    def _filter_actors(self, actors_attrs: Dict[str, Any]) -> np.ndarray:
+        actors_df = self._get_actors_df()
+        # All of the attributes must match the same actor.
+        mask = np.logical_and.reduce(
+            [self._matches(actors_df[attr_name], attr_value) for attr_name, attr_value in actors_attrs.items()]
+        )
+        return np.unique(actors_df["datapoint_idx"].to_numpy()[mask])
+
+    @staticmethod
+    def _matches(column: pd.Series, value: Any) -> np.ndarray:
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return column.isin(list(value)).to_numpy()
+        return (column == value).to_numpy()
+
+    def _get_actors_df(self) -> pd.DataFrame:
+        if self._actors_df is None:
+            self._actors_df = self._create_actors_df()
+        return self._actors_df
+
+    def _create_actors_df(self) -> pd.DataFrame:
+        """
+        Built from the scenes' records, rather than from their datapoints, so lazy scenes' cameras aren't created.
+        Datapoints of the same camera & frame share their actor metadata file, which is looked up once.
+        """
+        rows, labels_cache = [], {}
+        scenes_records = ((scene, record) for scene in self._scenes for record in scene.get_records())
+        files_paths = {}
+        for datapoint_idx, (scene, record) in enumerate(scenes_records):
+            file_key = (scene.path, record.camera, record.frame_num)
+            if file_key not in files_paths:
+                files_paths[file_key] = _get_actor_metadata_file_path(scene, record)
+            actor_metadata_file_path = files_paths[file_key]
+            if actor_metadata_file_path is None:
+                continue
+            if actor_metadata_file_path not in labels_cache:
+                labels_cache[actor_metadata_file_path] = _read_actors_labels(actor_metadata_file_path)
+            rows.extend({"datapoint_idx": datapoint_idx, **labels} for labels in labels_cache[actor_metadata_file_path])
+        return pd.DataFrame(rows, columns=["datapoint_idx", *ACTORS_ATTRIBUTES])
+
+    @classmethod
+    def from_scenes(cls, scenes: List[Scene]) -> "DatapointsIndex":
+        rows = [
+            {
+                "source": str(scene.path.parent),
+                "scene": scene.path.name,
+                "camera": record.camera,
+                "frame_num": record.frame_num,
+                **record.environment,
+                "image_name": record.image_name,
+            }
+            for scene in scenes
+            for record in scene.get_records()
+        ]
+        return cls(datapoints_df=pd.DataFrame(rows), scenes=scenes)
+
+
+def _get_actor_metadata_file_path(scene: Scene, record: DatapointRecord) -> Optional[str]:
+    # A datapoint of its own, not the scene's, so that the scene's cameras & datapoints aren't created.
+    [datapoint] = scene.repo.get_datapoints(scene_path=scene.path, camera_name=record.camera, records=[record])
+    return type(datapoint).actor_metadata.get_file_path(datapoint)
+
+
+def _read_actors_labels(actor_metadata_file_path: str) -> List[dict]:
+    """
+    Reads only the actors' identity labels, without parsing the rest of the actor metadata.
+    """
+    actor_metadata = json_backends.load_file(actor_metadata_file_path)
+    if "identities" in actor_metadata:
+        # HIC - Multiple actors per datapoint
+        return [
+            {"identity_id": identity_id, **{label: actor[label] for label in IDENTITY_LABELS}}
+            for identity_id, actor in actor_metadata["identities"].items()
+        ]
+    return [{"identity_id": actor_metadata["identity_id"], **actor_metadata["identity_label"]}]
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from datagen.components.datapoint import DatapointRecord
+from datagen.components.scanner import HIC_CAMERAS_FRAME_DIR_NAME, HIC_FRAMES_DIR_NAME
+from datagen.dev import json_backends
+from datagen.dev.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = str(Path.home().joinpath(".cache", "datagen"))
+
+MANIFESTS_DIR_NAME = "manifests"
+
+MANIFEST_SCHEMA_VERSION = "1"
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS scenes (name TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, is_hic INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS datapoints (
+    scene TEXT NOT NULL,
+    camera TEXT NOT NULL,
+    frame_num INTEGER NOT NULL,
+    image_name TEXT NOT NULL,
+    environment TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS datapoints_scene ON datapoints (scene);
+"""
+
+
+def get_scene_fingerprint(scene_path: Path) -> str:
+    """
+    A scene's fingerprint changes whenever a camera (or for HIC - a frame) is added to or removed from it.
+    HIC scenes' cameras are listed from their first frame, hence it is fingerprinted as well.
+    """
+    fingerprint = [str(os.stat(scene_path).st_mtime_ns)]
+    frames_path = scene_path.joinpath(HIC_FRAMES_DIR_NAME)
+    for path_ in (frames_path, frames_path.joinpath(HIC_CAMERAS_FRAME_DIR_NAME)):
+        try:
+            fingerprint.append(str(os.stat(path_).st_mtime_ns))
+        except FileNotFoundError:
+            break
+    return ":".join(fingerprint)
+
+
+@dataclass
+class SceneEntry:
+    name: str
+    fingerprint: str
+    is_hic: bool
+    records: List[DatapointRecord] = field(default_factory=list, repr=False)
+
+    def matches(self, scene_path: Path) -> bool:
+        try:
+            return self.fingerprint == get_scene_fingerprint(scene_path)
+        except FileNotFoundError:
+            return False
+
+
+@dataclass
+class SourceManifest:
+    """
+    An on-disk (SQLite) listing of a source's scenes, cameras, frames and environments.
+    Scenes whose directories were not modified since they were listed are loaded from the manifest
+    instead of being scanned, so reopening a dataset does not require walking it.
+    """
+
+    source_path: Path
+    cache_dir: str = DEFAULT_CACHE_DIR
+    _entries: Optional[Dict[str, SceneEntry]] = field(default=None, init=False, repr=False)
+
+    @property
+    def path(self) -> Path:
+        source_id = hashlib.sha1(str(self.source_path.resolve()).encode()).hexdigest()
+        return Path(self.cache_dir).joinpath(MANIFESTS_DIR_NAME, f"{source_id}.sqlite")
+
+    @property
+    def entries(self) -> Dict[str, SceneEntry]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self) -> Dict[str, SceneEntry]:
+        if not self.path.exists():
+            return {}
+        try:
+            with closing(self._connect()) as connection:
+                return self._read_entries(connection)
+        except sqlite3.Error as e:
+            logger.warning(f"Ignoring unreadable manifest '{self.path}': {e}")
+            return {}
+
+    def _read_entries(self, connection: sqlite3.Connection) -> Dict[str, SceneEntry]:
+        if self._get_schema_version(connection) != MANIFEST_SCHEMA_VERSION:
+            return {}
+        entries = {
+            name: SceneEntry(name=name, fingerprint=fingerprint, is_hic=bool(is_hic))
+            for name, fingerprint, is_hic in connection.execute("SELECT name, fingerprint, is_hic FROM scenes")
+        }
+        datapoints_rows = connection.execute(
+            "SELECT scene, camera, frame_num, image_name, environment FROM datapoints ORDER BY rowid"
+        )
+        for scene, camera, frame_num, image_name, environment in datapoints_rows:
+            entries[scene].records.append(
+                DatapointRecord(
+                    camera=camera,
+                    frame_num=frame_num,
+                    image_name=image_name,
+                    environment=json_backends.loads(environment),
+                )
+            )
+        return entries
+
+    def update(self, entries: Iterable[SceneEntry], removed_scenes: Iterable[str] = ()) -> None:
+        entries, removed_scenes = list(entries), list(removed_scenes)
+        if not entries and not removed_scenes:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(self._connect()) as connection, connection:
+                self._init_schema(connection)
+                self._delete_entries(connection, [e.name for e in entries] + removed_scenes)
+                self._insert_entries(connection, entries)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not update manifest '{self.path}': {e}")
+            return
+        for scene in removed_scenes:
+            self.entries.pop(scene, None)
+        self.entries.update((entry.name, entry) for entry in entries)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(self.path), timeout=30)
+        # The manifest can always be rebuilt from the source, there's no need to pay for durability.
+        connection.execute("PRAGMA synchronous = OFF")
+        return connection
+
+    @staticmethod
+    def _get_schema_version(connection: sqlite3.Connection) -> Optional[str]:
+        try:
+            [row] = connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchall()
+        except (sqlite3.OperationalError, ValueError):
+            # No meta table / no schema version recorded
+            return None
+        return row[0]
+
+    def _init_schema(self, connection: sqlite3.Connection) -> None:
+        if self._get_schema_version(connection) not in (None, MANIFEST_SCHEMA_VERSION):
+            connection.executescript("DROP TABLE IF EXISTS scenes; DROP TABLE IF EXISTS datapoints;")
+        connection.executescript(MANIFEST_SCHEMA)
+        connection.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [("schema_version", MANIFEST_SCHEMA_VERSION), ("source_path", str(self.source_path.resolve()))],
+        )
+
+    @staticmethod
+    def _delete_entries(connection: sqlite3.Connection, scenes: List[str]) -> None:
+        connection.executemany("DELETE FROM scenes WHERE name = ?", [(scene,) for scene in scenes])
+        connection.executemany("DELETE FROM datapoints WHERE scene = ?", [(scene,) for scene in scenes])
+
+    @staticmethod
+    def _insert_entries(connection: sqlite3.Connection, entries: List[SceneEntry]) -> None:
+        connection.executemany(
+            "INSERT INTO scenes (name, fingerprint, is_hic) VALUES (?, ?, ?)",
+            [(entry.name, entry.fingerprint, int(entry.is_hic)) for entry in entries],
+        )
+        connection.executemany(
+            "INSERT INTO datapoints (scene, camera, frame_num, image_name, environment) VALUES (?, ?, ?, ?, ?)",
+            [
+                (entry.name, r.camera, r.frame_num, r.image_name, json.dumps(r.environment))
+                for entry in entries
+                for r in entry.records
+            ],
+        )
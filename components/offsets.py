@@ -0,0 +1,23 @@
+import bisect
+from itertools import accumulate
+from typing import Iterable, Tuple
+
+
+class CumulativeOffsets:
+    """
+    Maps a flat index over consecutive containers (e.g. the datapoints of all scenes)
+    to the index of the container holding it and its index within that container.
+    """
+
+    def __init__(self, sizes: Iterable[int] = ()):
+        self._ends = list(accumulate(sizes))
+
+    def locate(self, idx: int) -> Tuple[int, int]:
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Index {idx} is out of range")
+        container_idx = bisect.bisect_right(self._ends, idx)
+        container_start = self._ends[container_idx - 1] if container_idx > 0 else 0
+        return container_idx, idx - container_start
+
+    def __len__(self):
+        return self._ends[-1] if self._ends else 0
@@ -0,0 +1,65 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, Iterator, Sequence, Tuple
+
+from datagen.components.datapoint import DataPoint
+
+DEFAULT_PREFETCH = 8
+
+DEFAULT_PREFETCH_WORKERS = 4
+
+LoadedDatapoint = Tuple[DataPoint, Dict[str, Any]]
+
+
+@dataclass
+class Prefetcher:
+    """
+    Reads the modalities of the next datapoints in background threads while the current one is consumed.
+    At most `prefetch` datapoints are read ahead, so memory is bounded regardless of the dataset's size,
+    and datapoints are yielded in order.
+    """
+
+    prefetch: int = DEFAULT_PREFETCH
+    workers: int = DEFAULT_PREFETCH_WORKERS
+
+    def __post_init__(self):
+        if self.prefetch < 0 or self.workers < 1:
+            raise ValueError(f"Invalid prefetch ({self.prefetch}) or workers ({self.workers})")
+
+    def iter(self, datapoints: Iterable[DataPoint], modalities: Sequence[str]) -> Iterator[LoadedDatapoint]:
+        """
+        :returns an iterator of (datapoint, {modality name: modality}) pairs
+        """
+        if self.prefetch == 0:
+            yield from (_load(dp, modalities) for dp in datapoints)
+            return
+        datapoints = iter(datapoints)
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        pending: Deque[Future] = deque()
+        try:
+            self._submit(executor, pending, datapoints, modalities, count=self.prefetch)
+            while pending:
+                loaded_datapoint = pending.popleft().result()
+                self._submit(executor, pending, datapoints, modalities, count=1)
+                yield loaded_datapoint
+        finally:
+            # Also reached when the consumer stops iterating early, there's no point in finishing the read-ahead.
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _submit(
+        executor: ThreadPoolExecutor,
+        pending: Deque[Future],
+        datapoints: Iterator[DataPoint],
+        modalities: Sequence[str],
+        count: int,
+    ) -> None:
+        for _, dp in zip(range(count), datapoints):
+            pending.append(executor.submit(_load, dp, modalities))
+
+
+def _load(dp: DataPoint, modalities: Sequence[str]) -> LoadedDatapoint:
+    return dp, {modality: getattr(dp, modality) for modality in modalities}
@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, Iterable, List, TypeVar
+
+# Older datasets scenes are named "environment_XXXXX".
+SCENE_FOLDER_NAME_PATTERNS = ["scene_*", "environment_*", "datapoint_*"]
+
+IDENTITIES_SCENE_FRAMES_RANGE = range(1)
+
+HIC_FRAMES_DIR_NAME = "frames"
+
+# for HIC, we have to select a random frame to get the cameras names of from.
+HIC_CAMERAS_FRAME_DIR_NAME = "001"
+
+DEFAULT_SCAN_WORKERS = 16
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class SceneLayout:
+    path: Path
+    is_hic: bool
+    cameras: List[str] = field(default_factory=list)
+    frames: range = IDENTITIES_SCENE_FRAMES_RANGE
+
+    def get_frame_path(self, frame_num: int) -> Path:
+        if self.is_hic:
+            return self.path.joinpath(HIC_FRAMES_DIR_NAME, str(frame_num).zfill(3))
+        else:
+            return self.path
+
+
+def list_scenes(source_path: Path) -> List[Path]:
+    with os.scandir(source_path) as entries:
+        scenes_paths = [
+            Path(entry.path)
+            for entry in entries
+            if any(fnmatch(entry.name, pattern) for pattern in SCENE_FOLDER_NAME_PATTERNS) and entry.is_dir()
+        ]
+    return sorted(scenes_paths)
+
+
+def list_dirs(path: Path) -> List[str]:
+    with os.scandir(path) as entries:
+        return [entry.name for entry in entries if entry.is_dir()]
+
+
+def is_hic_scene(scene_path: Path) -> bool:
+    return os.path.isdir(scene_path.joinpath(HIC_FRAMES_DIR_NAME))
+
+
+def scan_scene(scene_path: Path) -> SceneLayout:
+    """
+    Lists a scene's cameras and frames, a single directory listing per directory level.
+    """
+    scene_dirs = list_dirs(scene_path)
+    if HIC_FRAMES_DIR_NAME not in scene_dirs:
+        return SceneLayout(path=scene_path, is_hic=False, cameras=sorted(scene_dirs))
+    frames_path = scene_path.joinpath(HIC_FRAMES_DIR_NAME)
+    with os.scandir(frames_path) as entries:
+        frames_num = sum(1 for entry in entries if entry.name.isnumeric())
+    cameras = list_dirs(frames_path.joinpath(HIC_CAMERAS_FRAME_DIR_NAME))
+    return SceneLayout(path=scene_path, is_hic=True, cameras=sorted(cameras), frames=range(1, frames_num + 1))
+
+
+@dataclass
+class SourceScanner:
+    """
+    Runs filesystem operations over many scenes concurrently, since on network filesystems
+    every directory listing or stat is a round trip.
+    """
+
+    workers: int = DEFAULT_SCAN_WORKERS
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        items = list(items)
+        if self.workers <= 1 or len(items) <= 1:
+            return list(map(func, items))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(func, items))
+
+    def scan(self, scenes_paths: Iterable[Path]) -> List[SceneLayout]:
+        return self.map(scan_scene, scenes_paths)
@@ -1,47 +1,128 @@
+import operator
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List, Optional
 
 from datagen.components.camera import Camera
-from datagen.components.datapoint import DataPoint
+from datagen.components.datapoint import DataPoint, DatapointRecord, DatapointsRepository
+from datagen.components.offsets import CumulativeOffsets
+from datagen.components.scanner import SceneLayout, is_hic_scene, scan_scene
 
 
 @dataclass
 class Scene:
     path: Path
-    cameras: List[Camera] = field(init=False, repr=False)
+    repo: DatapointsRepository = field(repr=False)
+    records: Optional[List[DatapointRecord]] = field(default=None, repr=False)
+    layout: Optional[SceneLayout] = field(default=None, repr=False)
+    lazy: bool = field(default=False, repr=False)
+    on_scan: Optional[Callable[["Scene"], None]] = field(default=None, repr=False)
+    _cameras: Optional[List[Camera]] = field(default=None, init=False, repr=False)
+    _offsets: Optional[CumulativeOffsets] = field(default=None, init=False, repr=False)
 
     def __post_init__(self):
-        self.cameras = self._init_cameras()
+        if not self.lazy:
+            self.get_records()
+
+    @property
+    def cameras(self) -> List[Camera]:
+        if self._cameras is None:
+            self._cameras = self._init_cameras()
+        return self._cameras
+
+    def get_records(self) -> List[DatapointRecord]:
+        """
+        :returns the records of all of the scene's datapoints, scanning the scene if they are not known yet.
+        """
+        if self.records is None:
+            self.records = [record for camera in self.cameras for record in camera.get_records()]
+            if self.on_scan is not None:
+                self.on_scan(self)
+        return self.records
 
     def _init_cameras(self) -> List[Camera]:
-        return [Camera(name=camera_name, scene_path=self.path) for camera_name in sorted(self._get_cameras_names())]
+        if self.records is not None:
+            return [
+                Camera(name=camera_name, scene_path=self.path, repo=self.repo, records=camera_records, lazy=self.lazy)
+                for camera_name, camera_records in self._get_cameras_records().items()
+            ]
+        layout = self.get_layout()
+        return [
+            Camera(name=camera_name, scene_path=self.path, repo=self.repo, scene_layout=layout, lazy=self.lazy)
+            for camera_name in layout.cameras
+        ]
 
-    def _get_cameras_names(self) -> List[str]:
-        if Scene.is_path_to_hic_scene(self.path):
-            # for HIC, we have to select a random frame to get the cameras names of from.
-            cameras_base_path = self.path.joinpath("frames", "001")
-        else:
-            cameras_base_path = self.path
-        cameras_dirs = filter(lambda path_: path_.is_dir(), cameras_base_path.iterdir())
-        return [cam_dir.name for cam_dir in cameras_dirs]
+    def refresh(self) -> List[Camera]:
+        """
+        Rescans the scene, so that its cameras and records match the cameras and frames added to or removed from it
+        since it was scanned. Cameras whose frames did not change are kept as they are, with their records.
+        Scenes which were not scanned yet will pick the changes up once they are.
+        :returns the new cameras, and the cameras whose frames changed
+        """
+        if self.records is None:
+            return []
+        self.layout = scan_scene(self.path)
+        cameras_records = self._get_cameras_records()
+        known_cameras = {camera.name: camera for camera in self._cameras or []}
+        frames = set(self.layout.frames)
+        cameras, rescanned_cameras = [], []
+        for camera_name in self.layout.cameras:
+            camera_records = cameras_records.get(camera_name)
+            if camera_records is not None and {record.frame_num for record in camera_records} == frames:
+                camera = known_cameras.get(camera_name) or Camera(
+                    name=camera_name, scene_path=self.path, repo=self.repo, records=camera_records, lazy=self.lazy
+                )
+            else:
+                camera = Camera(
+                    name=camera_name, scene_path=self.path, repo=self.repo, scene_layout=self.layout, lazy=self.lazy
+                )
+                rescanned_cameras.append(camera)
+            cameras.append(camera)
+        self._cameras = cameras
+        self.records = [record for camera in cameras for record in camera.get_records()]
+        self._offsets = None
+        return rescanned_cameras
+
+    def get_layout(self) -> SceneLayout:
+        if self.layout is None:
+            self.layout = scan_scene(self.path)
+        return self.layout
+
+    def _get_cameras_records(self) -> Dict[str, List[DatapointRecord]]:
+        cameras_records = {}
+        for record in self.records:
+            cameras_records.setdefault(record.camera, []).append(record)
+        return cameras_records
 
     @staticmethod
     def is_path_to_hic_scene(scene_path: Path) -> bool:
-        hic_frames_dir = scene_path.joinpath("frames")
-        return hic_frames_dir.exists() and hic_frames_dir.is_dir()
+        return is_hic_scene(scene_path)
 
     @property
     def datapoints(self) -> List[DataPoint]:
         return [datapoint for datapoint in self]
 
     def __getitem__(self, key):
-        return self.datapoints[key]
+        if isinstance(key, slice):
+            return self.datapoints[key]
+        idx = operator.index(key)
+        if idx < 0:
+            idx += len(self)
+        camera_idx, camera_datapoint_idx = self._get_offsets().locate(idx)
+        return self.cameras[camera_idx][camera_datapoint_idx]
+
+    def _get_offsets(self) -> CumulativeOffsets:
+        if self._offsets is None:
+            # Scanned through get_records, so that a lazy scene's scan is recorded (e.g. in the manifest).
+            self.get_records()
+            self._offsets = CumulativeOffsets(len(camera) for camera in self.cameras)
+        return self._offsets
 
     def __iter__(self):
+        self.get_records()
         for camera in self.cameras:
             for datapoint in camera:
                 yield datapoint
 
     def __len__(self):
-        return len(self.datapoints)
+        return len(self.get_records())
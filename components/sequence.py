@@ -5,6 +5,7 @@ from typing import Tuple
 import cv2
 
 from datagen.components.datapoint import DataPoint
+from datagen.imaging.base import ChannelOrder
 from datagen.modalities.textual.base.environments import Environment
 
 
@@ -62,4 +63,8 @@ class Sequence:
 
     def _write_images(self, video: cv2.VideoWriter) -> None:
         for dp in self.datapoints:
-            video.write(dp.visible_spectrum)
+            # Video writers take BGR frames, as read with DatasetConfig(channel_order="bgr"), RGB ones are reversed.
+            img = dp.visible_spectrum
+            if type(dp).visible_spectrum.get_channel_order(dp) == ChannelOrder.RGB.value:
+                img = img[..., 2::-1]
+            video.write(img)
@@ -0,0 +1,29 @@
+import time
+from typing import Any, Callable, Dict, Iterable, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_BENCHMARK_REPEAT = 3
+
+
+def benchmark(
+    candidates: Dict[str, Callable[[T], Any]], inputs: Iterable[T], repeat: int = DEFAULT_BENCHMARK_REPEAT
+) -> Dict[str, float]:
+    """
+    Times alternative implementations of the same operation over the same inputs.
+    :param candidates: The implementations, by name
+    :param inputs: The inputs each of the implementations is called with
+    :param repeat: Number of passes over the inputs, the fastest pass is the one reported (less noisy than the mean)
+    :returns the seconds each implementation took to process all of the inputs, fastest first.
+    """
+    inputs = list(inputs)
+    timings = {}
+    for name, candidate in candidates.items():
+        passes = []
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            for input_ in inputs:
+                candidate(input_)
+            passes.append(time.perf_counter() - start)
+        timings[name] = min(passes)
+    return dict(sorted(timings.items(), key=lambda name_timing: name_timing[1]))
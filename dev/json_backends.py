@@ -0,0 +1,77 @@
+import importlib
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+from datagen.config import settings
+from datagen.dev.benchmarks import DEFAULT_BENCHMARK_REPEAT, benchmark
+
+AUTO_JSON_BACKEND = "auto"
+
+# By preference - the first installed backend is the one used in "auto" mode.
+JSON_BACKENDS_MODULES = {"orjson": "orjson", "simdjson": "simdjson", "json": "json"}
+
+Loads = Callable[[Union[str, bytes]], Any]
+
+
+class UnknownJsonBackendError(ValueError):
+    ...
+
+
+_loads: Optional[Loads] = None
+
+
+def get_installed_backends() -> Dict[str, Loads]:
+    backends = {}
+    for backend, module_name in JSON_BACKENDS_MODULES.items():
+        try:
+            backends[backend] = importlib.import_module(module_name).loads
+        except ImportError:
+            continue
+    return backends
+
+
+def set_json_backend(backend: str = AUTO_JSON_BACKEND) -> None:
+    """
+    :param backend: "orjson", "simdjson", "json" or "auto" - the first installed one, in that order of preference.
+    Until it is called, the backend is chosen by the "json_backend" setting (DYNACONF_JSON_BACKEND environment
+    variable), which defaults to "auto" as well.
+    """
+    global _loads
+    installed_backends = get_installed_backends()
+    if backend == AUTO_JSON_BACKEND:
+        backend = next(iter(installed_backends))
+    elif backend not in JSON_BACKENDS_MODULES:
+        raise UnknownJsonBackendError(f"Unknown JSON backend: '{backend}', use one of {list(JSON_BACKENDS_MODULES)}")
+    elif backend not in installed_backends:
+        raise UnknownJsonBackendError(f"JSON backend '{backend}' is not installed")
+    _loads = installed_backends[backend]
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if _loads is None:
+        set_json_backend(settings.get("json_backend", AUTO_JSON_BACKEND))
+    try:
+        return _loads(data)
+    except ValueError:
+        # The fast backends are stricter than the standard library (e.g. NaN, arbitrarily large integers).
+        if _loads is json.loads:
+            raise
+        return json.loads(data)
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def benchmark_backends(
+    files_paths: Iterable[Union[str, Path]], repeat: int = DEFAULT_BENCHMARK_REPEAT
+) -> Dict[str, float]:
+    """
+    Compares the installed backends on the given files, e.g. a sample of a dataset's keypoints & actor metadata.
+    The files are read beforehand, so only parsing is timed.
+    :returns the seconds each backend took to parse all of the files, fastest first.
+    """
+    files_contents = [Path(path).read_bytes() for path in files_paths]
+    return benchmark(get_installed_backends(), files_contents, repeat=repeat)
@@ -1,5 +1,4 @@
 import inspect
-import json
 from pathlib import Path
 from pydoc import render_doc
 from types import ModuleType
@@ -7,6 +6,8 @@ from typing import Any
 
 import pandas as pd
 
+from datagen.dev import json_backends
+
 INVOKING_MODULE_FRAME_IDX = 2
 
 
@@ -70,6 +71,6 @@ def load_resource(*path_components: str) -> Any:
     invoking_module = inspect.getmodule(invoking_frame[0])
     pkg_resource_file_path = Path(invoking_module.__file__).parent.joinpath(*path_components)
     if pkg_resource_file_path.suffix == ".json":
-        return json.loads(pkg_resource_file_path.read_text())
+        return json_backends.load_file(pkg_resource_file_path)
     elif pkg_resource_file_path.suffix == ".csv":
         return pd.read_csv(pkg_resource_file_path)
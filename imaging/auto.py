@@ -0,0 +1,87 @@
+import os
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+from datagen.dev.benchmarks import DEFAULT_BENCHMARK_REPEAT, benchmark
+from datagen.dev.logging import get_logger
+from datagen.imaging.base import ImageFormat, ImagingLibrary, ImagingLibraryNotInstalledError
+from datagen.imaging.opencv import OpenCVImagingLibrary
+from datagen.imaging.openexr import OpenEXRImagingLibrary
+from datagen.imaging.pillow import PillowImagingLibrary
+
+logger = get_logger(__name__)
+
+AUTO_IMAGING_LIBRARY = "auto"
+
+DEFAULT_IMAGING_LIBRARY = "opencv"
+
+# The imaging libraries' names, as selected by DatasetConfig(imaging_library=...)
+IMAGING_LIBRARIES = {
+    "opencv": OpenCVImagingLibrary,
+    "pillow": PillowImagingLibrary,
+    "openexr": OpenEXRImagingLibrary,
+}
+
+# Number of files of every image format the libraries are compared on
+DEFAULT_SAMPLE_SIZE = 8
+
+# Bounds the search for a format's files, in case the dataset has none (or less than the sample size)
+SAMPLE_MAX_DIRS = 128
+
+
+def get_installed_imaging_libraries() -> Dict[str, ImagingLibrary]:
+    libraries = {}
+    for name, library_cls in IMAGING_LIBRARIES.items():
+        try:
+            libraries[name] = library_cls()
+        except ImagingLibraryNotInstalledError:
+            continue
+    return libraries
+
+
+def sample_image_files(paths: Iterable[Union[str, Path]], size: int = DEFAULT_SAMPLE_SIZE) -> List[str]:
+    """
+    :param paths: Directories to look for images in, e.g. the dataset's sources
+    :returns up to `size` files of every image format, from the first directories found to contain them
+    """
+    samples = {image_format.value: [] for image_format in ImageFormat}
+    for path in paths:
+        for dir_idx, (dir_path, _, files_names) in enumerate(os.walk(path)):
+            for file_name in files_names:
+                file_format_samples = samples.get(file_name.rsplit(".", 1)[-1])
+                if file_format_samples is not None and len(file_format_samples) < size:
+                    file_format_samples.append(os.path.join(dir_path, file_name))
+            if dir_idx >= SAMPLE_MAX_DIRS or all(len(format_samples) == size for format_samples in samples.values()):
+                break
+    return [file_path for format_samples in samples.values() for file_path in format_samples]
+
+
+def select_imaging_library(files_paths: Iterable[str], repeat: int = DEFAULT_BENCHMARK_REPEAT) -> str:
+    """
+    Compares the installed imaging libraries on the given files, e.g. sample_image_files(...).
+    :returns the name of the library which decoded all of the files fastest
+    """
+    files_paths = list(files_paths)
+    libraries = {
+        name: library for name, library in get_installed_imaging_libraries().items() if _can_read(library, files_paths)
+    }
+    if len(libraries) <= 1 or not files_paths:
+        return next(iter(libraries), DEFAULT_IMAGING_LIBRARY)
+    timings = benchmark({name: partial(_read, library) for name, library in libraries.items()}, files_paths, repeat)
+    logger.info(f"Imaging libraries' decoding times (seconds): {timings}")
+    return next(iter(timings))
+
+
+def _can_read(library: ImagingLibrary, files_paths: List[str]) -> bool:
+    try:
+        for file_path in files_paths:
+            _read(library, file_path)
+    except Exception as e:
+        logger.warning(f"Excluding {type(library).__name__}, failed to decode the sample images: {e}")
+        return False
+    return True
+
+
+def _read(library: ImagingLibrary, file_path: str) -> None:
+    library.read(file_path, keep_alpha=False, convert_to_uint8=False)
@@ -1,5 +1,14 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Factors images can be scaled down by while they're decoded, as OpenCV's IMREAD_REDUCED_* flags do
+REDUCTION_FACTORS = (1, 2, 4, 8)
+
+# (min_x, min_y, max_x, max_y) - a region of an image in its full resolution's pixels, excluding the max ones
+Region = Tuple[int, int, int, int]
 
 
 class ImageFormat(Enum):
@@ -7,22 +16,181 @@ class ImageFormat(Enum):
     EXR = "exr"
 
 
+class ChannelOrder(Enum):
+    RGB = "rgb"
+    # OpenCV's order, in which PNG & EXR files are decoded by it to begin with
+    BGR = "bgr"
+
+
+class ImageDType(Enum):
+    # As decoded - uint8 or uint16 PNGs (uint8 with convert_to_uint8), float32 EXRs
+    NATIVE = "native"
+    # 16-bit PNGs scaled down to 8 bits
+    UINT8 = "uint8"
+    # PNGs normalized to [0, 1], EXRs' values as is
+    FLOAT16 = "float16"
+    FLOAT32 = "float32"
+
+
+class ImagingLibraryNotInstalledError(ImportError):
+    ...
+
+
+class ImageBufferMismatchError(ValueError):
+    ...
+
+
 class ImagingLibrary(ABC):
-    def read(self, image_file_path: str, keep_alpha: bool, convert_to_uint8: bool):
+    def read(
+        self,
+        image_file_path: str,
+        keep_alpha: bool,
+        convert_to_uint8: bool,
+        channel_order: str = ChannelOrder.RGB.value,
+        dtype: str = ImageDType.NATIVE.value,
+        reduction: int = 1,
+        roi: Optional[Region] = None,
+    ):
+        check_reduction(reduction)
         file_format = self._get_file_format(image_file_path)
         if file_format == ImageFormat.PNG.value:
-            return self._read_png(image_file_path, keep_alpha, convert_to_uint8)
+            return self._read_png(image_file_path, keep_alpha, convert_to_uint8, channel_order, dtype, reduction, roi)
         elif file_format == ImageFormat.EXR.value:
-            return self._read_exr(image_file_path)
+            return self._read_exr(image_file_path, channel_order, dtype, reduction, roi)
         else:
             raise ValueError(f"Unsupported image format: {file_format}")
 
+    def read_into(
+        self,
+        image_file_path: str,
+        out: np.ndarray,
+        keep_alpha: bool = False,
+        convert_to_uint8: bool = False,
+        channel_order: str = ChannelOrder.RGB.value,
+        dtype: str = ImageDType.NATIVE.value,
+        reduction: int = 1,
+        roi: Optional[Region] = None,
+    ) -> np.ndarray:
+        """
+        Decodes an image into a caller's buffer (e.g. a batch's slot, reused across batches) rather than a new array.
+        :param out: A writeable array of the image's shape and of the dtype it's read as
+        :param channel_order: "rgb" or "bgr" - the order of the color channels, followed by alpha if it's kept
+        :param dtype: "native", "uint8", "float16" or "float32" - see ImageDType
+        :param reduction: 1, 2, 4 or 8 - the factor the image is scaled down by (rounding its size down)
+        :param roi: Crops the image to a region (of its full resolution, even if it's scaled down), see Region
+        :returns out
+        :raises ImageBufferMismatchError: If the image doesn't fit the buffer
+        """
+        if not out.flags.writeable:
+            raise ImageBufferMismatchError("Cannot decode an image into a read-only buffer")
+        check_reduction(reduction)
+        file_format = self._get_file_format(image_file_path)
+        if file_format == ImageFormat.PNG.value:
+            self._read_png_into(
+                image_file_path, out, keep_alpha, convert_to_uint8, channel_order, dtype, reduction, roi
+            )
+        elif file_format == ImageFormat.EXR.value:
+            self._read_exr_into(image_file_path, out, channel_order, dtype, reduction, roi)
+        else:
+            raise ValueError(f"Unsupported image format: {file_format}")
+        return out
+
     @staticmethod
     def _get_file_format(image_file_path: str) -> str:
         return image_file_path.split(".")[-1]
 
     @abstractmethod
-    def _read_png(self, image_file_path: str, keep_alpha: bool, convert_to_uint8: bool): ...
+    def _read_png(
+        self,
+        image_file_path: str,
+        keep_alpha: bool,
+        convert_to_uint8: bool,
+        channel_order: str,
+        dtype: str,
+        reduction: int,
+        roi: Optional[Region],
+    ): ...
 
     @abstractmethod
-    def _read_exr(self, image_file_path: str): ...
+    def _read_exr(self, image_file_path: str, channel_order: str, dtype: str, reduction: int, roi: Optional[Region]):
+        ...
+
+    def _read_png_into(
+        self,
+        image_file_path: str,
+        out: np.ndarray,
+        keep_alpha: bool,
+        convert_to_uint8: bool,
+        channel_order: str,
+        dtype: str,
+        reduction: int,
+        roi: Optional[Region],
+    ) -> None:
+        """
+        Libraries which can't decode into a buffer read a new array, which is copied into it.
+        """
+        img = self._read_png(image_file_path, keep_alpha, convert_to_uint8, channel_order, dtype, reduction, roi)
+        copy_into(img, out)
+
+    def _read_exr_into(
+        self,
+        image_file_path: str,
+        out: np.ndarray,
+        channel_order: str,
+        dtype: str,
+        reduction: int,
+        roi: Optional[Region],
+    ) -> None:
+        copy_into(self._read_exr(image_file_path, channel_order, dtype, reduction, roi), out)
+
+
+def get_image_dtype(decoded_dtype: np.dtype, convert_to_uint8: bool, dtype: str) -> np.dtype:
+    """
+    :returns the dtype an image decoded as decoded_dtype is read as, by the dtype policy (see ImageDType)
+    """
+    image_dtype = ImageDType(dtype)
+    if image_dtype == ImageDType.NATIVE and not convert_to_uint8:
+        return np.dtype(decoded_dtype)
+    elif image_dtype in (ImageDType.NATIVE, ImageDType.UINT8):
+        if decoded_dtype not in (np.uint8, np.uint16):
+            raise ValueError("Cannot convert image to uint8 format")
+        return np.dtype(np.uint8)
+    else:
+        return np.dtype(image_dtype.value)
+
+
+def check_reduction(reduction: int) -> None:
+    if reduction not in REDUCTION_FACTORS:
+        raise ValueError(f"Unsupported reduction factor: {reduction}, supported factors: {REDUCTION_FACTORS}")
+
+
+def get_region_slices(shape: tuple, roi: Region, reduction: int) -> Tuple[slice, slice]:
+    """
+    :param shape: The shape of the (possibly scaled down) image
+    :returns the rows & columns of the image's pixels in the region, clipped to the image
+    """
+    min_x, min_y, max_x, max_y = roi
+    if min_x >= max_x or min_y >= max_y:
+        raise ValueError(f"Empty region of interest: {roi}")
+    height, width = shape[:2]
+    rows, cols = _get_pixels_range(min_y, max_y, reduction, height), _get_pixels_range(min_x, max_x, reduction, width)
+    if rows.start == rows.stop or cols.start == cols.stop:
+        raise ValueError(f"Region of interest {roi} is out of the image's bounds")
+    return rows, cols
+
+
+def _get_pixels_range(start: int, stop: int, reduction: int, size: int) -> slice:
+    # A scaled down range includes the pixels which are partially in it.
+    return slice(min(max(start // reduction, 0), size), min(max(-(-stop // reduction), 0), size))
+
+
+def check_buffer(out: np.ndarray, shape: tuple, dtype: np.dtype) -> None:
+    if out.shape != shape or out.dtype != dtype:
+        raise ImageBufferMismatchError(
+            f"Cannot read a {dtype} image of shape {shape} into a {out.dtype} buffer of shape {out.shape}"
+        )
+
+
+def copy_into(img: np.ndarray, out: np.ndarray) -> None:
+    check_buffer(out, img.shape, img.dtype)
+    np.copyto(out, img)
@@ -1,34 +1,179 @@
 import os
+from typing import Optional
+
 import numpy as np
 
-from datagen.imaging.base import ImagingLibrary
+from datagen.imaging.base import (
+    ChannelOrder,
+    ImagingLibrary,
+    Region,
+    check_buffer,
+    get_image_dtype,
+    get_region_slices,
+)
 
 os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
 
 import cv2
 
+# (2 ** 16 - 1) / (2 ** 8 - 1) - integer division by it equals scaling uint16 values by 255 / (2 ** 16 - 1) & truncating
+UINT16_TO_UINT8_DIVISOR = 257
+
+# By the decoded (BGR) & the requested channels, and the requested channel order.
+# Missing ones (BGR to BGR, BGRA to BGRA) need no conversion at all.
+COLOR_CONVERSIONS = {
+    (3, 3, ChannelOrder.RGB.value): cv2.COLOR_BGR2RGB,
+    (4, 3, ChannelOrder.RGB.value): cv2.COLOR_BGRA2RGB,
+    (4, 4, ChannelOrder.RGB.value): cv2.COLOR_BGRA2RGBA,
+    (4, 3, ChannelOrder.BGR.value): cv2.COLOR_BGRA2BGR,
+}
+
+
+# By reduction factor, decoding 3 channels (dropping alpha) of the file's bit depth
+REDUCED_IMREAD_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2 | cv2.IMREAD_ANYDEPTH,
+    4: cv2.IMREAD_REDUCED_COLOR_4 | cv2.IMREAD_ANYDEPTH,
+    8: cv2.IMREAD_REDUCED_COLOR_8 | cv2.IMREAD_ANYDEPTH,
+}
+
 
 class OpenCVImagingLibrary(ImagingLibrary):
-    def _read_png(self, image_file_path: str, keep_alpha: bool, convert_to_uint8: bool) -> np.ndarray:
-        img = cv2.imread(image_file_path, cv2.IMREAD_UNCHANGED)
-        if keep_alpha:
-            img[..., :3] = cv2.cvtColor(img[..., :3], cv2.COLOR_BGR2RGB)
-        else:
-            img = cv2.cvtColor(img[..., :3], cv2.COLOR_BGR2RGB)
-        if convert_to_uint8:
-            img = self._convert_to_uint8(img)
-        return img
+    def _read_png(
+        self,
+        image_file_path: str,
+        keep_alpha: bool,
+        convert_to_uint8: bool,
+        channel_order: str,
+        dtype: str,
+        reduction: int,
+        roi: Optional[Region],
+    ) -> np.ndarray:
+        img = self._imread_png(image_file_path, keep_alpha, reduction, roi)
+        shape = self._get_png_shape(img, keep_alpha)
+        return _convert(img, shape, get_image_dtype(img.dtype, convert_to_uint8, dtype), channel_order)
+
+    def _read_png_into(
+        self,
+        image_file_path: str,
+        out: np.ndarray,
+        keep_alpha: bool,
+        convert_to_uint8: bool,
+        channel_order: str,
+        dtype: str,
+        reduction: int,
+        roi: Optional[Region],
+    ) -> None:
+        img = self._imread_png(image_file_path, keep_alpha, reduction, roi)
+        check_buffer(out, self._get_png_shape(img, keep_alpha), get_image_dtype(img.dtype, convert_to_uint8, dtype))
+        _convert_into(img, out, channel_order)
 
     @staticmethod
-    def _convert_to_uint8(img: np.ndarray) -> np.ndarray:
-        if img.dtype == np.uint16:
-            img = ((img / (2 ** 16 - 1)) * 255).astype(np.uint8)
-        elif img.dtype == np.uint8:
-            return img
+    def _imread_png(image_file_path: str, keep_alpha: bool, reduction: int, roi: Optional[Region]) -> np.ndarray:
+        if reduction > 1 and not keep_alpha:
+            img = cv2.imread(image_file_path, REDUCED_IMREAD_FLAGS[reduction])
         else:
-            raise ValueError("Cannot convert image to uint8 format")
+            img = reduce(cv2.imread(image_file_path, cv2.IMREAD_UNCHANGED), reduction)
+        return crop(img, roi, reduction)
+
+    @staticmethod
+    def _get_png_shape(img: np.ndarray, keep_alpha: bool) -> tuple:
+        if img.ndim != 3 or img.shape[-1] not in (3, 4):
+            raise ValueError(f"Unsupported PNG channels: {img.shape}")
+        return *img.shape[:2], 4 if keep_alpha and img.shape[-1] == 4 else 3
+
+    def _read_exr(
+        self, image_file_path: str, channel_order: str, dtype: str, reduction: int, roi: Optional[Region]
+    ) -> np.ndarray:
+        img = crop(reduce(cv2.imread(image_file_path, cv2.IMREAD_UNCHANGED), reduction), roi, reduction)
+        return _convert(img, img.shape, get_image_dtype(img.dtype, False, dtype), channel_order)
+
+    def _read_exr_into(
+        self,
+        image_file_path: str,
+        out: np.ndarray,
+        channel_order: str,
+        dtype: str,
+        reduction: int,
+        roi: Optional[Region],
+    ) -> None:
+        img = crop(reduce(cv2.imread(image_file_path, cv2.IMREAD_UNCHANGED), reduction), roi, reduction)
+        check_buffer(out, img.shape, get_image_dtype(img.dtype, False, dtype))
+        _convert_into(img, out, channel_order)
+
+
+def reduce(img: np.ndarray, reduction: int) -> np.ndarray:
+    """
+    Scales a fully decoded image down as OpenCV's IMREAD_REDUCED_* flags do,
+    for images it can't decode that way (EXR files, or PNG files whose alpha channel they would drop).
+    """
+    if reduction == 1:
+        return img
+    height, width = img.shape[:2]
+    return cv2.resize(img, (width // reduction, height // reduction), interpolation=cv2.INTER_LINEAR_EXACT)
+
+
+def crop(img: np.ndarray, roi: Optional[Region], reduction: int) -> np.ndarray:
+    """
+    :returns a view of the image's region, which is copied once converted - see _convert
+    """
+    if roi is None:
         return img
+    return img[get_region_slices(img.shape, roi, reduction)]
+
+
+def _get_color_conversion(img: np.ndarray, shape: tuple, channel_order: str) -> Optional[int]:
+    if img.ndim != 3:
+        # Single channel images, e.g. a depth EXR written as such.
+        return None
+    return COLOR_CONVERSIONS.get((img.shape[-1], shape[-1], ChannelOrder(channel_order).value))
+
+
+def _convert(img: np.ndarray, shape: tuple, dtype: np.dtype, channel_order: str) -> np.ndarray:
+    if _get_color_conversion(img, shape, channel_order) is None and dtype == img.dtype:
+        # Already decoded as requested, e.g. BGR images read in BGR order. Cropped views are copied,
+        # so that the full image isn't kept alive (e.g. cached).
+        return img if img.base is None else img.copy()
+    out = np.empty(shape, dtype=dtype)
+    _convert_into(img, out, channel_order)
+    return out
+
+
+def _convert_into(img: np.ndarray, out: np.ndarray, channel_order: str) -> None:
+    """
+    Reorders the decoded BGR(A) channels into the buffer's channel order (if they differ), converting them to its dtype.
+    None of the conversions goes through float64 - uint16 is scaled down to uint8 by integer division,
+    integers are normalized to [0, 1] in float32 and float16 is converted to by OpenCV.
+    """
+    code = _get_color_conversion(img, out.shape, channel_order)
+    if img.dtype == out.dtype:
+        _cvt_color_into(img, code, out)
+        return
+    # Converting the reordered (contiguous) channels is much faster than converting the strided decoded ones.
+    if code is not None:
+        img = cv2.cvtColor(img, code)
+    if out.dtype == np.uint8:
+        np.floor_divide(img, UINT16_TO_UINT8_DIVISOR, out=out, casting="unsafe")
+    elif img.dtype == np.float32:
+        _to_float16_into(img, out)
+    elif out.dtype == np.float32:
+        np.multiply(img, np.float32(1 / np.iinfo(img.dtype).max), out=out, dtype=np.float32)
+    else:
+        _to_float16_into(np.multiply(img, np.float32(1 / np.iinfo(img.dtype).max), dtype=np.float32), out)
+
+
+def _to_float16_into(img: np.ndarray, out: np.ndarray) -> None:
+    # Much faster than numpy's float32 to float16 casting, OpenCV writes the half floats as int16.
+    if out.flags.c_contiguous:
+        cv2.convertFp16(img, dst=out.view(np.int16))
+    else:
+        np.copyto(out, cv2.convertFp16(img).view(np.float16))
+
 
-    def _read_exr(self, image_file_path: str) -> np.ndarray:
-        img = cv2.imread(image_file_path, cv2.IMREAD_UNCHANGED)
-        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+def _cvt_color_into(img: np.ndarray, code: Optional[int], out: np.ndarray) -> None:
+    if code is None:
+        np.copyto(out, img)
+    elif out.flags.c_contiguous:
+        # OpenCV writes into a contiguous destination of the right shape & dtype in place.
+        cv2.cvtColor(img, code, dst=out)
+    else:
+        np.copyto(out, cv2.cvtColor(img, code))
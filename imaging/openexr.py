@@ -0,0 +1,108 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from datagen.imaging.base import (
+    ChannelOrder,
+    ImagingLibraryNotInstalledError,
+    Region,
+    check_buffer,
+    get_image_dtype,
+    get_region_slices,
+)
+from datagen.imaging.opencv import OpenCVImagingLibrary
+
+try:
+    import Imath
+    import OpenEXR
+except ImportError:
+    # Did not install the OpenEXR optional dependency
+    OpenEXR = None
+
+RGB_CHANNELS = ("R", "G", "B")
+
+
+class OpenEXRImagingLibrary(OpenCVImagingLibrary):
+    """
+    Decodes RGB EXR files with the OpenEXR bindings, straight into float32 arrays (as OpenCV does),
+    or into float16 ones - without decoding them as float32 first, and only the rows of their regions of interest.
+    Scaled down EXR files are decoded with OpenCV.
+    Other EXR files & PNG files are decoded with OpenCV.
+    """
+
+    def __init__(self):
+        if OpenEXR is None:
+            raise ImagingLibraryNotInstalledError("OpenEXR is not installed, run 'pip install OpenEXR'")
+        self._pixel_types = {
+            np.dtype(np.float32): Imath.PixelType(Imath.PixelType.FLOAT),
+            np.dtype(np.float16): Imath.PixelType(Imath.PixelType.HALF),
+        }
+
+    def _read_exr(
+        self, image_file_path: str, channel_order: str, dtype: str, reduction: int, roi: Optional[Region]
+    ) -> np.ndarray:
+        image_dtype = get_image_dtype(np.float32, False, dtype)
+        decoded = self._read_rgb_channels(image_file_path, image_dtype, roi) if reduction == 1 else None
+        if decoded is None:
+            return super()._read_exr(image_file_path, channel_order, dtype, reduction, roi)
+        shape, channels = decoded
+        out = np.empty(shape, dtype=image_dtype)
+        _fill_channels(out, channels, channel_order)
+        return out
+
+    def _read_exr_into(
+        self,
+        image_file_path: str,
+        out: np.ndarray,
+        channel_order: str,
+        dtype: str,
+        reduction: int,
+        roi: Optional[Region],
+    ) -> None:
+        image_dtype = get_image_dtype(np.float32, False, dtype)
+        decoded = self._read_rgb_channels(image_file_path, image_dtype, roi) if reduction == 1 else None
+        if decoded is None:
+            super()._read_exr_into(image_file_path, out, channel_order, dtype, reduction, roi)
+            return
+        shape, channels = decoded
+        check_buffer(out, shape, image_dtype)
+        _fill_channels(out, channels, channel_order)
+
+    def _read_rgb_channels(
+        self, image_file_path: str, dtype: np.dtype, roi: Optional[Region]
+    ) -> Optional[Tuple[tuple, List[np.ndarray]]]:
+        """
+        Only the scan lines of the region of interest (if any) are decoded.
+        :returns the shape of the image (or of its region) & its R, G, B channels' pixels of the given (float) dtype,
+        or None if it's not an RGB image
+        """
+        exr_file = OpenEXR.InputFile(image_file_path)
+        try:
+            header = exr_file.header()
+            if set(header["channels"]) != set(RGB_CHANNELS):
+                return None
+            data_window = header["dataWindow"]
+            width = data_window.max.x - data_window.min.x + 1
+            height = data_window.max.y - data_window.min.y + 1
+            if roi is None:
+                rows, cols = slice(0, height), slice(0, width)
+            else:
+                rows, cols = get_region_slices((height, width), roi, 1)
+            channels = exr_file.channels(
+                list(RGB_CHANNELS),
+                self._pixel_types[dtype],
+                data_window.min.y + rows.start,
+                data_window.min.y + rows.stop - 1,
+            )
+        finally:
+            exr_file.close()
+        num_rows = rows.stop - rows.start
+        channels = [np.frombuffer(channel, dtype=dtype).reshape(num_rows, width)[:, cols] for channel in channels]
+        return (num_rows, cols.stop - cols.start, len(RGB_CHANNELS)), channels
+
+
+def _fill_channels(out: np.ndarray, channels: List[np.ndarray], channel_order: str) -> None:
+    if ChannelOrder(channel_order) == ChannelOrder.BGR:
+        channels = channels[::-1]
+    for channel_idx, channel in enumerate(channels):
+        out[..., channel_idx] = channel
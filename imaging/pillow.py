@@ -0,0 +1,107 @@
+from typing import Optional
+
+import numpy as np
+
+from datagen.imaging.base import (
+    ChannelOrder,
+    ImageDType,
+    ImagingLibraryNotInstalledError,
+    Region,
+    copy_into,
+    get_region_slices,
+)
+from datagen.imaging.opencv import OpenCVImagingLibrary
+
+try:
+    from PIL import Image
+except ImportError:
+    # Did not install the pillow optional dependency
+    Image = None
+
+PNG_HEADER_SIZE = 26
+
+# Offsets of the IHDR chunk's bit depth & color type, after the PNG signature and the chunk's length & type.
+PNG_BIT_DEPTH_OFFSET, PNG_COLOR_TYPE_OFFSET = 24, 25
+
+PNG_RGB_COLOR_TYPE, PNG_RGBA_COLOR_TYPE = 2, 6
+
+
+class PillowImagingLibrary(OpenCVImagingLibrary):
+    """
+    Decodes 8-bit RGB(A) PNG files with Pillow, which are read as RGB to begin with.
+    Other PNG files (e.g. 16-bit, which Pillow truncates to 8 bits), PNG files read in BGR order, as floats
+    or scaled down & EXR files are decoded with OpenCV.
+    """
+
+    def __init__(self):
+        if Image is None:
+            raise ImagingLibraryNotInstalledError("Pillow is not installed, run 'pip install pillow'")
+
+    def _read_png(
+        self,
+        image_file_path: str,
+        keep_alpha: bool,
+        convert_to_uint8: bool,
+        channel_order: str,
+        dtype: str,
+        reduction: int,
+        roi: Optional[Region],
+    ) -> np.ndarray:
+        if not _can_read(image_file_path, channel_order, dtype, reduction):
+            return super()._read_png(
+                image_file_path, keep_alpha, convert_to_uint8, channel_order, dtype, reduction, roi
+            )
+        with self._open(image_file_path, keep_alpha) as pil_img:
+            if roi is None:
+                return np.array(pil_img)
+            return _crop(np.asarray(pil_img), roi).copy()
+
+    def _read_png_into(
+        self,
+        image_file_path: str,
+        out: np.ndarray,
+        keep_alpha: bool,
+        convert_to_uint8: bool,
+        channel_order: str,
+        dtype: str,
+        reduction: int,
+        roi: Optional[Region],
+    ) -> None:
+        if not _can_read(image_file_path, channel_order, dtype, reduction):
+            super()._read_png_into(
+                image_file_path, out, keep_alpha, convert_to_uint8, channel_order, dtype, reduction, roi
+            )
+            return
+        with self._open(image_file_path, keep_alpha) as pil_img:
+            copy_into(_crop(np.asarray(pil_img), roi), out)
+
+    @staticmethod
+    def _open(image_file_path: str, keep_alpha: bool) -> "Image.Image":
+        pil_img = Image.open(image_file_path)
+        if pil_img.mode == "RGBA" and not keep_alpha:
+            with pil_img:
+                return pil_img.convert("RGB")
+        return pil_img
+
+
+def _can_read(image_file_path: str, channel_order: str, dtype: str, reduction: int) -> bool:
+    return (
+        ChannelOrder(channel_order) == ChannelOrder.RGB
+        and ImageDType(dtype) in (ImageDType.NATIVE, ImageDType.UINT8)
+        and reduction == 1
+        and _is_8bit_rgb(image_file_path)
+    )
+
+
+def _crop(img: np.ndarray, roi: Optional[Region]) -> np.ndarray:
+    return img if roi is None else img[get_region_slices(img.shape, roi, 1)]
+
+
+def _is_8bit_rgb(image_file_path: str) -> bool:
+    with open(image_file_path, "rb") as f:
+        png_header = f.read(PNG_HEADER_SIZE)
+    return (
+        len(png_header) == PNG_HEADER_SIZE
+        and png_header[PNG_BIT_DEPTH_OFFSET] == 8
+        and png_header[PNG_COLOR_TYPE_OFFSET] in (PNG_RGB_COLOR_TYPE, PNG_RGBA_COLOR_TYPE)
+    )
@@ -8,6 +8,21 @@ DEFAULT_DATASET_CONFIG = DatasetConfig(imaging_library="opencv")
 
 @dataclass
 class Datagen:
-    def load(self, *dataset_sources: str, dataset_config: DatasetConfig = DEFAULT_DATASET_CONFIG) -> Dataset:
-        sources_repo = SourcesRepository(dataset_sources)
-        return Dataset(sources_repo=sources_repo, config=dataset_config)
+    def load(
+        self,
+        *dataset_sources: str,
+        dataset_config: DatasetConfig = DEFAULT_DATASET_CONFIG,
+        num_shards: int = 1,
+        shard_index: int = 0,
+    ) -> Dataset:
+        """
+        :param num_shards: Total number of shards, e.g. of distributed workers, see Dataset.shard
+        :param shard_index: Index of the shard to load, in range [0, num_shards).
+                            Only the shard's scenes are scanned, the others are only listed.
+        """
+        sources_repo = SourcesRepository(
+            dataset_sources,
+            cache_dir=dataset_config.cache_dir if dataset_config.use_manifest else None,
+            scan_workers=dataset_config.scan_workers,
+        )
+        return Dataset(sources_repo=sources_repo, config=dataset_config, num_shards=num_shards, shard_index=shard_index)
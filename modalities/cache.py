@@ -0,0 +1,130 @@
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+import numpy as np
+
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+    max_size: Optional[int]
+    max_entries: Optional[int]
+
+
+class LRUCache:
+    """
+    A thread safe least-recently-used cache, bounded by the total (estimated) size of its values in bytes
+    and/or by its number of entries.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+    ):
+        """
+        :param max_size: Maximal total size of the cached values in bytes, unbounded if None.
+        :param max_entries: Maximal number of cached values, unbounded if None.
+        :param sizeof: Estimates the size of a value in bytes, only called if max_size is set.
+        """
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._size = 0
+        self._hits = self._misses = self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: Hashable, create: Callable[[], V]) -> V:
+        """
+        :returns the cached value of the given key, or the (newly cached) value created by calling create.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        # Values are created outside the lock, so that creating values of different keys is concurrent.
+        value = create()
+        self._put(key, value)
+        return value
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        value_size = 0
+        if self.max_size is not None:
+            value_size = self._sizeof(value)
+            if value_size > self.max_size:
+                return
+        with self._lock:
+            previous_entry = self._entries.pop(key, None)
+            if previous_entry is not None:
+                self._size -= previous_entry[1]
+            self._entries[key] = (value, value_size)
+            self._size += value_size
+            while self._is_over_budget():
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+
+    def _is_over_budget(self) -> bool:
+        return (self.max_size is not None and self._size > self.max_size) or (
+            self.max_entries is not None and len(self._entries) > self.max_entries
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size=self._size,
+                max_size=self.max_size,
+                max_entries=self.max_entries,
+            )
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Estimates the memory (in bytes) used by an object and by every object it references, e.g. a parsed modality.
+    """
+    size, seen, objs = 0, set(), [obj]
+    while objs:
+        obj = objs.pop()
+        if id(obj) in seen or isinstance(obj, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, np.ndarray):
+            # Arrays which do not own their data are not accounted for it by getsizeof.
+            size += 0 if obj.flags.owndata else obj.nbytes
+        elif isinstance(obj, dict):
+            objs.extend(obj.keys())
+            objs.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            objs.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            objs.append(vars(obj))
+    return size
@@ -1,7 +1,15 @@
+from functools import partial
 from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
 from dependency_injector import containers, providers
 
+from datagen.imaging.base import Region, copy_into
 from datagen.imaging.opencv import OpenCVImagingLibrary
+from datagen.imaging.openexr import OpenEXRImagingLibrary
+from datagen.imaging.pillow import PillowImagingLibrary
+from datagen.modalities.listings import DirectoryListings
 from datagen.modalities import textual as textual_modalities
 
 
@@ -9,7 +17,12 @@ class VisualModalitiesContainer(containers.DeclarativeContainer):
 
     config = providers.Configuration()
 
-    imaging_library = providers.Selector(config, opencv=providers.Singleton(OpenCVImagingLibrary))
+    imaging_library = providers.Selector(
+        config,
+        opencv=providers.Singleton(OpenCVImagingLibrary),
+        pillow=providers.Singleton(PillowImagingLibrary),
+        openexr=providers.Singleton(OpenEXRImagingLibrary),
+    )
 
 
 def read_visual_modality(
@@ -17,18 +30,91 @@ def read_visual_modality(
     modality_file_path: str,
     keep_alpha: bool,
     convert_to_uint8: bool,
+    channel_order: str,
+    dtype: str,
+    reduction: int = 1,
+    roi: Optional[Region] = None,
 ):
-    return (
-        modalities_container.visual()
-        .imaging_library()
-        .read(image_file_path=modality_file_path, keep_alpha=keep_alpha, convert_to_uint8=convert_to_uint8)
+    read = partial(
+        modalities_container.visual().imaging_library().read,
+        image_file_path=modality_file_path,
+        keep_alpha=keep_alpha,
+        convert_to_uint8=convert_to_uint8,
+        channel_order=channel_order,
+        dtype=dtype,
+        reduction=reduction,
+        roi=roi,
     )
+    cache = modalities_container.visual_cache()
+    if cache is None:
+        return read()
+    # Scaled down images & regions are cached on their own, so that their full images needn't be.
+    cache_key = (modality_file_path, keep_alpha, convert_to_uint8, channel_order, dtype, reduction, roi)
+    return cache.get_or_create(cache_key, lambda: _as_read_only(read()))
+
+
+def read_visual_modality_into(
+    modalities_container: containers.DeclarativeContainer,
+    modality_file_path: str,
+    out: np.ndarray,
+    keep_alpha: bool,
+    convert_to_uint8: bool,
+    channel_order: str,
+    dtype: str,
+    reduction: int = 1,
+    roi: Optional[Region] = None,
+) -> np.ndarray:
+    """
+    Decodes a visual modality into the given buffer, unless it's cached - then it's copied from the cache.
+    """
+    if modalities_container.visual_cache() is not None:
+        img = read_visual_modality(
+            modalities_container, modality_file_path, keep_alpha, convert_to_uint8, channel_order, dtype, reduction, roi
+        )
+        copy_into(img, out)
+        return out
+    return modalities_container.visual().imaging_library().read_into(
+        modality_file_path,
+        out,
+        keep_alpha=keep_alpha,
+        convert_to_uint8=convert_to_uint8,
+        channel_order=channel_order,
+        dtype=dtype,
+        reduction=reduction,
+        roi=roi,
+    )
+
+
+def _as_read_only(img: np.ndarray) -> np.ndarray:
+    """
+    Cached images are shared by all of their readers, hence must not be modified in place.
+    """
+    img.flags.writeable = False
+    return img
 
 
 def read_textual_modality(
-    modalities_container: containers.DeclarativeContainer, modality_file_path: str, modality_factory_name: str
+    modalities_container: containers.DeclarativeContainer,
+    modality_file_path: str,
+    modality_factory_name: str,
+    extra_file_paths: Sequence[str] = (),
 ):
-    return modalities_container.textual().providers[modality_factory_name](modality_file_path=modality_file_path)
+    array_store = modalities_container.array_store()
+    if array_store is not None:
+        modality = array_store.read(modality_factory_name, modality_file_path)
+        if modality is not None:
+            return modality
+    read = partial(
+        modalities_container.textual().providers[modality_factory_name], modality_file_path=modality_file_path
+    )
+    sidecars = modalities_container.textual_sidecars()
+    if sidecars is not None:
+        modality_key = f"{modalities_container.config.environment()}.{modality_factory_name}"
+        read = partial(sidecars.get_or_create, modality_key, [modality_file_path, *extra_file_paths], read)
+    cache = modalities_container.textual_cache()
+    if cache is None:
+        return read()
+    return cache.get_or_create((modality_factory_name, modality_file_path), read)
 
 
 class DatapointModalitiesContainer(containers.DeclarativeContainer):
@@ -45,8 +131,20 @@ class DatapointModalitiesContainer(containers.DeclarativeContainer):
         identities=providers.Container(textual_modalities.IdentitiesModalitiesContainer),
     )
 
+    listings = providers.Singleton(DirectoryListings)
+
+    # Overridden by the dataset with its decoded visual modalities & parsed textual modalities caches, if enabled.
+    visual_cache = providers.Object(None)
+
+    textual_cache = providers.Object(None)
+
+    textual_sidecars = providers.Object(None)
+
+    # Overridden by the dataset with the array store its textual modalities are read from, if any.
+    array_store = providers.Object(None)
+
     read_visual_modality = providers.Callable(read_visual_modality, modalities_container=__self__)
 
-    read_textual_modality = providers.Callable(read_textual_modality, modalities_container=__self__)
+    read_visual_modality_into = providers.Callable(read_visual_modality_into, modalities_container=__self__)
 
-    wiring_config = containers.WiringConfiguration(packages=[textual_modalities])
+    read_textual_modality = providers.Callable(read_textual_modality, modalities_container=__self__)
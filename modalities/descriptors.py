@@ -1,6 +1,11 @@
 import abc
 from dataclasses import dataclass
-from typing import Type, Optional
+from pathlib import Path
+from typing import Tuple, Type, Optional
+
+import numpy as np
+
+from datagen.imaging.base import ImageDType, Region
 
 
 class ModalityFileNotFoundError(RuntimeError):
@@ -17,21 +22,36 @@ class ModalityDescriptor(abc.ABC):
         self._fget = fget
 
     def __get__(self, dp, *args):
+        if dp is None:
+            return self
         modality = self._fget(dp)
         modality_file_path = self._get_modality_file_path(dp, modality)
         return self._read(dp, modality, modality_file_path)
 
+    def get_modality(self, dp) -> Modality:
+        """
+        :returns the given datapoint's modality definition (file name, factory, etc.), without reading it.
+        """
+        return self._fget(dp)
+
+    def get_file_path(self, dp) -> Optional[str]:
+        """
+        :returns the path of the file this modality is read from for the given datapoint, without reading it.
+        """
+        return self._get_modality_file_path(dp, self._fget(dp))
+
     @staticmethod
     def _get_modality_file_path(dp, modality: Modality) -> str:
         modality_file_path = None
+        listings = dp.modalities_container.listings()
         camera_modality_path = dp.camera_path.joinpath(modality.file_name)
         frame_modality_path = dp.frame_path.joinpath(modality.file_name)
         scene_modality_path = dp.scene_path.joinpath(modality.file_name)
-        if camera_modality_path.exists():
+        if listings.exists(camera_modality_path):
             modality_file_path = camera_modality_path
-        elif frame_modality_path.exists():
+        elif listings.exists(frame_modality_path):
             modality_file_path = frame_modality_path
-        elif scene_modality_path.exists():
+        elif listings.exists(scene_modality_path):
             modality_file_path = scene_modality_path
         return str(modality_file_path) if modality_file_path is not None else None
 
@@ -50,6 +70,8 @@ class ModalityPreProcess(abc.ABC):
 class TextualModality(Modality):
     factory_name: str
     pre_process: Optional[ModalityPreProcess] = None
+    # Other files next to the modality's file it's parsed from, e.g. the dense keypoints file of v1 keypoints
+    extra_file_names: Tuple[str, ...] = ()
 
 
 class TextualModalityDescriptor(ModalityDescriptor):
@@ -59,8 +81,11 @@ class TextualModalityDescriptor(ModalityDescriptor):
         if modality_file_path is None:
             ModalityFileNotFoundError(f"'{modality.file_name}' not found for datapoint {dp}")
         else:
+            extra_file_paths = [str(Path(modality_file_path).with_name(name)) for name in modality.extra_file_names]
             return dp.modalities_container.read_textual_modality(
-                modality_file_path=modality_file_path, modality_factory_name=modality.factory_name
+                modality_file_path=modality_file_path,
+                modality_factory_name=modality.factory_name,
+                extra_file_paths=extra_file_paths,
             )
 
 
@@ -68,15 +93,90 @@ class TextualModalityDescriptor(ModalityDescriptor):
 class VisualModality(Modality):
     keep_alpha: bool = False
     convert_to_uint8: bool = False
+    # "rgb" or "bgr", None for the dataset's channel order (DatasetConfig.channel_order)
+    channel_order: Optional[str] = None
+    # "native", "uint8", "float16" or "float32", None for the dataset's policy (DatasetConfig.visual_dtypes)
+    dtype: Optional[str] = None
+    # 1, 2, 4 or 8 - the factor it's scaled down by, None for the dataset's (DatasetConfig.visual_reductions)
+    reduction: Optional[int] = None
 
 
 class VisualModalityDescriptor(ModalityDescriptor):
+    def get_channel_order(self, dp) -> str:
+        """
+        :returns the order of the color channels the given datapoint's modality is read in - "rgb" or "bgr".
+        """
+        return self._get_channel_order(dp, self._fget(dp))
+
+    @staticmethod
+    def _get_channel_order(dp, modality: VisualModality) -> str:
+        if modality.channel_order is not None:
+            return modality.channel_order
+        return dp.modalities_container.config.channel_order()
+
+    def _get_dtype(self, dp, modality: VisualModality) -> str:
+        if modality.dtype is not None:
+            return modality.dtype
+        return dp.modalities_container.config.visual_dtypes().get(self._fget.__name__, ImageDType.NATIVE.value)
+
+    def _get_reduction(self, dp, modality: VisualModality) -> int:
+        if modality.reduction is not None:
+            return modality.reduction
+        return dp.modalities_container.config.visual_reductions().get(self._fget.__name__, 1)
+
+    def read(self, dp, reduction: Optional[int] = None, roi: Optional[Region] = None) -> Optional[np.ndarray]:
+        """
+        Reads the given datapoint's modality with other options than its own, e.g. only a region of it -
+        which is then converted & cached on its own, rather than as a full image.
+        :param reduction: 1, 2, 4 or 8 - the factor it's scaled down by, defaults to the modality's
+        :param roi: (min_x, min_y, max_x, max_y) - a region of its full resolution's pixels, excluding the max ones
+        :returns the image, or None if the datapoint has no such modality.
+        """
+        modality = self._fget(dp)
+        modality_file_path = self._get_modality_file_path(dp, modality)
+        if modality_file_path is None:
+            return None
+        return self._read_visual(dp, modality, modality_file_path, reduction, None if roi is None else tuple(roi))
+
+    def read_into(self, dp, out: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Reads the given datapoint's modality into a buffer of its shape & dtype rather than a new array.
+        :returns out, or None if the datapoint has no such modality.
+        """
+        modality = self._fget(dp)
+        modality_file_path = self._get_modality_file_path(dp, modality)
+        if modality_file_path is None:
+            return None
+        return dp.modalities_container.read_visual_modality_into(
+            modality_file_path=modality_file_path,
+            out=out,
+            keep_alpha=modality.keep_alpha,
+            convert_to_uint8=modality.convert_to_uint8,
+            channel_order=self._get_channel_order(dp, modality),
+            dtype=self._get_dtype(dp, modality),
+            reduction=self._get_reduction(dp, modality),
+        )
+
     def _read(self, dp, modality: VisualModality, modality_file_path: str):
         if modality_file_path is None:
             return None
         else:
-            return dp.modalities_container.read_visual_modality(
-                modality_file_path=modality_file_path,
-                keep_alpha=modality.keep_alpha,
-                convert_to_uint8=modality.convert_to_uint8,
-            )
+            return self._read_visual(dp, modality, modality_file_path)
+
+    def _read_visual(
+        self,
+        dp,
+        modality: VisualModality,
+        modality_file_path: str,
+        reduction: Optional[int] = None,
+        roi: Optional[Region] = None,
+    ) -> np.ndarray:
+        return dp.modalities_container.read_visual_modality(
+            modality_file_path=modality_file_path,
+            keep_alpha=modality.keep_alpha,
+            convert_to_uint8=modality.convert_to_uint8,
+            channel_order=self._get_channel_order(dp, modality),
+            dtype=self._get_dtype(dp, modality),
+            reduction=self._get_reduction(dp, modality) if reduction is None else reduction,
+            roi=roi,
+        )
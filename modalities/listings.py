@@ -0,0 +1,49 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional
+
+
+class DirectoryListings:
+    """
+    A cache of directories' entries names, so that checking whether a modality file exists is a lookup
+    instead of a stat - each directory is listed once, on its first lookup.
+    Directories which do not exist are cached as empty.
+    """
+
+    def __init__(self):
+        self._listings: Dict[str, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    def exists(self, path: Path) -> bool:
+        return path.name in self.list(path.parent)
+
+    def list(self, dir_path: Path) -> FrozenSet[str]:
+        key = str(dir_path)
+        listing = self._listings.get(key)
+        if listing is None:
+            listing = self._list(key)
+            with self._lock:
+                self._listings[key] = listing
+        return listing
+
+    @staticmethod
+    def _list(dir_path: str) -> FrozenSet[str]:
+        try:
+            with os.scandir(dir_path) as entries:
+                return frozenset(entry.name for entry in entries)
+        except (FileNotFoundError, NotADirectoryError):
+            return frozenset()
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """
+        :param path: A directory whose listing, and the listings of every directory under it, should be forgotten.
+        If not given, all listings are forgotten.
+        """
+        with self._lock:
+            if path is None:
+                self._listings.clear()
+                return
+            key = str(path)
+            for dir_path in [p for p in self._listings if p == key or p.startswith(key + os.sep)]:
+                del self._listings[dir_path]
@@ -0,0 +1,195 @@
+import dataclasses
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from datagen.dev.logging import get_logger
+
+logger = get_logger(__name__)
+
+SIDECARS_DIR_NAME = "modalities"
+
+SIDECAR_SUFFIX = ".npz"
+
+# Part of the sidecars' keys - bump it whenever the sidecars' encoding or the classes of the modalities change,
+# so that the sidecars created before are ignored rather than rebuilt into objects of outdated classes.
+SIDECAR_FORMAT_VERSION = 1
+
+SIDECAR_STRUCTURE_KEY = "structure"
+
+SIDECAR_SCALAR_TYPES = (bool, int, float, str)
+
+# Only classes of the SDK's own modules are rebuilt from sidecars.
+SIDECAR_CLASSES_PACKAGE = "datagen"
+
+
+class SidecarEncodingError(ValueError):
+    """
+    Raised for modalities holding values which sidecars don't store, e.g. objects of classes outside the SDK.
+    """
+
+
+class SidecarCache:
+    """
+    An on-disk cache of parsed textual modalities, stored in a binary form (arrays as raw buffers),
+    so that later runs load them instead of parsing their JSON files again.
+    Sidecars are keyed by the modality files' paths, modification times and sizes, so a modified file is parsed again.
+    Sidecars are .npz files of the modality's arrays & a JSON description of its structure, loaded without pickle,
+    hence reading a sidecar written by someone else never runs code - at most it rebuilds the SDK's own classes.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.path = Path(cache_dir).joinpath(SIDECARS_DIR_NAME)
+        self._unsupported_modalities = set()
+
+    def get_or_create(self, modality_key: str, source_paths: Sequence[str], create: Callable[[], Any]) -> Any:
+        """
+        :param modality_key: Identifies the way the files are parsed, e.g. their modality factory's name.
+        :param source_paths: The files the modality is parsed from, e.g. the standard & dense files of v1 keypoints.
+        """
+        if modality_key in self._unsupported_modalities:
+            return create()
+        sidecar_path = self._get_sidecar_path(modality_key, source_paths)
+        if sidecar_path is None:
+            return create()
+        modality = self._read(sidecar_path)
+        if modality is None:
+            modality = create()
+            self._write(sidecar_path, modality_key, modality)
+        return modality
+
+    def _get_sidecar_path(self, modality_key: str, source_paths: Sequence[str]) -> Optional[Path]:
+        key = [str(SIDECAR_FORMAT_VERSION), modality_key]
+        for source_path in source_paths:
+            try:
+                stat = os.stat(source_path)
+            except OSError:
+                return None
+            key.append(f"{os.path.abspath(source_path)}:{stat.st_mtime_ns}:{stat.st_size}")
+        sidecar_name = hashlib.sha1(":".join(key).encode()).hexdigest()
+        return self.path.joinpath(sidecar_name[:2], sidecar_name + SIDECAR_SUFFIX)
+
+    @staticmethod
+    def _read(sidecar_path: Path) -> Any:
+        try:
+            with np.load(sidecar_path, allow_pickle=False) as sidecar:
+                arrays = {key: sidecar[key] for key in sidecar.files}
+            structure = json.loads(str(arrays.pop(SIDECAR_STRUCTURE_KEY)))
+            return decode(structure, arrays)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable sidecar '{sidecar_path}': {e}")
+            return None
+
+    def _write(self, sidecar_path: Path, modality_key: str, modality: Any) -> None:
+        try:
+            arrays = {}
+            structure = encode(modality, arrays)
+        except SidecarEncodingError as e:
+            # Logged once, since none of the modality's files can be stored.
+            self._unsupported_modalities.add(modality_key)
+            logger.warning(f"'{modality_key}' modalities are not cached in sidecars: {e}")
+            return
+        temp_path = None
+        try:
+            sidecar_path.parent.mkdir(parents=True, exist_ok=True)
+            # Written to a temporary file first, so concurrent readers never see a partial sidecar.
+            with tempfile.NamedTemporaryFile(dir=sidecar_path.parent, suffix=SIDECAR_SUFFIX, delete=False) as f:
+                temp_path = f.name
+                np.savez(f, **{SIDECAR_STRUCTURE_KEY: np.array(json.dumps(structure))}, **arrays)
+            os.replace(temp_path, sidecar_path)
+        except OSError as e:
+            logger.warning(f"Could not write sidecar '{sidecar_path}': {e}")
+            if temp_path is not None:
+                with suppress(OSError):
+                    os.remove(temp_path)
+
+
+def encode(modality: Any, arrays: Dict[str, np.ndarray]) -> Any:
+    """
+    :param arrays: Filled with the modality's arrays, by the keys the returned structure refers to them by
+    :returns the JSON serializable structure of the modality -
+    its plain values, containers & objects of the SDK's classes
+    :raises SidecarEncodingError: For values of other types, e.g. object arrays or classes outside the SDK
+    """
+    if modality is None or type(modality) in SIDECAR_SCALAR_TYPES:
+        return modality
+    if isinstance(modality, (np.ndarray, np.generic)):
+        if modality.dtype.hasobject:
+            raise SidecarEncodingError(f"Arrays of objects are not supported: {modality.dtype}")
+        array_key = str(len(arrays))
+        arrays[array_key] = np.asarray(modality)
+        return {"array" if isinstance(modality, np.ndarray) else "scalar": array_key}
+    if type(modality) in (list, tuple):
+        return {type(modality).__name__: [encode(item, arrays) for item in modality]}
+    if type(modality) is dict:
+        return {"dict": [[encode(key, arrays), encode(value, arrays)] for key, value in modality.items()]}
+    class_name = _get_class_name(type(modality))
+    if dataclasses.is_dataclass(modality):
+        # Only the fields - other attributes (e.g. the named segments' indexes) are recreated by __post_init__.
+        fields = dataclasses.fields(modality)
+        return {
+            "dataclass": class_name,
+            "fields": {field_.name: encode(modality.__dict__[field_.name], arrays) for field_ in fields},
+        }
+    if hasattr(modality, "__dict__"):
+        return {"object": class_name, "fields": {name: encode(value, arrays) for name, value in vars(modality).items()}}
+    raise SidecarEncodingError(f"Unsupported type: {type(modality)}")
+
+
+def decode(structure: Any, arrays: Dict[str, np.ndarray]) -> Any:
+    """
+    The inverse of encode
+    """
+    if not isinstance(structure, dict):
+        return structure
+    kind, value = next(iter(structure.items()))
+    if kind == "array":
+        return arrays[value]
+    if kind == "scalar":
+        return arrays[value][()]
+    if kind in ("list", "tuple"):
+        items = [decode(item, arrays) for item in value]
+        return items if kind == "list" else tuple(items)
+    if kind == "dict":
+        return {decode(key, arrays): decode(item, arrays) for key, item in value}
+    clazz = _get_class(value)
+    if kind == "dataclass" and not dataclasses.is_dataclass(clazz):
+        raise SidecarEncodingError(f"Not a dataclass: {value}")
+    # Set rather than passed to __init__, so that fields which aren't init arguments are rebuilt as well.
+    modality = object.__new__(clazz)
+    modality.__dict__.update((name, decode(field_value, arrays)) for name, field_value in structure["fields"].items())
+    if kind == "dataclass" and hasattr(modality, "__post_init__"):
+        modality.__post_init__()
+    return modality
+
+
+def _get_class_name(clazz: type) -> str:
+    module = clazz.__module__
+    if not _is_sdk_module(module) or "<" in clazz.__qualname__:
+        raise SidecarEncodingError(f"Unsupported class: {module}.{clazz.__qualname__}")
+    return f"{module}:{clazz.__qualname__}"
+
+
+def _get_class(class_name: str) -> type:
+    module_name, qualname = class_name.split(":")
+    if not _is_sdk_module(module_name):
+        raise SidecarEncodingError(f"Unsupported class: {class_name}")
+    clazz = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        clazz = getattr(clazz, name)
+    if not isinstance(clazz, type):
+        raise SidecarEncodingError(f"Not a class: {class_name}")
+    return clazz
+
+
+def _is_sdk_module(module_name: str) -> bool:
+    return module_name == SIDECAR_CLASSES_PACKAGE or module_name.startswith(f"{SIDECAR_CLASSES_PACKAGE}.")
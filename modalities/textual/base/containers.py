@@ -1,25 +1,26 @@
-import json
-from functools import lru_cache, partial
+from functools import partial
 
 from dependency_injector import containers, providers
 from packaging import version
 
+from datagen.dev import json_backends
+from datagen.modalities.textual.common.keypoints import KeypointsDecoder, UnsupportedKeypointsError
+from datagen.modalities.textual.common.schemas import get_schema
+
 INITIAL_MODALITIES_VERSION = "1.0.0"
 
 
-@lru_cache(maxsize=None)
 def modality_factory(modality_container: providers.Container, modality_file_path: str):
     """
-    Important - Please note this function caches its return values!
+    Parses a modality file, the parsed modalities are cached by the datapoints' modalities container.
     """
     modality_dict, modality_version = _parse_modality_file(modality_file_path)
     return modality_container.create(modality_version, modality_dict=modality_dict)
 
 
 def _parse_modality_file(modality_file_path: str) -> tuple:
-    with open(modality_file_path) as f:
-        modality_params = json.load(f)
-        modality_version = _get_modality_version(modality_params)
+    modality_params = json_backends.load_file(modality_file_path)
+    modality_version = _get_modality_version(modality_params)
     return modality_params, modality_version
 
 
@@ -30,12 +31,25 @@ def _get_modality_version(modality_params: dict) -> int:
 
 
 def load_dataclass(clazz: type, modality_dict: dict):
-    return clazz.Schema().load(modality_dict)
+    return get_schema(clazz)().load(modality_dict)
 
 
 modality_dataclass_factory = partial(providers.Factory, load_dataclass)
 
 
+def load_keypoints(clazz: type, decode: KeypointsDecoder, modality_dict: dict):
+    """
+    Keypoints files are large, hence decoded without their schema unless their structure is unexpected.
+    """
+    try:
+        return decode(modality_dict)
+    except UnsupportedKeypointsError:
+        return load_dataclass(clazz, modality_dict)
+
+
+modality_keypoints_factory = partial(providers.Factory, load_keypoints)
+
+
 def load_pydantic_obj(clazz: type, modality_dict: dict):
     return clazz.parse_obj(modality_dict)
 
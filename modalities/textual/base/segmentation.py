@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import TypeVar, Optional, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple, TypeVar
 
 import marshmallow
 import marshmallow_dataclass
@@ -7,8 +7,16 @@ import numpy as np
 from marshmallow import pre_load
 from marshmallow.fields import Field
 
+from datagen.imaging.base import ChannelOrder
+from datagen.modalities.textual.common.segments import NamedSegments
+
 SubSegments = TypeVar("SubSegments")
 
+# The class id of pixels whose color is not one of the labeled segments'
+UNLABELED_CLASS_ID = 0
+
+MAX_CLASS_ID = np.iinfo(np.uint16).max
+
 
 @dataclass
 class _Segment:
@@ -16,19 +24,12 @@ class _Segment:
 
 
 @dataclass
-class NestedSegment(_Segment):
+class NestedSegment(_Segment, NamedSegments):
     sub_segments: Optional[SubSegments]
 
-    def __getattr__(self, item):
-        for sub_seg in self.sub_segments:
-            if sub_seg.name == item:
-                if isinstance(sub_seg, ColoredSegment):
-                    return sub_seg.color
-                else:
-                    return sub_seg
-
-    def __dir__(self) -> Iterable[str]:
-        return [seg.name for seg in self.sub_segments]
+    @staticmethod
+    def _resolve(segment: _Segment) -> Any:
+        return _resolve_segment(segment)
 
 
 @dataclass
@@ -59,20 +60,100 @@ class SegmentSchema(marshmallow.Schema):
 
 
 @marshmallow_dataclass.dataclass(base_schema=SegmentSchema)
-class Segmentation:
+class Segmentation(NamedSegments):
     scene: SubSegments
 
+    _segments_field = "scene"
+
     @pre_load
     def rearrange_fields(self, in_data: dict, **kwargs) -> dict:
         return {"scene": in_data}
 
-    def __getattr__(self, item):
-        for sub_seg in self.scene:
-            if sub_seg.name == item:
-                if isinstance(sub_seg, ColoredSegment):
-                    return sub_seg.color
-                else:
-                    return sub_seg
-
-    def __dir__(self) -> Iterable[str]:
-        return [seg.name for seg in self.scene]
\ No newline at end of file
+    @staticmethod
+    def _resolve(segment: _Segment) -> Any:
+        return _resolve_segment(segment)
+
+    def get_labels(self, segments: Optional[Sequence[str]] = None) -> "SegmentationLabels":
+        """
+        :param segments: Paths of the colored segments to label (e.g. ["human/head", "background"]), their class ids
+        are their positions + 1, so they are kept across datapoints. Defaults to all of the colored segments, in the
+        tree's order.
+        :returns the lookup table from the segmentation image's colors to class ids, computed once per segments.
+        """
+        key = tuple(segments) if segments is not None else None
+        labels_cache = self.__dict__.setdefault("_labels_cache", {})
+        labels = labels_cache.get(key)
+        if labels is None:
+            labels = labels_cache[key] = SegmentationLabels.create(self._get_colored_segments(key))
+        return labels
+
+    def _get_colored_segments(self, segments: Optional[Tuple[str, ...]]) -> Dict[str, np.ndarray]:
+        paths_index = self._get_paths_index()
+        if segments is None:
+            segments = [path for path, segment in paths_index.items() if isinstance(segment, ColoredSegment)]
+        colored_segments = {}
+        for path in segments:
+            color = self[path]
+            if not isinstance(color, np.ndarray):
+                raise ValueError(f"'{path}' is not a colored segment")
+            colored_segments[path] = color
+        return colored_segments
+
+
+@dataclass(frozen=True)
+class SegmentationLabels:
+    """
+    Maps a segmentation image's colors to class ids in a single vectorized pass - every pixel's RGB is packed into
+    one integer, which is searched for in the table's sorted packed colors.
+    """
+
+    # The class ids' segments' paths, e.g. {1: "human/head"}
+    segments: Dict[int, str]
+    colors: np.ndarray = field(repr=False)
+    class_ids: np.ndarray = field(repr=False)
+
+    @classmethod
+    def create(cls, colored_segments: Dict[str, np.ndarray]) -> "SegmentationLabels":
+        if len(colored_segments) > MAX_CLASS_ID:
+            raise ValueError(f"Too many segments for uint16 class ids: {len(colored_segments)}")
+        segments = {class_id: path for class_id, path in enumerate(colored_segments, start=UNLABELED_CLASS_ID + 1)}
+        colors = _pack_rgb(np.array(list(colored_segments.values()), dtype=np.uint32).reshape(-1, 3))
+        # A stable sort, so that segments sharing a color are labeled as the first of them.
+        order = np.argsort(colors, kind="stable")
+        colors, class_ids = colors[order], np.array(list(segments), dtype=np.uint16)[order]
+        unique = np.ones(len(colors), dtype=bool)
+        unique[1:] = colors[1:] != colors[:-1]
+        return cls(segments=segments, colors=colors[unique], class_ids=class_ids[unique])
+
+    def apply(self, img: np.ndarray, channel_order: str = ChannelOrder.RGB.value) -> np.ndarray:
+        """
+        :param img: A (H,W,3+) segmentation image, either uint8, uint16 or normalized to [0, 1] (ImageDType floats)
+        :param channel_order: The image's channel order, "rgb" or "bgr"
+        :returns a (H,W) uint16 map of the pixels' class ids, 0 for colors of no labeled segment
+        """
+        # BGR images are packed through a reversed view, rather than a reordered copy.
+        img = img[..., 2::-1] if ChannelOrder(channel_order) == ChannelOrder.BGR else img[..., :3]
+        if img.dtype == np.uint16:
+            img = img >> 8
+        elif img.dtype.kind == "f":
+            img = np.rint(img * np.float32(255)).astype(np.uint8)
+        packed = _pack_rgb(img)
+        if len(self.colors) == 0:
+            return np.full(packed.shape, UNLABELED_CLASS_ID, dtype=np.uint16)
+        idx = np.searchsorted(self.colors, packed)
+        np.minimum(idx, len(self.colors) - 1, out=idx)
+        return np.where(self.colors[idx] == packed, self.class_ids[idx], np.uint16(UNLABELED_CLASS_ID))
+
+
+def _pack_rgb(rgb: np.ndarray) -> np.ndarray:
+    packed = rgb[..., 0].astype(np.uint32) << 16
+    packed |= rgb[..., 1].astype(np.uint32) << 8
+    packed |= rgb[..., 2]
+    return packed
+
+
+def _resolve_segment(segment: _Segment) -> Any:
+    """
+    Colored segments are accessed as their colors.
+    """
+    return segment.color if isinstance(segment, ColoredSegment) else segment
@@ -0,0 +1,53 @@
+import dataclasses
+from typing import Any, Iterator, List, Tuple
+
+import numpy as np
+
+from datagen.modalities.textual.common.segments import SEGMENTS_PATH_SEPARATOR
+
+# Segments' names are already part of their arrays' paths, their containers are not.
+SEGMENTS_CONTAINERS_FIELDS = ("scene", "sub_segments")
+
+SCALAR_TYPES = (bool, int, float, str)
+
+Leaves = List[Tuple[str, np.ndarray]]
+
+
+def flatten(modality: Any, path: str = "", scalars: bool = True) -> Leaves:
+    """
+    :param scalars: Whether to include the modality's scalars (as 0-d arrays) or only its arrays
+    :returns the leaves of a textual modality by their paths, in a deterministic order.
+    Named segments (e.g. keypoints) are addressed by their names - "face/dense/coords_2d", other lists' items
+    by their indices. Any other value (e.g. None) is skipped.
+    """
+    if isinstance(modality, np.ndarray):
+        return [(path, modality)]
+    if isinstance(modality, SCALAR_TYPES):
+        return [(path, np.asarray(modality))] if scalars else []
+    leaves = []
+    for name, value in iter_children(modality):
+        leaves.extend(flatten(value, _join(path, name), scalars))
+    return leaves
+
+
+def iter_children(modality: Any) -> Iterator[Tuple[str, Any]]:
+    """
+    :returns the (name, value) pairs of the modality's items / fields, segments containers are named ""
+    """
+    if isinstance(modality, (list, tuple)):
+        names = [getattr(item, "name", None) for item in modality]
+        if not all(isinstance(name, str) for name in names) or len(set(names)) != len(names):
+            names = [str(item_idx) for item_idx in range(len(modality))]
+        yield from zip(names, modality)
+    elif isinstance(modality, dict):
+        yield from ((str(key), value) for key, value in modality.items())
+    elif dataclasses.is_dataclass(modality):
+        for field_ in dataclasses.fields(modality):
+            name = "" if field_.name in SEGMENTS_CONTAINERS_FIELDS else field_.name
+            yield name, modality.__dict__[field_.name]
+
+
+def _join(path: str, name: str) -> str:
+    if not name:
+        return path
+    return f"{path}{SEGMENTS_PATH_SEPARATOR}{name}" if path else name
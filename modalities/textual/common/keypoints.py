@@ -0,0 +1,91 @@
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+from datagen.dev import json_backends
+from datagen.dev.benchmarks import DEFAULT_BENCHMARK_REPEAT, benchmark
+from datagen.modalities.textual.common.schemas import get_schema
+
+KeypointsDecoder = Callable[[dict], Any]
+
+
+class UnsupportedKeypointsError(ValueError):
+    """
+    Raised by the keypoints decoders for structures they don't handle, which are then left to the schemas.
+    """
+
+
+def is_keypoints_matrix(segment: dict) -> bool:
+    return len(segment) > 0 and all(key.isnumeric() for key in segment)
+
+
+def sort_keypoints(kp_num_to_kp_coords: dict) -> List[dict]:
+    return [kp_num_to_kp_coords[kp_num] for kp_num in sorted(kp_num_to_kp_coords, key=int)]
+
+
+def decode_coords_matrices(keypoints: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :returns the (N, 2) pixel coordinates & (N, 3) global coordinates of the keypoints,
+    each created at once from a flat list of all of them. Their dtype is inferred as the schemas' NumpyArray does -
+    int64 if all the coordinates are integers, float64 otherwise.
+    """
+    try:
+        coords_2d = _decode_coords_matrix(map(itemgetter("pixel_2d"), keypoints), ("x", "y"), len(keypoints))
+        coords_3d = _decode_coords_matrix(map(itemgetter("global_3d"), keypoints), ("x", "y", "z"), len(keypoints))
+    except (KeyError, TypeError, ValueError) as e:
+        raise UnsupportedKeypointsError(f"Unsupported keypoints coordinates: {e}") from e
+    return coords_2d, coords_3d
+
+
+def _decode_coords_matrix(coords: Iterable[dict], axes: Tuple[str, ...], num_keypoints: int) -> np.ndarray:
+    matrix = np.array(list(chain.from_iterable(map(itemgetter(*axes), coords))))
+    if matrix.dtype.kind not in "biuf":
+        raise ValueError(f"Non numeric coordinates: {matrix.dtype}")
+    return matrix.reshape(num_keypoints, len(axes))
+
+
+def decode_visibility(keypoints: List[dict]) -> np.ndarray:
+    try:
+        return np.fromiter((kp["is_visible"] == "true" for kp in keypoints), dtype=bool, count=len(keypoints))
+    except KeyError as e:
+        raise UnsupportedKeypointsError(f"Unsupported keypoints visibility: {e}") from e
+
+
+def decode_coords(coords: Any) -> np.ndarray:
+    """
+    Decodes a single keypoint's {"x": .., "y": .., ["z": ..]} coordinates, as NumpyArray does.
+    """
+    if not isinstance(coords, dict) or set(coords) not in ({"x", "y"}, {"x", "y", "z"}):
+        raise UnsupportedKeypointsError(f"Unsupported keypoint coordinates: {coords}")
+    return np.array([coords["x"], coords["y"], coords["z"]] if "z" in coords else [coords["x"], coords["y"]])
+
+
+def benchmark_decoder(
+    keypoints_cls: type,
+    decode: KeypointsDecoder,
+    files_paths: Iterable[Union[str, Path]],
+    repeat: int = DEFAULT_BENCHMARK_REPEAT,
+) -> Dict[str, float]:
+    """
+    Compares a keypoints decoder to its marshmallow schema on the given keypoints files.
+    Both start from the files' (unparsed) contents, since the schemas modify the dicts they load.
+    :returns the seconds each of them took to load all of the files, fastest first.
+    """
+    files_contents = [Path(path).read_bytes() for path in files_paths]
+    return benchmark(
+        {
+            "marshmallow": lambda content: get_schema(keypoints_cls)().load(_load_keypoints_dict(content)),
+            "decoder": lambda content: decode(_load_keypoints_dict(content)),
+        },
+        files_contents,
+        repeat=repeat,
+    )
+
+
+def _load_keypoints_dict(content: bytes) -> dict:
+    keypoints_dict = json_backends.loads(content)
+    keypoints_dict.pop("version", None)
+    return keypoints_dict
@@ -0,0 +1,15 @@
+import threading
+from typing import Type
+
+import marshmallow
+
+_schemas_lock = threading.RLock()
+
+
+def get_schema(clazz: type) -> Type[marshmallow.Schema]:
+    """
+    :returns the marshmallow_dataclass Schema of the given dataclass.
+    The Schema is created on its first access, which isn't thread safe - concurrent first accesses get its name.
+    """
+    with _schemas_lock:
+        return clazz.Schema
@@ -0,0 +1,90 @@
+from typing import Any, Dict, Iterable
+
+SEGMENTS_PATH_SEPARATOR = "/"
+
+
+class SegmentNotFoundError(AttributeError, KeyError):
+    """
+    Raised for names & paths of segments which are not in the tree,
+    both as an AttributeError (kp.face.mouth) and as a KeyError (kp["face/mouth"]).
+    """
+
+    def __str__(self):
+        return str(self.args[0]) if self.args else ""
+
+
+def check_segment_name(item: str) -> None:
+    """
+    Rejects dunder names in the segments trees' __getattr__, which would otherwise look them up as segments -
+    e.g. __setstate__ while unpickling, before the segments are set.
+    """
+    if item.startswith("__"):
+        raise AttributeError(item)
+
+
+class NamedSegments:
+    """
+    A mixin of segments trees (keypoints, segmentation), whose sub segments are accessed by their names -
+    kp.face.dense, or by their paths - kp["face/dense"]. Both are dict lookups, indexed once the tree is created,
+    hence the sub segments must not be added or renamed afterwards.
+    """
+
+    # The dataclass field of the sub segments list
+    _segments_field = "sub_segments"
+
+    def __post_init__(self):
+        self._get_segments_index()
+
+    def __getattr__(self, item):
+        check_segment_name(item)
+        try:
+            segment = self._get_segments_index()[item]
+        except KeyError:
+            raise SegmentNotFoundError(
+                f"No '{item}' segment in {self._describe()}, segments: {list(self._get_segments_index())}"
+            ) from None
+        return self._resolve(segment)
+
+    def __getitem__(self, path: str):
+        """
+        :param path: Names of nested segments, separated by "/" - e.g. "face/dense"
+        """
+        try:
+            segment = self._get_paths_index()[path]
+        except KeyError:
+            raise SegmentNotFoundError(f"No '{path}' segment in {self._describe()}") from None
+        return self._resolve(segment)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._get_paths_index()
+
+    def __dir__(self) -> Iterable[str]:
+        return list(self._get_segments_index())
+
+    @staticmethod
+    def _resolve(segment: Any) -> Any:
+        return segment
+
+    def _describe(self) -> str:
+        name = self.__dict__.get("name")
+        return f"'{name}'" if name is not None else type(self).__name__
+
+    def _get_segments_index(self) -> Dict[str, Any]:
+        # Accessed through __dict__, a missing attribute would recurse into __getattr__.
+        segments_index = self.__dict__.get("_segments_index")
+        if segments_index is None:
+            sub_segments = self.__dict__.get(self._segments_field) or []
+            segments_index = self.__dict__["_segments_index"] = {seg.name: seg for seg in sub_segments}
+        return segments_index
+
+    def _get_paths_index(self) -> Dict[str, Any]:
+        paths_index = self.__dict__.get("_paths_index")
+        if paths_index is None:
+            paths_index = {}
+            for name, segment in self._get_segments_index().items():
+                paths_index[name] = segment
+                if isinstance(segment, NamedSegments):
+                    for sub_path, sub_segment in segment._get_paths_index().items():
+                        paths_index[f"{name}{SEGMENTS_PATH_SEPARATOR}{sub_path}"] = sub_segment
+            self.__dict__["_paths_index"] = paths_index
+        return paths_index
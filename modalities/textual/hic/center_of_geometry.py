@@ -5,6 +5,7 @@ import marshmallow_dataclass
 from marshmallow import fields, pre_load
 
 from datagen.modalities.textual.common.ndarray import NumpyArray
+from datagen.modalities.textual.common.schemas import get_schema
 
 
 @marshmallow_dataclass.dataclass
@@ -25,7 +26,7 @@ class ObjectCenterOfGeometry:
 
 class ObjectCenterOfGeometryField(fields.Field):
     def _deserialize(self, value, *args, **kwargs):
-        return ObjectCenterOfGeometry.Schema().load(value)
+        return get_schema(ObjectCenterOfGeometry)().load(value)
 
 
 @marshmallow_dataclass.dataclass
@@ -4,6 +4,7 @@ from datagen.modalities.textual.base.containers import (
     BaseModalitiesContainer,
     modality_dataclass_factory,
     modality_factory,
+    modality_keypoints_factory,
 )
 
 
@@ -16,10 +17,13 @@ class ActorsModalityContainer(containers.DeclarativeContainer):
 
 class KeypointsModalityContainer(containers.DeclarativeContainer):
 
-    from .keypoints import Keypoints
+    from .keypoints import Keypoints, decode
 
     create = providers.FactoryAggregate(
-        {1: modality_dataclass_factory(clazz=Keypoints), 2: modality_dataclass_factory(clazz=Keypoints)}
+        {
+            1: modality_keypoints_factory(clazz=Keypoints, decode=decode),
+            2: modality_keypoints_factory(clazz=Keypoints, decode=decode),
+        }
     )
 
 
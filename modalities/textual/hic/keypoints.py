@@ -1,12 +1,25 @@
 from dataclasses import field
-from typing import TypeVar, Optional, Generator, Iterable
+from typing import TypeVar, Optional, Generator, List, Union
 
 import marshmallow
 import marshmallow_dataclass
 from marshmallow import pre_load, ValidationError
 from marshmallow.fields import Field
 
+from datagen.modalities.textual.common.keypoints import (
+    UnsupportedKeypointsError,
+    decode_coords,
+    decode_coords_matrices,
+    is_keypoints_matrix,
+    sort_keypoints,
+)
 from datagen.modalities.textual.common.ndarray import NumpyArray
+from datagen.modalities.textual.common.schemas import get_schema
+from datagen.modalities.textual.common.segments import NamedSegments
+
+SINGLE_KEYPOINT_FIELDS = {"pixel_2d", "global_3d"}
+
+KEYPOINT_FIELDS = {"name", "coords_2d", "coords_3d", *SINGLE_KEYPOINT_FIELDS}
 
 SubSegments = TypeVar("SubSegments")
 
@@ -30,7 +43,7 @@ class SubSegmentsField(Field):
         sub_segments = []
         for name, data in value.items():
             try:
-                sub_segments.append(Keypoint.Schema().load({"name": name, **data}))
+                sub_segments.append(get_schema(Keypoint)().load({"name": name, **data}))
             except ValidationError:
                 sub_segments.append(NestedSegment(name, self._deserialize(data, *args, **kwargs)))
         return sub_segments
@@ -41,35 +54,21 @@ class KeypointsSchema(marshmallow.Schema):
 
 
 @marshmallow_dataclass.dataclass(base_schema=KeypointsSchema)
-class NestedSegment:
+class NestedSegment(NamedSegments):
     name: str
     sub_segments: Optional[SubSegments]
 
-    def __getattr__(self, item):
-        for sub_seg in self.sub_segments:
-            if sub_seg.name == item:
-                return sub_seg
-
-    def __dir__(self) -> Iterable[str]:
-        return [seg.name for seg in self.sub_segments]
-
 
 @marshmallow_dataclass.dataclass(base_schema=KeypointsSchema)
-class Keypoints:
+class Keypoints(NamedSegments):
     scene: SubSegments
 
+    _segments_field = "scene"
+
     @pre_load
     def rearrange_fields(self, in_data: dict, **kwargs) -> dict:
         return {"scene": _convert_multi_keypoints_segments_to_matrices(in_data)}
 
-    def __getattr__(self, item):
-        for sub_seg in self.scene:
-            if sub_seg.name == item:
-                return sub_seg
-
-    def __dir__(self) -> Iterable[str]:
-        return [seg.name for seg in self.scene]
-
 
 def _convert_multi_keypoints_segments_to_matrices(in_data: dict) -> dict:
     converted_dict = {}
@@ -100,3 +99,34 @@ def _convert_to_matrices(kp_num_to_coords: dict) -> dict:
 def _get_coords_sorted_by_kp_num(kp_num_to_coords_nd) -> Generator:
     for keypoint_num in sorted(int(s) for s in kp_num_to_coords_nd.keys()):
         yield kp_num_to_coords_nd[str(keypoint_num)]
+
+
+def decode(in_data: dict) -> Keypoints:
+    """
+    Decodes keypoints straight into their arrays, without going through the schema.
+    :raises UnsupportedKeypointsError: For structures which are left to the schema.
+    """
+    return Keypoints(scene=_decode_sub_segments(in_data))
+
+
+def _decode_sub_segments(in_data: dict) -> List[Union[Keypoint, NestedSegment]]:
+    sub_segments = []
+    for name, data in in_data.items():
+        if not isinstance(data, dict) or not data:
+            raise UnsupportedKeypointsError(f"Unsupported keypoints segment: '{name}'")
+        if is_keypoints_matrix(data):
+            coords_2d, coords_3d = decode_coords_matrices(sort_keypoints(data))
+            sub_segments.append(Keypoint(name=name, coords_2d=coords_2d, coords_3d=coords_3d))
+        elif set(data) == SINGLE_KEYPOINT_FIELDS:
+            sub_segments.append(
+                Keypoint(
+                    name=name,
+                    coords_2d=decode_coords(data["pixel_2d"]),
+                    coords_3d=decode_coords(data["global_3d"]),
+                )
+            )
+        elif KEYPOINT_FIELDS.isdisjoint(data):
+            sub_segments.append(NestedSegment(name=name, sub_segments=_decode_sub_segments(data)))
+        else:
+            raise UnsupportedKeypointsError(f"Unsupported keypoints segment: '{name}'")
+    return sub_segments
@@ -9,6 +9,7 @@ from marshmallow_dataclass import NewType
 
 from datagen.modalities.textual.common.identity_label import IdentityLabel
 from datagen.modalities.textual.common.ndarray import NumpyArray
+from datagen.modalities.textual.common.schemas import get_schema
 from datagen.modalities.textual.common.sixdof import SixDOF
 
 EYES_FULLY_OPENED = 5
@@ -197,7 +198,7 @@ class AccessoryField(Field):
 
     def _deserialize(self, accessory_dict: dict, attr, data, **kwargs) -> Accessory:
         accessory_type = accessory_dict.pop("type")
-        return self.ACCESSORY_TYPE_TO_CLASS[accessory_type.lower()].Schema().load(accessory_dict)
+        return get_schema(self.ACCESSORY_TYPE_TO_CLASS[accessory_type.lower()])().load(accessory_dict)
 
 
 AccessoryType = NewType("Accessory", Accessory, field=AccessoryField)
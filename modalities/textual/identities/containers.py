@@ -1,12 +1,37 @@
+from pathlib import Path
+
 from dependency_injector import containers, providers
 
+from datagen.dev import json_backends
 from datagen.modalities.textual.base.containers import (
     BaseModalitiesContainer,
     modality_dataclass_factory,
+    modality_keypoints_factory,
     modality_pydantic_factory,
     modality_factory,
 )
 
+V1_STANDARD_KEYPOINTS_FILE_NAME = "standard_keypoints.json"
+
+V1_DENSE_KEYPOINTS_FILE_NAME = "dense_keypoints.json"
+
+V1_KEYPOINTS_VERSION = 1
+
+
+def v1_keypoints_factory(modality_container: providers.Container, modality_file_path: str):
+    """
+    V1 keypoints come in two separate files, merged in memory rather than into a single keypoints file.
+    :param modality_file_path: The standard keypoints file, the dense keypoints file is expected next to it.
+    """
+    standard_keypoints_path = Path(modality_file_path)
+    dense_keypoints_path = standard_keypoints_path.with_name(V1_DENSE_KEYPOINTS_FILE_NAME)
+    # In the (sorted) order of the segments in the all_key_points.json files previously created for v1 keypoints.
+    modality_dict = {
+        "dense": json_backends.load_file(dense_keypoints_path),
+        "standard": json_backends.load_file(standard_keypoints_path),
+    }
+    return modality_container.create(V1_KEYPOINTS_VERSION, modality_dict=modality_dict)
+
 
 class ActorMetadataModalityContainer(containers.DeclarativeContainer):
 
@@ -27,7 +52,10 @@ class KeypointsModalityContainer(containers.DeclarativeContainer):
     from .keypoints import v1, v2
 
     create = providers.FactoryAggregate(
-        {1: modality_dataclass_factory(clazz=v1.SceneKeypoints), 2: modality_dataclass_factory(clazz=v2.SceneKeypoints)}
+        {
+            1: modality_keypoints_factory(clazz=v1.SceneKeypoints, decode=v1.decode),
+            2: modality_keypoints_factory(clazz=v2.SceneKeypoints, decode=v2.decode),
+        }
     )
 
 
@@ -49,6 +77,10 @@ class IdentitiesModalitiesContainer(BaseModalitiesContainer):
 
     keypoints = providers.Callable(modality_factory, modality_container=providers.Container(KeypointsModalityContainer))
 
+    keypoints_v1 = providers.Callable(
+        v1_keypoints_factory, modality_container=providers.Container(KeypointsModalityContainer)
+    )
+
     datapoint_request = providers.Callable(
         modality_factory, modality_container=providers.Container(DatapointRequestModalityContainer)
     )
@@ -7,6 +7,8 @@ from marshmallow import ValidationError
 from marshmallow.fields import Field
 
 from datagen.modalities.textual.common.ndarray import NumpyArray
+from datagen.modalities.textual.common.schemas import get_schema
+from datagen.modalities.textual.common.segments import NamedSegments
 
 SubSegments = TypeVar("SubSegments")
 
@@ -24,7 +26,7 @@ class SubSegmentsField(Field):
         sub_segments = []
         for name, data in value.items():
             try:
-                sub_segments.append(Keypoints.Schema().load({"name": name, **data}))
+                sub_segments.append(get_schema(Keypoints)().load({"name": name, **data}))
             except ValidationError:
                 sub_segments.append(NestedSegment(name, self._deserialize(data, *args, **kwargs)))
         return sub_segments
@@ -35,27 +37,13 @@ class KeypointsSchema(marshmallow.Schema):
 
 
 @marshmallow_dataclass.dataclass(base_schema=KeypointsSchema)
-class NestedSegment:
+class NestedSegment(NamedSegments):
     name: str
     sub_segments: Optional[SubSegments]
 
-    def __getattr__(self, item):
-        for sub_seg in self.sub_segments:
-            if sub_seg.name == item:
-                return sub_seg
-
-    def __dir__(self):
-        return [seg.name for seg in self.sub_segments]
-
 
 @marshmallow_dataclass.dataclass(base_schema=KeypointsSchema)
-class SceneKeypoints:
+class SceneKeypoints(NamedSegments):
     scene: SubSegments
 
-    def __getattr__(self, item):
-        for sub_seg in self.scene:
-            if sub_seg.name == item:
-                return sub_seg
-
-    def __dir__(self):
-        return [seg.name for seg in self.scene]
+    _segments_field = "scene"
@@ -1,8 +1,14 @@
 import marshmallow_dataclass
+import numpy as np
 from marshmallow import pre_load
 
+from datagen.modalities.textual.common.keypoints import UnsupportedKeypointsError
 from datagen.modalities.textual.identities.keypoints import base
 
+KEYPOINTS_SEGMENTS = {"standard", "dense"}
+
+KEYPOINTS_FIELDS = {"keypoints_2d_coordinates", "keypoints_3d_coordinates", "is_visible"}
+
 
 @marshmallow_dataclass.dataclass(base_schema=base.KeypointsSchema)
 class SceneKeypoints(base.SceneKeypoints):
@@ -14,3 +20,21 @@ class SceneKeypoints(base.SceneKeypoints):
         in_data["dense"]["coords_3d"] = in_data["dense"].pop("keypoints_3d_coordinates")
         return {"scene": {"face": in_data}}
 
+
+def decode(in_data: dict) -> SceneKeypoints:
+    """
+    Decodes keypoints straight into their arrays, without going through the schema.
+    :raises UnsupportedKeypointsError: For structures which are left to the schema.
+    """
+    if set(in_data) != KEYPOINTS_SEGMENTS or any(set(data) != KEYPOINTS_FIELDS for data in in_data.values()):
+        raise UnsupportedKeypointsError(f"Unsupported v1 keypoints segments: {list(in_data)}")
+    face_segments = [
+        base.Keypoints(
+            name=name,
+            coords_2d=np.array(data["keypoints_2d_coordinates"]),
+            coords_3d=np.array(data["keypoints_3d_coordinates"]),
+            is_visible=np.array(data["is_visible"]),
+        )
+        for name, data in in_data.items()
+    ]
+    return SceneKeypoints(scene=[base.NestedSegment(name="face", sub_segments=face_segments)])
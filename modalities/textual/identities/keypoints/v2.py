@@ -1,8 +1,21 @@
+from typing import List, Union
+
 import marshmallow_dataclass
+import numpy as np
 from marshmallow import pre_load
 
+from datagen.modalities.textual.common.keypoints import (
+    UnsupportedKeypointsError,
+    decode_coords,
+    decode_coords_matrices,
+    decode_visibility,
+    is_keypoints_matrix,
+    sort_keypoints,
+)
 from datagen.modalities.textual.identities.keypoints import base
 
+KEYPOINTS_FIELDS = {"name", "coords_2d", "coords_3d", "is_visible"}
+
 
 @marshmallow_dataclass.dataclass(base_schema=base.KeypointsSchema)
 class SceneKeypoints(base.SceneKeypoints):
@@ -55,3 +68,40 @@ def _convert_to_matrix(kp_num_to_kp_coords: dict) -> dict:
 
 def _convert_str_keys_to_int(kp_num_to_kp_coords: dict) -> dict:
     return {int(kp_num): kp_coords for kp_num, kp_coords in kp_num_to_kp_coords.items()}
+
+
+def decode(in_data: dict) -> SceneKeypoints:
+    """
+    Decodes keypoints straight into their arrays, without going through the schema.
+    :raises UnsupportedKeypointsError: For structures which are left to the schema.
+    """
+    return SceneKeypoints(scene=_decode_sub_segments(in_data))
+
+
+def _decode_sub_segments(in_data: dict) -> List[Union[base.Keypoints, base.NestedSegment]]:
+    sub_segments = []
+    for name, data in in_data.items():
+        if not isinstance(data, dict) or not data:
+            raise UnsupportedKeypointsError(f"Unsupported keypoints segment: '{name}'")
+        if _is_single_coord_keypoint_segment(data):
+            sub_segments.append(
+                base.Keypoints(
+                    name=name,
+                    coords_2d=decode_coords(data["pixel_2d"]),
+                    coords_3d=decode_coords(data["global_3d"]),
+                    is_visible=np.array(data["is_visible"] == "true"),
+                )
+            )
+        elif is_keypoints_matrix(data):
+            keypoints = sort_keypoints(data)
+            coords_2d, coords_3d = decode_coords_matrices(keypoints)
+            sub_segments.append(
+                base.Keypoints(
+                    name=name, coords_2d=coords_2d, coords_3d=coords_3d, is_visible=decode_visibility(keypoints)
+                )
+            )
+        elif KEYPOINTS_FIELDS.isdisjoint(data):
+            sub_segments.append(base.NestedSegment(name=name, sub_segments=_decode_sub_segments(data)))
+        else:
+            raise UnsupportedKeypointsError(f"Unsupported keypoints segment: '{name}'")
+    return sub_segments
@@ -0,0 +1,348 @@
+import json
+import shutil
+from pathlib import Path
+from typing import Callable, Sequence
+
+import cv2
+import numpy as np
+import pytest
+
+import datagen
+from datagen import DatasetConfig
+from datagen.components.dataset import Dataset
+
+HEIGHT, WIDTH = 48, 64
+
+IDENTITIES_CAMERAS = ("camera_1", "camera_2")
+
+HIC_CAMERAS = ("cam_a", "cam_b")
+
+
+def write_json(path: Path, content: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(content))
+
+
+class SourceBuilder:
+    """
+    Writes small synthetic datasets - every file the SDK validates and parses, with random values.
+    """
+
+    def __init__(self, seed: int = 0):
+        self._rng = np.random.default_rng(seed)
+
+    def make_identities(
+        self,
+        root: Path,
+        num_scenes: int = 3,
+        cameras: Sequence[str] = IDENTITIES_CAMERAS,
+        v1: bool = False,
+        multi_environment: bool = True,
+    ) -> Path:
+        """
+        Odd scenes have two environments (day - "hdri", night - "transparent") if multi_environment is set.
+        """
+        for scene_num in range(1, num_scenes + 1):
+            self.add_identities_scene(root, scene_num, cameras, v1, multi_environment and scene_num % 2 == 1)
+        return root
+
+    def add_identities_scene(
+        self,
+        root: Path,
+        scene_num: int,
+        cameras: Sequence[str] = IDENTITIES_CAMERAS,
+        v1: bool = False,
+        multi_environment: bool = False,
+    ) -> Path:
+        scene_path = root.joinpath(f"datapoint_{scene_num:05d}")
+        write_json(scene_path.joinpath("actor_metadata.json"), self._identities_actor(scene_num))
+        write_json(scene_path.joinpath("semantic_segmentation_metadata.json"), _segmentation())
+        write_json(scene_path.joinpath("lights_metadata.json"), self._lights())
+        for camera in cameras:
+            self.add_identities_camera(scene_path, camera, v1, multi_environment)
+        return scene_path
+
+    def add_identities_camera(self, scene_path: Path, camera: str, v1: bool = False, multi_environment: bool = False):
+        camera_path = scene_path.joinpath(camera)
+        camera_path.mkdir(parents=True, exist_ok=True)
+        if multi_environment:
+            environments = [
+                {"image_name": "visible_spectrum_01.png", "time_of_day": "day", "background": "hdri"},
+                {"image_name": "visible_spectrum_02.png", "time_of_day": "night", "background": "transparent"},
+            ]
+            write_json(camera_path.joinpath("environment.json"), {"environments": environments})
+            images_names = [environment["image_name"] for environment in environments]
+        else:
+            write_json(camera_path.joinpath("environment.json"), {"time_of_day": "day", "background": "hdri"})
+            images_names = ["visible_spectrum.png"]
+        write_json(camera_path.joinpath("camera_metadata.json"), self._camera_metadata(camera))
+        write_json(camera_path.joinpath("face_bounding_box.json"), {"min_x": 5, "min_y": 6, "max_x": 40, "max_y": 30})
+        if v1:
+            for segment, num_keypoints in (("standard", 68), ("dense", 468)):
+                write_json(
+                    camera_path.joinpath(f"{segment}_keypoints.json"),
+                    {
+                        "keypoints_2d_coordinates": self._rng.random((num_keypoints, 2)).tolist(),
+                        "keypoints_3d_coordinates": self._rng.random((num_keypoints, 3)).tolist(),
+                        "is_visible": [True] * num_keypoints,
+                    },
+                )
+        else:
+            write_json(
+                camera_path.joinpath("key_points", "all_key_points.json"),
+                {
+                    "version": "2.0.0",
+                    "face": {
+                        "standard": self._keypoints_matrix(68),
+                        "dense": self._keypoints_matrix(100),
+                        "nose_tip": {"pixel_2d": _xy([1, 2]), "global_3d": _xyz([1, 2, 3]), "is_visible": "true"},
+                    },
+                    "body": {"standard": self._keypoints_matrix(20)},
+                },
+            )
+        self._write_images(camera_path, images_names, with_alpha=multi_environment)
+
+    def make_hic(self, root: Path, num_scenes: int = 2, num_frames: int = 3, cameras: Sequence[str] = HIC_CAMERAS):
+        for scene_num in range(1, num_scenes + 1):
+            scene_path = root.joinpath(f"scene_{scene_num:05d}")
+            write_json(scene_path.joinpath("semantic_segmentation_metadata.json"), _segmentation())
+            for frame_num in range(1, num_frames + 1):
+                self.add_hic_frame(scene_path, frame_num, cameras)
+        return root
+
+    def add_hic_frame(self, scene_path: Path, frame_num: int, cameras: Sequence[str] = HIC_CAMERAS) -> Path:
+        frame_path = scene_path.joinpath("frames", str(frame_num).zfill(3))
+        write_json(frame_path.joinpath("actor_metadata.json"), self._hic_actors())
+        write_json(
+            frame_path.joinpath("center_of_geometry.json"),
+            {
+                "obj_1": {
+                    "semantic_name": "cup",
+                    "center_of_mass": {"global_3d": self._xyz(), "pixel_2d": {"x": 1, "y": 2, "depth": 3}},
+                }
+            },
+        )
+        for camera in cameras:
+            camera_path = frame_path.joinpath(camera)
+            camera_path.mkdir(parents=True, exist_ok=True)
+            write_json(
+                camera_path.joinpath("environment.json"),
+                {"time_of_day": "day", "background": "office", "behaviour": f"behaviour_{scene_path.name}"},
+            )
+            write_json(camera_path.joinpath("camera_metadata.json"), self._camera_metadata(camera))
+            write_json(camera_path.joinpath("lights_metadata.json"), self._lights())
+            write_json(
+                camera_path.joinpath("key_points", "all_key_points.json"),
+                {
+                    "version": "1.0.0",
+                    "actor-1": {
+                        "body": {"standard": self._keypoints_matrix(20, with_visibility=False)},
+                        "face": {"dense": self._keypoints_matrix(50, with_visibility=False)},
+                    },
+                },
+            )
+            self._write_images(camera_path, ["visible_spectrum.png"])
+        return frame_path
+
+    def _write_images(self, camera_path: Path, images_names: Sequence[str], with_alpha: bool = False) -> None:
+        for image_name in images_names:
+            image = (self._rng.random((HEIGHT, WIDTH, 4 if with_alpha else 3)) * 65535).astype(np.uint16)
+            cv2.imwrite(str(camera_path.joinpath(image_name)), image)
+        infrared = (self._rng.random((HEIGHT, WIDTH, 3)) * 65535).astype(np.uint16)
+        cv2.imwrite(str(camera_path.joinpath("infrared_spectrum.png")), infrared)
+        segmentation = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+        segmentation[: HEIGHT // 2] = (30, 20, 10)
+        segmentation[HEIGHT // 2 :, : WIDTH // 2] = (60, 50, 40)
+        cv2.imwrite(str(camera_path.joinpath("semantic_segmentation.png")), segmentation)
+        for exr_name in ("depth.exr", "normal_maps.exr"):
+            cv2.imwrite(str(camera_path.joinpath(exr_name)), self._rng.random((HEIGHT, WIDTH, 3)).astype(np.float32))
+
+    def _camera_metadata(self, camera: str) -> dict:
+        return {
+            "camera_name": camera,
+            "camera_type": "perspective",
+            "focal_length": 20.0,
+            "sensor": {"sensor_width": 36.0, "sensor_height": 24.0},
+            "resolution_px": {"x": WIDTH, "y": HEIGHT},
+            "aspect_px": {"x": 1, "y": 1},
+            "location": self._xyz(),
+            "orientation": {"look_at_vector": self._xyz(), "up_vector": self._xyz()},
+            "fov": {"horizontal": 60.0, "vertical": 40.0},
+            "intrinsic_matrix": self._rng.random((3, 3)).tolist(),
+            "extrinsic_matrix": self._rng.random((3, 4)).tolist(),
+        }
+
+    def _lights(self) -> dict:
+        return {
+            "lights": {
+                f"light_{light_idx}": {
+                    "brightness": 1.0,
+                    "beam_angle": 30.0,
+                    "location": self._xyz(),
+                    "orientation": {"look_at_vector": self._xyz(), "up_vector": self._xyz()},
+                    "type": "spot",
+                    "falloff": 0.5,
+                    "spectrum": "visible",
+                }
+                for light_idx in range(2)
+            }
+        }
+
+    def _keypoints_matrix(self, num_keypoints: int, with_visibility: bool = True) -> dict:
+        keypoints = {}
+        for kp_num in range(num_keypoints):
+            keypoint = {"pixel_2d": _xy(self._rng.random(2) * 10), "global_3d": self._xyz()}
+            if with_visibility:
+                keypoint["is_visible"] = "true" if kp_num % 2 else "false"
+            keypoints[str(kp_num)] = keypoint
+        return keypoints
+
+    def _identities_actor(self, scene_num: int) -> dict:
+        axis_directions = {
+            "axis_directions": {"optical_axis_direction": self._xyz(), "visual_axis_direction": self._xyz()}
+        }
+        return {
+            "identity_id": f"id-{scene_num}",
+            "identity_label": {
+                "age": ["young", "adult"][scene_num % 2],
+                "ethnicity": "mediterranean",
+                "gender": ["female", "male"][scene_num % 2],
+            },
+            "facial_hair_included": False,
+            "face_expression": {"name": "none", "intensity_level": 1},
+            "head_metadata": {
+                "head_root_location": self._xyz(),
+                "head_rotation": {"roll": 0.1, "pitch": 0.2, "yaw": 0.3},
+                "head_six_dof": {"location": self._xyz(), "look_at_vector": self._xyz()},
+            },
+            "center_of_rotation_point": self._eye_points(),
+            "apex_of_cornea_point": self._eye_points(),
+            "center_of_iris_point": self._eye_points(),
+            "center_of_pupil_point": self._eye_points(),
+            "iris_circle": self._eye_circle(),
+            "pupil_circle": self._eye_circle(),
+            "eye_gaze": {
+                "axis_directions": {"right_eye": axis_directions, "left_eye": axis_directions},
+                "target_point": {"right_eye": self._xyz(), "left_eye": self._xyz()},
+                "eye_gaze_direction_type": "free",
+            },
+            "accessories": [
+                {
+                    "type": "glasses",
+                    "style": "a",
+                    "lens_color": "b",
+                    "metallic_intensity": 0.1,
+                    "transparency_intensity": 0.2,
+                }
+            ],
+        }
+
+    def _hic_actors(self) -> dict:
+        return {
+            "identities": {
+                f"actor-{actor_idx}": {
+                    "age": "adult",
+                    "ethnicity": ["african", "north_european"][actor_idx],
+                    "gender": ["male", "female"][actor_idx],
+                    "head_six_dof": {"location": self._xyz(), "look_at_vector": self._xyz()},
+                }
+                for actor_idx in range(2)
+            }
+        }
+
+    def _eye_points(self) -> dict:
+        return {
+            "2d": {"camera_1": {"right_eye": self._xy(), "left_eye": self._xy()}},
+            "3d": {"right_eye": self._xyz(), "left_eye": self._xyz()},
+        }
+
+    def _eye_circle(self) -> dict:
+        return {
+            "2d": {
+                "camera_1": {
+                    "right_eye": [self._xy() for _ in range(4)],
+                    "left_eye": [self._xy() for _ in range(4)],
+                }
+            },
+            "3d": {"right_eye": [self._xyz() for _ in range(4)], "left_eye": [self._xyz() for _ in range(4)]},
+        }
+
+    def _xy(self) -> dict:
+        return _xy(self._rng.random(2))
+
+    def _xyz(self) -> dict:
+        return _xyz(self._rng.random(3))
+
+
+def _xy(values) -> dict:
+    return {"x": float(values[0]), "y": float(values[1])}
+
+
+def _xyz(values) -> dict:
+    return {"x": float(values[0]), "y": float(values[1]), "z": float(values[2])}
+
+
+def _segmentation() -> dict:
+    return {
+        "human": {"head": {"R": 10, "G": 20, "B": 30}, "body": [40, 50, 60]},
+        "background": [0, 0, 0],
+    }
+
+
+@pytest.fixture
+def source_builder() -> SourceBuilder:
+    return SourceBuilder()
+
+
+@pytest.fixture(scope="session")
+def sources_dir(tmp_path_factory) -> Path:
+    """
+    Read-only sources shared by all tests, copy them (see copy_source) in order to modify them.
+    """
+    root = tmp_path_factory.mktemp("sources")
+    builder = SourceBuilder()
+    builder.make_identities(root.joinpath("identities"))
+    builder.make_identities(root.joinpath("identities_v1"), num_scenes=2, v1=True, multi_environment=False)
+    builder.make_hic(root.joinpath("hic"))
+    return root
+
+
+@pytest.fixture
+def identities_source(sources_dir) -> Path:
+    return sources_dir.joinpath("identities")
+
+
+@pytest.fixture
+def identities_v1_source(sources_dir) -> Path:
+    return sources_dir.joinpath("identities_v1")
+
+
+@pytest.fixture
+def hic_source(sources_dir) -> Path:
+    return sources_dir.joinpath("hic")
+
+
+@pytest.fixture
+def copy_source(sources_dir, tmp_path) -> Callable[[str], Path]:
+    def copy(name: str) -> Path:
+        return Path(shutil.copytree(sources_dir.joinpath(name), tmp_path.joinpath("sources", name)))
+
+    return copy
+
+
+@pytest.fixture
+def load(tmp_path) -> Callable[..., Dataset]:
+    """
+    Loads datasets with their caches (e.g. manifests) under the test's temporary directory.
+    """
+
+    def load_(*sources: Path, num_shards: int = 1, shard_index: int = 0, **config) -> Dataset:
+        config.setdefault("cache_dir", str(tmp_path.joinpath("cache")))
+        return datagen.load(
+            *map(str, sources),
+            dataset_config=DatasetConfig(**config),
+            num_shards=num_shards,
+            shard_index=shard_index,
+        )
+
+    return load_
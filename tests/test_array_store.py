@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+import pytest
+
+from datagen.components.array_store import ArrayStore, ArrayStoreError
+from datagen.modalities.textual.common.flatten import flatten
+
+EXPORTED_MODALITIES = ("keypoints", "camera_metadata", "actor_metadata", "lights_metadata")
+
+
+def _assert_equal_modalities(modality, other):
+    assert type(modality) is type(other)
+    leaves, other_leaves = flatten(modality), flatten(other)
+    assert [path for path, _ in leaves] == [path for path, _ in other_leaves]
+    for (_, leaf), (_, other_leaf) in zip(leaves, other_leaves):
+        np.testing.assert_array_equal(leaf, other_leaf)
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return tmp_path.joinpath("store")
+
+
+@pytest.mark.parametrize("source_name", ["identities", "identities_v1", "hic"])
+def test_datasets_read_the_exported_modalities(sources_dir, load, store_path, source_name):
+    source = sources_dir.joinpath(source_name)
+    dataset = load(source)
+    store = dataset.export(str(store_path), modalities=EXPORTED_MODALITIES, workers=2)
+    assert len(store) == len(dataset)
+    stored_dataset = load(source, array_store=str(store_path))
+    for dp, stored_dp in zip(dataset, stored_dataset):
+        for modality in EXPORTED_MODALITIES:
+            _assert_equal_modalities(getattr(stored_dp, modality), getattr(dp, modality))
+
+
+def test_get_column(identities_source, load, store_path):
+    dataset = load(identities_source)
+    store = dataset.export(str(store_path), modalities=("keypoints",))
+    assert "face/dense/coords_2d" in store.get_paths("keypoints")
+    column = store.get_column("keypoints", "face/dense/coords_2d")
+    assert column.shape == (len(dataset), 100, 2)
+    for dp, coords_2d in zip(dataset, column):
+        np.testing.assert_array_equal(coords_2d, dp.keypoints.face.dense.coords_2d)
+    with pytest.raises(ArrayStoreError):
+        store.get_column("keypoints", "face/missing")
+    with pytest.raises(ArrayStoreError):
+        store.get_column("camera_metadata", "intrinsic_matrix")
+
+
+def test_store_paths_match_flatten(hic_source, load, store_path):
+    dataset = load(hic_source)
+    store = dataset.export(str(store_path), modalities=("actor_metadata",))
+    assert store.get_paths("actor_metadata") == [path for path, _ in flatten(dataset[0].actor_metadata)]
+
+
+def test_stores_are_not_overwritten(identities_source, load, store_path):
+    dataset = load(identities_source)
+    dataset.export(str(store_path), modalities=("keypoints",))
+    with pytest.raises(ArrayStoreError):
+        dataset.export(str(store_path), modalities=("keypoints",))
+    with pytest.raises(ArrayStoreError):
+        ArrayStore(store_path.parent.joinpath("missing"))
+
+
+def test_stores_of_other_versions_are_rejected(identities_source, load, store_path):
+    load(identities_source).export(str(store_path), modalities=("keypoints",))
+    meta_path = store_path.joinpath("store.json")
+    meta = json.loads(meta_path.read_text())
+    meta_path.write_text(json.dumps({**meta, "version": 1}))
+    with pytest.raises(ArrayStoreError):
+        ArrayStore(store_path)
+
+
+def _replace_classes(structure, class_name):
+    if isinstance(structure, dict):
+        return {
+            key: class_name if key in ("object", "dataclass") else _replace_classes(value, class_name)
+            for key, value in structure.items()
+        }
+    if isinstance(structure, list):
+        return [_replace_classes(item, class_name) for item in structure]
+    return structure
+
+
+def test_tampered_templates_are_rejected(identities_source, load, store_path):
+    load(identities_source).export(str(store_path), modalities=("keypoints",))
+    chunk_path = next(store_path.joinpath("chunks").glob("*.npz"))
+    with np.load(chunk_path, allow_pickle=False) as chunk:
+        arrays = {key: chunk[key] for key in chunk.files}
+    for key in [key for key in arrays if key.endswith("/template")]:
+        arrays[key] = np.array(json.dumps(_replace_classes(json.loads(str(arrays[key])), "os:system")))
+    np.savez(chunk_path, **arrays)
+    store = ArrayStore(store_path)
+    with pytest.raises(ArrayStoreError, match="template"):
+        store.get_paths("keypoints")
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from datagen.components.batch import BatchLoader, BatchLoadError
+from datagen.modalities.textual.common.flatten import flatten
+from datagen.modalities.textual.hic.keypoints import Keypoint, Keypoints, NestedSegment
+
+
+def test_load_batch_stacks_visual_modalities(identities_source, load):
+    dataset = load(identities_source)
+    # Images of transparent backgrounds keep their alpha channel, they're stacked separately.
+    indices = dataset.query("background != 'transparent'").indices[[0, 3, 1]].tolist()
+    batch = dataset.load_batch(indices, modalities=("visible_spectrum", "depth", "semantic_segmentation"))
+    for modality, images in batch.items():
+        expected = [getattr(dataset[idx], modality) for idx in indices]
+        assert images.shape == (len(indices), *expected[0].shape) and images.dtype == expected[0].dtype
+        assert all(np.array_equal(image, expected_image) for image, expected_image in zip(images, expected))
+
+
+def test_load_batch_stacks_textual_modalities_by_path(identities_source, load):
+    dataset = load(identities_source)
+    batch = dataset.load_batch([0, 1], modalities=("keypoints",))["keypoints"]
+    assert {"face/dense/coords_2d", "face/standard/is_visible", "body/standard/coords_3d"} <= set(batch)
+    assert batch["face/dense/coords_2d"].shape == (2, 100, 2)
+    np.testing.assert_array_equal(batch["face/dense/coords_3d"][1], dataset[1].keypoints.face.dense.coords_3d)
+
+
+def test_view_load_batch_indices_are_the_views(identities_source, load):
+    dataset = load(identities_source)
+    view = dataset.filter(camera="camera_2", background="hdri")
+    batch = view.load_batch([1, 0], modalities=("visible_spectrum",))["visible_spectrum"]
+    np.testing.assert_array_equal(batch[0], view[1].visible_spectrum)
+    np.testing.assert_array_equal(batch[1], view[0].visible_spectrum)
+
+
+def test_batch_paths_match_flatten(hic_source, load):
+    dataset = load(hic_source)
+    batch = dataset.load_batch([0, 1], modalities=("actor_metadata",))["actor_metadata"]
+    arrays = dict(flatten(dataset[0].actor_metadata, scalars=False))
+    assert list(batch) == list(arrays) and arrays
+    assert all(np.array_equal(batch[path][0], array) for path, array in arrays.items())
+
+
+def test_load_batch_errors(identities_source, identities_v1_source, load):
+    dataset = load(identities_source, identities_v1_source)
+    v1_idx = len(dataset.filter(source=str(identities_source)))
+    with pytest.raises(BatchLoadError):
+        dataset.load_batch([], modalities=("visible_spectrum",))
+    with pytest.raises(BatchLoadError):
+        dataset.load_batch([0], modalities=("center_of_geometry",))
+    with pytest.raises(BatchLoadError):
+        # Of different keypoints segments
+        dataset.load_batch([0, v1_idx], modalities=("keypoints",))
+    with pytest.raises(BatchLoadError):
+        BatchLoader().load([dataset[0]], modalities=("scene_path",))
+
+
+def test_flatten_paths():
+    coords_2d, coords_3d = np.zeros((3, 2)), np.ones((3, 3))
+    dense = Keypoint(name="dense", coords_2d=coords_2d, coords_3d=coords_3d)
+    keypoints = Keypoints(scene=[NestedSegment(name="face", sub_segments=[dense])])
+    assert [path for path, _ in flatten(keypoints, scalars=False)] == ["face/dense/coords_2d", "face/dense/coords_3d"]
+    leaves = dict(flatten(keypoints))
+    assert leaves["face/name"] == "face" and leaves["face/dense/coords_3d"] is coords_3d
+    assert [path for path, _ in flatten({"a": [1, 2.5, None]})] == ["a/0", "a/1"]
@@ -0,0 +1,47 @@
+import numpy as np
+
+from datagen.modalities.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used_values_by_size():
+    cache = LRUCache(max_size=30, sizeof=len)
+    for key in "abc":
+        cache.get_or_create(key, lambda: "x" * 10)
+    cache.get_or_create("a", lambda: "not created")
+    cache.get_or_create("d", lambda: "y" * 10)
+    assert cache.get_or_create("a", lambda: "recreated") == "x" * 10
+    assert cache.get_or_create("b", lambda: "recreated") == "recreated"
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.entries, stats.size) == (2, 5, 3, 29)
+    assert stats.evictions == 2
+
+
+def test_lru_cache_evicts_by_entries():
+    cache = LRUCache(max_entries=2)
+    for key in range(3):
+        cache.get_or_create(key, lambda: key)
+    assert len(cache) == 2 and cache.stats.evictions == 1
+    assert cache.get_or_create(0, lambda: "recreated") == "recreated"
+
+
+def test_lru_cache_skips_values_over_its_budget():
+    cache = LRUCache(max_size=5, sizeof=len)
+    assert cache.get_or_create("a", lambda: "x" * 10) == "x" * 10
+    assert len(cache) == 0
+
+
+def test_lru_cache_clear():
+    cache = LRUCache(max_size=100, sizeof=len)
+    cache.get_or_create("a", lambda: "x")
+    cache.clear()
+    assert len(cache) == 0 and cache.stats.size == 0
+
+
+def test_dataset_visual_cache(identities_source, load):
+    dataset = load(identities_source, visual_cache_size=2 ** 20)
+    first_read = dataset[0].visible_spectrum
+    np.testing.assert_array_equal(dataset[0].visible_spectrum, first_read)
+    stats = dataset.get_cache_stats()["visual"]
+    assert stats.hits == 1 and stats.size == first_read.nbytes and stats.max_size == 2 ** 20
+    dataset.clear_caches()
+    assert dataset.get_cache_stats()["visual"].entries == 0
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from datagen.components.index import UnknownAttributeError
+
+
+def _indices(dataset, predicate):
+    return [idx for idx, dp in enumerate(dataset) if predicate(dp)]
+
+
+def test_filter_by_datapoint_attributes(identities_source, load):
+    dataset = load(identities_source)
+    view = dataset.filter(camera="camera_1", time_of_day="night")
+    expected = _indices(dataset, lambda dp: dp.camera == "camera_1" and dp.environment.time_of_day == "night")
+    assert expected and view.indices.tolist() == expected
+    assert [dp.scene_path for dp in view] == [dataset[idx].scene_path for idx in expected]
+
+
+def test_filter_matches_any_of_listed_values(identities_source, load):
+    dataset = load(identities_source)
+    view = dataset.filter(scene=["datapoint_00001", "datapoint_00003"])
+    assert view.indices.tolist() == _indices(dataset, lambda dp: dp.scene_path.name != "datapoint_00002")
+
+
+def test_filter_by_actors_identity_labels(identities_source, load):
+    dataset = load(identities_source)
+    view = dataset.filter(gender="male")
+    assert view.indices.tolist() == _indices(dataset, lambda dp: dp.actor_metadata.identity_label.gender == "male")
+
+
+def test_filter_hic_actors_attributes_match_the_same_actor(hic_source, load):
+    dataset = load(hic_source)
+    # Every frame has a male african actor and a female north european one.
+    assert len(dataset.filter(gender="male", ethnicity="african")) == len(dataset)
+    assert len(dataset.filter(gender="male", ethnicity="north_european")) == 0
+
+
+def test_filter_unknown_attribute(identities_source, load):
+    with pytest.raises(UnknownAttributeError):
+        load(identities_source).filter(weather="rainy")
+
+
+def test_query(identities_source, load):
+    dataset = load(identities_source)
+    view = dataset.query("background != 'transparent' and camera == 'camera_2'")
+    expected = _indices(dataset, lambda dp: dp.environment.background != "transparent" and dp.camera == "camera_2")
+    assert expected and view.indices.tolist() == expected
+
+
+def test_views_are_intersected(identities_source, load):
+    dataset = load(identities_source)
+    view = dataset.filter(camera="camera_1").query("time_of_day == 'day'")
+    expected = np.intersect1d(dataset.filter(camera="camera_1").indices, dataset.filter(time_of_day="day").indices)
+    assert view.indices.tolist() == expected.tolist()
+    assert view[1:].indices.tolist() == expected[1:].tolist()
+
+
+def test_lazy_filter_does_not_create_datapoints(identities_source, load):
+    dataset = load(identities_source, lazy=True, use_manifest=False)
+    view = dataset.filter(gender="female", camera="camera_2")
+    assert len(view) > 0
+    assert all(camera._datapoints is None for scene in dataset.scenes for camera in scene.cameras)
@@ -0,0 +1,41 @@
+from datagen.components.scanner import SourceScanner
+
+
+def _keys(dataset):
+    return [(dp.scene_path.name, dp.camera, dp.frame_num, dp.visible_spectrum_image_name) for dp in dataset]
+
+
+def test_lazy_datasets_match_eager_ones(identities_source, hic_source, load):
+    for source in (identities_source, hic_source):
+        assert _keys(load(source, lazy=True, use_manifest=False)) == _keys(load(source, use_manifest=False))
+
+
+def test_lazy_scenes_are_scanned_once_accessed(identities_source, load):
+    dataset = load(identities_source, lazy=True, use_manifest=False)
+    assert all(scene.records is None and scene._cameras is None for scene in dataset.scenes)
+    dataset.scenes[1][0]
+    assert [scene.records is not None for scene in dataset.scenes] == [False, True, False]
+
+
+def test_lazy_scenes_are_counted_concurrently(identities_source, load, monkeypatch):
+    mapped_items = []
+    map_ = SourceScanner.map
+
+    def spy_map(self, func, items):
+        items = list(items)
+        mapped_items.extend(items)
+        return map_(self, func, items)
+
+    expected_len = len(load(identities_source, use_manifest=False))
+    dataset = load(identities_source, lazy=True, use_manifest=False)
+    monkeypatch.setattr(SourceScanner, "map", spy_map)
+    assert len(dataset) == expected_len
+    assert mapped_items == dataset.scenes
+
+
+def test_lazy_scenes_are_recorded_in_the_manifest(copy_source, load):
+    source = copy_source("hic")
+    expected_keys = _keys(load(source, lazy=True))
+    dataset = load(source, lazy=True)
+    assert all(scene.records is not None for scene in dataset.scenes)
+    assert _keys(dataset) == expected_keys
@@ -0,0 +1,66 @@
+import shutil
+
+import pytest
+
+
+def _keys(dataset):
+    return sorted((dp.scene_path.name, dp.camera, dp.frame_num) for dp in dataset)
+
+
+@pytest.fixture(params=[False, True], ids=["eager", "lazy"])
+def lazy(request) -> bool:
+    return request.param
+
+
+def test_refresh_without_changes(identities_source, load, lazy):
+    dataset = load(identities_source, lazy=lazy)
+    keys = _keys(dataset)
+    assert dataset.refresh() == []
+    assert _keys(dataset) == keys
+
+
+def test_refresh_picks_up_new_scenes(copy_source, load, source_builder, lazy):
+    source = copy_source("identities")
+    dataset = load(source, lazy=lazy)
+    num_datapoints = len(dataset)
+    first_scene_keys = _keys(dataset.scenes[0])
+    source_builder.add_identities_scene(source, 4)
+    new_scenes = dataset.refresh()
+    assert [scene.path.name for scene in new_scenes] == ["datapoint_00004"]
+    assert len(dataset) == num_datapoints + len(new_scenes[0])
+    # Appended after the existing scenes, their datapoints keep their indices.
+    assert dataset.scenes[-1] is new_scenes[0]
+    assert _keys(dataset[: len(first_scene_keys)]) == first_scene_keys
+    assert dataset.filter(scene="datapoint_00004").indices.tolist() == list(range(num_datapoints, len(dataset)))
+
+
+def test_refresh_rescans_modified_scenes(copy_source, load, source_builder, lazy):
+    source = copy_source("hic")
+    dataset = load(source, lazy=lazy)
+    # Scans lazy scenes, which would otherwise pick the changes up once they're scanned.
+    len(dataset)
+    frames_path = source.joinpath("scene_00001", "frames")
+    source_builder.add_hic_frame(source.joinpath("scene_00001"), 4)
+    for frame in ("001", "002", "003"):
+        shutil.rmtree(source.joinpath("scene_00002", "frames", frame, "cam_b"))
+    assert dataset.refresh() == []
+    expected_keys = [
+        *((("scene_00001", camera, frame_num) for camera in ("cam_a", "cam_b") for frame_num in range(1, 5))),
+        *((("scene_00002", "cam_a", frame_num) for frame_num in range(1, 4))),
+    ]
+    assert _keys(dataset) == sorted(expected_keys)
+    # The manifest was updated as well.
+    assert _keys(load(source, lazy=lazy)) == _keys(dataset)
+    shutil.rmtree(frames_path.joinpath("004"))
+    dataset.refresh()
+    assert ("scene_00001", "cam_a", 4) not in _keys(dataset)
+
+
+def test_refresh_drops_removed_scenes(copy_source, load, lazy):
+    source = copy_source("identities")
+    dataset = load(source, lazy=lazy)
+    shutil.rmtree(source.joinpath("datapoint_00002"))
+    assert dataset.refresh() == []
+    assert [scene.path.name for scene in dataset.scenes] == ["datapoint_00001", "datapoint_00003"]
+    assert all(dp.scene_path.name != "datapoint_00002" for dp in dataset)
+    assert _keys(load(source, lazy=lazy)) == _keys(dataset)
@@ -0,0 +1,66 @@
+import pytest
+
+from datagen.components.datasource import DataSource
+
+
+def _keys(dataset):
+    return [(dp.scene_path.parent.name, dp.scene_path.name, dp.camera, dp.frame_num) for dp in dataset]
+
+
+@pytest.mark.parametrize("num_shards", [1, 2, 3, 7])
+def test_shards_split_the_scenes_of_all_sources(identities_source, identities_v1_source, load, num_shards):
+    dataset = load(identities_source, identities_v1_source)
+    shards = [
+        load(identities_source, identities_v1_source, num_shards=num_shards, shard_index=shard_index)
+        for shard_index in range(num_shards)
+    ]
+    assert [key for shard in shards for key in _keys(shard)] == _keys(dataset)
+    num_scenes = len(dataset.scenes)
+    for shard_index, shard in enumerate(shards):
+        start, stop = num_scenes * shard_index // num_shards, num_scenes * (shard_index + 1) // num_shards
+        assert [scene.path for scene in shard.scenes] == [scene.path for scene in dataset.scenes[start:stop]]
+        sharded = dataset.shard(num_shards, shard_index)
+        assert [scene.path for scene in sharded.scenes] == [scene.path for scene in shard.scenes]
+
+
+def test_shards_only_scan_their_own_scenes(identities_source, load, monkeypatch):
+    initialized_scenes = []
+    init_scenes = DataSource._init_scenes
+
+    def spy_init_scenes(self, scenes_paths):
+        initialized_scenes.extend(scenes_paths)
+        return init_scenes(self, scenes_paths)
+
+    monkeypatch.setattr(DataSource, "_init_scenes", spy_init_scenes)
+    shard = load(identities_source, num_shards=3, shard_index=1)
+    assert [path_.name for path_ in initialized_scenes] == ["datapoint_00002"]
+    assert [scene.path.name for scene in shard.scenes] == ["datapoint_00002"]
+
+
+@pytest.mark.parametrize("num_shards", [1, 3, 4])
+def test_shard_by_datapoint(identities_source, load, num_shards):
+    dataset = load(identities_source)
+    views = [dataset.shard(num_shards, shard_index, by="datapoint") for shard_index in range(num_shards)]
+    assert [idx for view in views for idx in view.indices.tolist()] == list(range(len(dataset)))
+    assert max(map(len, views)) - min(map(len, views)) <= 1
+
+
+@pytest.mark.parametrize("num_shards, shard_index", [(2, 2), (2, -1), (0, 0)])
+def test_invalid_shards(identities_source, load, num_shards, shard_index):
+    with pytest.raises(ValueError):
+        load(identities_source, num_shards=num_shards, shard_index=shard_index)
+
+
+def test_shards_cannot_be_sharded_by_scene(identities_source, load):
+    shard = load(identities_source, num_shards=2, shard_index=0)
+    with pytest.raises(ValueError):
+        shard.shard(2, 1)
+    with pytest.raises(ValueError):
+        load(identities_source).shard(2, 0, by="camera")
+
+
+def test_shards_are_not_refreshed(copy_source, load, source_builder):
+    source = copy_source("identities")
+    shard = load(source, num_shards=2, shard_index=1)
+    source_builder.add_identities_scene(source, 4)
+    assert shard.refresh() == []
@@ -0,0 +1,273 @@
+import cv2
+import numpy as np
+import pytest
+
+from datagen.imaging import auto
+from datagen.imaging.auto import (
+    IMAGING_LIBRARIES,
+    get_installed_imaging_libraries,
+    sample_image_files,
+    select_imaging_library,
+)
+from datagen.imaging.base import ImageBufferMismatchError, check_reduction, get_image_dtype, get_region_slices
+from datagen.imaging.opencv import OpenCVImagingLibrary
+
+HEIGHT, WIDTH = 24, 32
+
+INSTALLED_LIBRARIES = sorted(get_installed_imaging_libraries())
+
+
+@pytest.fixture(scope="module")
+def image_files(tmp_path_factory):
+    """
+    Images of every kind the SDK decodes: 8 & 16-bit PNGs, with & without alpha, and EXRs.
+    """
+    path = tmp_path_factory.mktemp("images")
+    rng = np.random.default_rng(0)
+    images = {
+        "rgb_8bit.png": (rng.random((HEIGHT, WIDTH, 3)) * 255).astype(np.uint8),
+        "rgb_16bit.png": (rng.random((HEIGHT, WIDTH, 3)) * 65535).astype(np.uint16),
+        "rgba_8bit.png": (rng.random((HEIGHT, WIDTH, 4)) * 255).astype(np.uint8),
+        "rgba_16bit.png": (rng.random((HEIGHT, WIDTH, 4)) * 65535).astype(np.uint16),
+        "rgb.exr": rng.random((HEIGHT, WIDTH, 3)).astype(np.float32),
+    }
+    files = {}
+    for file_name, image in images.items():
+        files[file_name] = str(path.joinpath(file_name))
+        cv2.imwrite(files[file_name], image)
+    return files
+
+
+def test_installed_imaging_libraries():
+    assert "opencv" in INSTALLED_LIBRARIES
+    assert set(INSTALLED_LIBRARIES) <= set(IMAGING_LIBRARIES)
+
+
+@pytest.mark.parametrize("library_name", INSTALLED_LIBRARIES)
+@pytest.mark.parametrize("keep_alpha", [False, True])
+@pytest.mark.parametrize("convert_to_uint8", [False, True])
+def test_imaging_libraries_decode_alike(image_files, library_name, keep_alpha, convert_to_uint8):
+    library, opencv = IMAGING_LIBRARIES[library_name](), OpenCVImagingLibrary()
+    for file_name, file_path in image_files.items():
+        if file_name.endswith(".exr") and convert_to_uint8:
+            continue
+        expected = opencv.read(file_path, keep_alpha=keep_alpha, convert_to_uint8=convert_to_uint8)
+        img = library.read(file_path, keep_alpha=keep_alpha, convert_to_uint8=convert_to_uint8)
+        assert img.dtype == expected.dtype, file_name
+        np.testing.assert_array_equal(img, expected, err_msg=file_name)
+
+
+def test_sample_image_files(identities_source):
+    files_paths = sample_image_files([identities_source], size=2)
+    assert [file_path.rsplit(".", 1)[-1] for file_path in files_paths] == ["png", "png", "exr", "exr"]
+    assert sample_image_files([identities_source.joinpath("missing")]) == []
+
+
+def test_select_imaging_library(image_files, monkeypatch):
+    assert select_imaging_library(image_files.values(), repeat=1) in INSTALLED_LIBRARIES
+    assert select_imaging_library([]) in INSTALLED_LIBRARIES
+    monkeypatch.setattr(auto, "get_installed_imaging_libraries", lambda: {"pillow": OpenCVImagingLibrary()})
+    assert select_imaging_library(image_files.values(), repeat=1) == "pillow"
+
+
+def test_select_imaging_library_excludes_failing_libraries(image_files, monkeypatch):
+    class FailingImagingLibrary(OpenCVImagingLibrary):
+        def _read_exr(self, *args, **kwargs):
+            raise RuntimeError("Cannot decode EXR files")
+
+    libraries = {"opencv": OpenCVImagingLibrary(), "openexr": FailingImagingLibrary()}
+    monkeypatch.setattr(auto, "get_installed_imaging_libraries", lambda: libraries)
+    assert select_imaging_library(image_files.values(), repeat=1) == "opencv"
+
+
+def test_dataset_auto_imaging_library(identities_source, load):
+    dataset = load(identities_source, imaging_library="auto")
+    expected = load(identities_source)[0].visible_spectrum
+    np.testing.assert_array_equal(dataset[0].visible_spectrum, expected)
+
+
+@pytest.mark.parametrize("library_name", INSTALLED_LIBRARIES)
+@pytest.mark.parametrize("keep_alpha", [False, True])
+def test_read_into(image_files, library_name, keep_alpha):
+    library = IMAGING_LIBRARIES[library_name]()
+    for file_name, file_path in image_files.items():
+        expected = library.read(file_path, keep_alpha=keep_alpha, convert_to_uint8=False)
+        out = np.empty_like(expected)
+        assert library.read_into(file_path, out, keep_alpha=keep_alpha) is out
+        np.testing.assert_array_equal(out, expected, err_msg=file_name)
+
+
+@pytest.mark.parametrize("library_name", INSTALLED_LIBRARIES)
+def test_read_into_mismatching_buffers(image_files, library_name):
+    library = IMAGING_LIBRARIES[library_name]()
+    for file_name, file_path in image_files.items():
+        expected = library.read(file_path, keep_alpha=False, convert_to_uint8=False)
+        for out in (np.empty(expected.shape, np.float64), np.empty((HEIGHT, WIDTH + 1, 3), expected.dtype)):
+            with pytest.raises(ImageBufferMismatchError):
+                library.read_into(file_path, out)
+        read_only = np.empty_like(expected)
+        read_only.flags.writeable = False
+        with pytest.raises(ImageBufferMismatchError):
+            library.read_into(file_path, read_only)
+
+
+@pytest.mark.parametrize("visual_cache_size", [0, 2 ** 20])
+def test_descriptors_read_into(identities_source, load, visual_cache_size):
+    dp = load(identities_source, visual_cache_size=visual_cache_size)[0]
+    for modality in ("visible_spectrum", "depth"):
+        expected = getattr(dp, modality)
+        out = np.empty_like(expected)
+        assert getattr(type(dp), modality).read_into(dp, out) is out
+        np.testing.assert_array_equal(out, expected)
+
+
+def _to_bgr(img):
+    return img[..., [2, 1, 0, 3][: img.shape[-1]]]
+
+
+@pytest.mark.parametrize("library_name", INSTALLED_LIBRARIES)
+@pytest.mark.parametrize("keep_alpha", [False, True])
+def test_bgr_channel_order(image_files, library_name, keep_alpha):
+    library = IMAGING_LIBRARIES[library_name]()
+    for file_name, file_path in image_files.items():
+        rgb_img = library.read(file_path, keep_alpha=keep_alpha, convert_to_uint8=False)
+        bgr_img = library.read(file_path, keep_alpha=keep_alpha, convert_to_uint8=False, channel_order="bgr")
+        np.testing.assert_array_equal(bgr_img, _to_bgr(rgb_img), err_msg=file_name)
+        out = np.empty_like(bgr_img)
+        library.read_into(file_path, out, keep_alpha=keep_alpha, channel_order="bgr")
+        np.testing.assert_array_equal(out, bgr_img, err_msg=file_name)
+
+
+def test_dataset_channel_order(identities_source, load):
+    dp, bgr_dp = load(identities_source)[0], load(identities_source, channel_order="bgr")[0]
+    assert type(bgr_dp).visible_spectrum.get_channel_order(bgr_dp) == "bgr"
+    for modality in ("visible_spectrum", "depth", "semantic_segmentation"):
+        np.testing.assert_array_equal(getattr(bgr_dp, modality), _to_bgr(getattr(dp, modality)))
+    label_map, segments = dp.semantic_label_map()
+    bgr_label_map, bgr_segments = bgr_dp.semantic_label_map()
+    assert label_map.any()
+    np.testing.assert_array_equal(bgr_label_map, label_map)
+    assert bgr_segments == segments
+    with pytest.raises(ValueError):
+        load(identities_source, channel_order="grb")
+
+
+@pytest.mark.parametrize(
+    "decoded_dtype, convert_to_uint8, dtype, expected",
+    [
+        (np.uint16, False, "native", np.uint16),
+        (np.uint16, True, "native", np.uint8),
+        (np.uint16, False, "uint8", np.uint8),
+        (np.uint8, False, "float16", np.float16),
+        (np.float32, False, "native", np.float32),
+        (np.float32, True, "float32", np.float32),
+        (np.float32, False, "float16", np.float16),
+    ],
+)
+def test_get_image_dtype(decoded_dtype, convert_to_uint8, dtype, expected):
+    assert get_image_dtype(np.dtype(decoded_dtype), convert_to_uint8, dtype) == np.dtype(expected)
+
+
+def test_get_image_dtype_errors():
+    with pytest.raises(ValueError):
+        get_image_dtype(np.dtype(np.float32), False, "uint8")
+    with pytest.raises(ValueError):
+        get_image_dtype(np.dtype(np.uint16), False, "int32")
+
+
+def _convert(img, dtype):
+    if dtype == "uint8":
+        return img if img.dtype == np.uint8 else img // 257
+    scale = 1 if img.dtype.kind == "f" else 1 / np.iinfo(img.dtype).max
+    return (img * np.float32(scale)).astype(np.float32).astype(dtype)
+
+
+@pytest.mark.parametrize("library_name", INSTALLED_LIBRARIES)
+@pytest.mark.parametrize("dtype", ["uint8", "float16", "float32"])
+def test_visual_dtypes(image_files, library_name, dtype):
+    library = IMAGING_LIBRARIES[library_name]()
+    for file_name, file_path in image_files.items():
+        native = library.read(file_path, keep_alpha=True, convert_to_uint8=False)
+        if file_name.endswith(".exr") and dtype == "uint8":
+            with pytest.raises(ValueError):
+                library.read(file_path, keep_alpha=True, convert_to_uint8=False, dtype=dtype)
+            continue
+        img = library.read(file_path, keep_alpha=True, convert_to_uint8=False, dtype=dtype)
+        assert img.dtype == np.dtype(dtype), file_name
+        np.testing.assert_allclose(img.astype(np.float64), _convert(native, dtype), rtol=1e-6, err_msg=file_name)
+        out = np.empty_like(img)
+        library.read_into(file_path, out, keep_alpha=True, dtype=dtype)
+        np.testing.assert_array_equal(out, img, err_msg=file_name)
+
+
+def test_dataset_visual_dtypes(identities_source, load):
+    dp = load(identities_source)[0]
+    float_dp = load(identities_source, visual_dtypes={"visible_spectrum": "float32", "depth": "float16"})[0]
+    assert float_dp.visible_spectrum.dtype == np.float32 and float_dp.visible_spectrum.max() <= 1
+    assert float_dp.depth.dtype == np.float16
+    assert float_dp.infrared_spectrum.dtype == dp.infrared_spectrum.dtype
+    # Normalized from the 16-bit PNG, rather than from its (default) uint8 conversion
+    np.testing.assert_allclose(float_dp.visible_spectrum, dp.visible_spectrum / 255, atol=1 / 255)
+    with pytest.raises(ValueError):
+        load(identities_source, visual_dtypes={"visible_spectrum": "int32"})
+
+
+def test_check_reduction():
+    for reduction in (1, 2, 4, 8):
+        check_reduction(reduction)
+    for reduction in (0, 3, 16):
+        with pytest.raises(ValueError):
+            check_reduction(reduction)
+
+
+def test_get_region_slices():
+    assert get_region_slices((24, 32, 3), (4, 2, 10, 6), 1) == (slice(2, 6), slice(4, 10))
+    # Partially covered pixels of scaled down images are included, and regions are clipped to the images.
+    assert get_region_slices((12, 16, 3), (3, 2, 10, 7), 2) == (slice(1, 4), slice(1, 5))
+    assert get_region_slices((24, 32), (-5, 20, 100, 100), 1) == (slice(20, 24), slice(0, 32))
+    for roi in ((4, 2, 4, 6), (10, 2, 4, 6), (40, 0, 50, 10)):
+        with pytest.raises(ValueError):
+            get_region_slices((24, 32, 3), roi, 1)
+
+
+@pytest.mark.parametrize("library_name", INSTALLED_LIBRARIES)
+@pytest.mark.parametrize("keep_alpha", [False, True])
+@pytest.mark.parametrize("reduction", [1, 2, 4])
+def test_reduction_and_roi(image_files, library_name, keep_alpha, reduction):
+    library, opencv = IMAGING_LIBRARIES[library_name](), OpenCVImagingLibrary()
+    roi = (5, 3, 27, 17)
+    for file_name, file_path in image_files.items():
+        reduced = library.read(file_path, keep_alpha=keep_alpha, convert_to_uint8=False, reduction=reduction)
+        assert reduced.shape[:2] == (HEIGHT // reduction, WIDTH // reduction), file_name
+        expected = opencv.read(file_path, keep_alpha=keep_alpha, convert_to_uint8=False, reduction=reduction)
+        np.testing.assert_array_equal(reduced, expected, err_msg=file_name)
+        crop = library.read(file_path, keep_alpha=keep_alpha, convert_to_uint8=False, reduction=reduction, roi=roi)
+        np.testing.assert_array_equal(crop, reduced[get_region_slices(reduced.shape, roi, reduction)], file_name)
+        out = np.empty_like(crop)
+        library.read_into(file_path, out, keep_alpha=keep_alpha, reduction=reduction, roi=roi)
+        np.testing.assert_array_equal(out, crop, err_msg=file_name)
+
+
+def test_reduced_images_are_scaled_alike(image_files):
+    # With or without alpha, as OpenCV's IMREAD_REDUCED_* flags scale them
+    opencv = OpenCVImagingLibrary()
+    for file_name in ("rgba_8bit.png", "rgba_16bit.png"):
+        img = opencv.read(image_files[file_name], keep_alpha=False, convert_to_uint8=False, reduction=2)
+        with_alpha = opencv.read(image_files[file_name], keep_alpha=True, convert_to_uint8=False, reduction=2)
+        np.testing.assert_array_equal(with_alpha[..., :3], img, err_msg=file_name)
+
+
+def test_dataset_reduction_and_roi(identities_source, load):
+    dp = load(identities_source)[0]
+    reduced_dp = load(identities_source, visual_reductions={"visible_spectrum": 2}, visual_cache_size=2 ** 20)[0]
+    full = dp.visible_spectrum
+    assert reduced_dp.visible_spectrum.shape[:2] == (full.shape[0] // 2, full.shape[1] // 2)
+    assert reduced_dp.depth.shape == dp.depth.shape
+    roi = (4, 2, 20, 10)
+    np.testing.assert_array_equal(type(dp).visible_spectrum.read(dp, roi=roi), full[2:10, 4:20])
+    np.testing.assert_array_equal(type(reduced_dp).visible_spectrum.read(reduced_dp, reduction=1), full)
+    box = dp.face_bounding_box
+    face_crop = dp.face_crop("depth")
+    np.testing.assert_array_equal(face_crop, dp.depth[box.min_y : box.max_y + 1, box.min_x : box.max_x + 1])
+    with pytest.raises(ValueError):
+        load(identities_source, visual_reductions={"visible_spectrum": 3})
@@ -0,0 +1,56 @@
+import json
+import math
+
+import pytest
+
+from datagen.dev import json_backends
+from datagen.dev.json_backends import UnknownJsonBackendError
+
+
+@pytest.fixture(autouse=True)
+def reset_json_backend(monkeypatch):
+    monkeypatch.setattr(json_backends, "_loads", None)
+
+
+def test_set_json_backend():
+    json_backends.set_json_backend("json")
+    assert json_backends._loads is json.loads
+    assert json_backends.loads('{"a": [1, 2.5]}') == {"a": [1, 2.5]}
+
+
+def test_auto_json_backend_is_the_first_installed_one(monkeypatch):
+    installed_backends = {"simdjson": object(), "json": json.loads}
+    monkeypatch.setattr(json_backends, "get_installed_backends", lambda: installed_backends)
+    json_backends.set_json_backend()
+    assert json_backends._loads is installed_backends["simdjson"]
+
+
+def test_unknown_json_backends(monkeypatch):
+    with pytest.raises(UnknownJsonBackendError):
+        json_backends.set_json_backend("ujson")
+    monkeypatch.setattr(json_backends, "get_installed_backends", lambda: {"json": json.loads})
+    with pytest.raises(UnknownJsonBackendError):
+        json_backends.set_json_backend("orjson")
+
+
+def test_json_backend_setting(monkeypatch):
+    monkeypatch.setattr(json_backends, "settings", {"json_backend": "json"})
+    assert json_backends.loads("[1]") == [1]
+    assert json_backends._loads is json.loads
+
+
+def test_fast_backends_fall_back_to_the_standard_library():
+    pytest.importorskip("orjson")
+    json_backends.set_json_backend("orjson")
+    assert math.isnan(json_backends.loads('{"a": NaN}')["a"])
+    assert json_backends.loads(str(2 ** 70)) == 2 ** 70
+    with pytest.raises(ValueError):
+        json_backends.loads("{")
+
+
+def test_load_file(tmp_path):
+    path = tmp_path.joinpath("modality.json")
+    path.write_text(json.dumps({"x": 1.5, "name": "nose"}))
+    for backend in json_backends.get_installed_backends():
+        json_backends.set_json_backend(backend)
+        assert json_backends.load_file(path) == {"x": 1.5, "name": "nose"}
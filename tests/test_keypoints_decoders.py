@@ -0,0 +1,119 @@
+import copy
+import json
+
+import numpy as np
+import pytest
+
+from datagen.modalities.textual.common.flatten import flatten
+from datagen.modalities.textual.common.keypoints import (
+    UnsupportedKeypointsError,
+    benchmark_decoder,
+    decode_coords,
+    decode_coords_matrices,
+)
+from datagen.modalities.textual.common.schemas import get_schema
+from datagen.modalities.textual.hic import keypoints as hic_keypoints
+from datagen.modalities.textual.identities.keypoints import v1, v2
+
+
+def _to_integers(value):
+    if isinstance(value, float):
+        return int(value * 100)
+    if isinstance(value, dict):
+        return {key: _to_integers(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_integers(item) for item in value]
+    return value
+
+
+def _assert_decoded_as_the_schema(keypoints_cls, decode, keypoints_dict):
+    decoded = decode(copy.deepcopy(keypoints_dict))
+    loaded = get_schema(keypoints_cls)().load(copy.deepcopy(keypoints_dict))
+    assert type(decoded) is type(loaded)
+    decoded_leaves, loaded_leaves = flatten(decoded), flatten(loaded)
+    assert [path for path, _ in decoded_leaves] == [path for path, _ in loaded_leaves]
+    for (path, decoded_leaf), (_, loaded_leaf) in zip(decoded_leaves, loaded_leaves):
+        assert decoded_leaf.dtype == loaded_leaf.dtype, path
+        np.testing.assert_array_equal(decoded_leaf, loaded_leaf)
+
+
+def _read_keypoints(path):
+    keypoints_dict = json.loads(path.read_text())
+    keypoints_dict.pop("version", None)
+    return keypoints_dict
+
+
+@pytest.mark.parametrize("integers", [False, True], ids=["floats", "integers"])
+def test_v2_decoder_matches_the_schema(identities_source, integers):
+    paths = list(identities_source.glob("*/*/key_points/all_key_points.json"))
+    assert paths
+    for path in paths:
+        keypoints_dict = _read_keypoints(path)
+        keypoints_dict = _to_integers(keypoints_dict) if integers else keypoints_dict
+        _assert_decoded_as_the_schema(v2.SceneKeypoints, v2.decode, keypoints_dict)
+
+
+@pytest.mark.parametrize("integers", [False, True], ids=["floats", "integers"])
+def test_hic_decoder_matches_the_schema(hic_source, integers):
+    paths = list(hic_source.glob("*/frames/*/*/key_points/all_key_points.json"))
+    assert paths
+    for path in paths:
+        keypoints_dict = _read_keypoints(path)
+        keypoints_dict = _to_integers(keypoints_dict) if integers else keypoints_dict
+        _assert_decoded_as_the_schema(hic_keypoints.Keypoints, hic_keypoints.decode, keypoints_dict)
+
+
+@pytest.mark.parametrize("integers", [False, True], ids=["floats", "integers"])
+def test_v1_decoder_matches_the_schema(identities_v1_source, integers):
+    cameras_paths = list(identities_v1_source.glob("*/camera_*"))
+    assert cameras_paths
+    for camera_path in cameras_paths:
+        keypoints_dict = {
+            segment: json.loads(camera_path.joinpath(f"{segment}_keypoints.json").read_text())
+            for segment in ("standard", "dense")
+        }
+        keypoints_dict = _to_integers(keypoints_dict) if integers else keypoints_dict
+        _assert_decoded_as_the_schema(v1.SceneKeypoints, v1.decode, keypoints_dict)
+
+
+def test_coords_dtypes_are_inferred():
+    keypoints = [{"pixel_2d": {"x": 1, "y": 2}, "global_3d": {"x": 1, "y": 2.5, "z": 3}}]
+    coords_2d, coords_3d = decode_coords_matrices(keypoints)
+    assert coords_2d.dtype == np.int64 and coords_3d.dtype == np.float64
+    assert coords_2d.shape == (1, 2) and coords_3d.shape == (1, 3)
+    assert decode_coords({"x": 1, "y": 2}).dtype == coords_2d.dtype
+
+
+@pytest.mark.parametrize(
+    "keypoints",
+    [
+        [{"pixel_2d": {"x": 1, "y": None}, "global_3d": {"x": 1, "y": 2, "z": 3}}],
+        [{"pixel_2d": {"x": 1}, "global_3d": {"x": 1, "y": 2, "z": 3}}],
+        [{"global_3d": {"x": 1, "y": 2, "z": 3}}],
+    ],
+)
+def test_unsupported_coords_are_left_to_the_schemas(keypoints):
+    with pytest.raises(UnsupportedKeypointsError):
+        decode_coords_matrices(keypoints)
+
+
+def test_unsupported_segments_are_left_to_the_schemas():
+    with pytest.raises(UnsupportedKeypointsError):
+        v2.decode({"face": {"standard": {"0": {"pixel_2d": {"x": 1, "y": 2}}}, "coords_2d": []}})
+    with pytest.raises(UnsupportedKeypointsError):
+        hic_keypoints.decode({"actor-1": []})
+    with pytest.raises(UnsupportedKeypointsError):
+        v1.decode({"standard": {}})
+
+
+def test_dataset_keypoints_are_decoded(identities_source, load):
+    dataset = load(identities_source)
+    keypoints = dataset[0].keypoints
+    assert keypoints.face.dense.coords_2d.shape == (100, 2)
+    assert keypoints["face/nose_tip"].coords_3d.tolist() == [1, 2, 3]
+
+
+def test_benchmark_decoder(hic_source):
+    paths = list(hic_source.glob("*/frames/*/*/key_points/all_key_points.json"))[:2]
+    timings = benchmark_decoder(hic_keypoints.Keypoints, hic_keypoints.decode, paths, repeat=1)
+    assert set(timings) == {"marshmallow", "decoder"}
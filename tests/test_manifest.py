@@ -0,0 +1,82 @@
+import shutil
+import sqlite3
+
+import pytest
+
+from datagen.components.manifest import SourceManifest
+from datagen.components.scanner import SourceScanner
+
+
+@pytest.fixture
+def manifest_of(tmp_path):
+    def manifest_of_(source_path) -> SourceManifest:
+        return SourceManifest(source_path=source_path, cache_dir=str(tmp_path.joinpath("cache")))
+
+    return manifest_of_
+
+
+def _records(dataset):
+    return [(str(dp.scene_path), dp.camera, dp.frame_num, dp.visible_spectrum_image_name) for dp in dataset]
+
+
+@pytest.mark.parametrize("source_name", ["identities", "hic"])
+def test_manifest_lists_the_scanned_scenes(copy_source, load, manifest_of, source_name):
+    source = copy_source(source_name)
+    dataset = load(source)
+    entries = manifest_of(source).entries
+    assert sorted(entries) == sorted(path_.name for path_ in source.iterdir())
+    assert sum(len(entry.records) for entry in entries.values()) == len(dataset)
+    assert all(entry.is_hic == (source_name == "hic") for entry in entries.values())
+
+
+def test_reloading_reads_the_manifest_instead_of_scanning(copy_source, load, monkeypatch):
+    source = copy_source("identities")
+    expected_records = _records(load(source))
+
+    scanned_scenes = []
+    scan = SourceScanner.scan
+
+    def spy_scan(self, scenes_paths):
+        scenes_paths = list(scenes_paths)
+        scanned_scenes.extend(scenes_paths)
+        return scan(self, scenes_paths)
+
+    monkeypatch.setattr(SourceScanner, "scan", spy_scan)
+    assert _records(load(source)) == expected_records
+    assert scanned_scenes == []
+
+
+def test_modified_scenes_are_rescanned(copy_source, load, source_builder):
+    source = copy_source("identities")
+    num_datapoints = len(load(source))
+    source_builder.add_identities_camera(source.joinpath("datapoint_00002"), "camera_3")
+    dataset = load(source)
+    assert len(dataset) == num_datapoints + 1
+    assert "camera_3" in {dp.camera for dp in dataset}
+
+
+def test_removed_scenes_are_dropped_from_the_manifest(copy_source, load, manifest_of):
+    source = copy_source("identities")
+    load(source)
+    shutil.rmtree(source.joinpath("datapoint_00003"))
+    dataset = load(source)
+    assert "datapoint_00003" not in manifest_of(source).entries
+    assert all(dp.scene_path.name != "datapoint_00003" for dp in dataset)
+
+
+def test_manifests_of_other_schema_versions_are_ignored(copy_source, load, manifest_of):
+    source = copy_source("identities")
+    expected_records = _records(load(source))
+    manifest = manifest_of(source)
+    with sqlite3.connect(str(manifest.path)) as connection:
+        connection.execute("UPDATE meta SET value = 'outdated' WHERE key = 'schema_version'")
+    assert manifest_of(source).entries == {}
+    assert _records(load(source)) == expected_records
+    assert manifest_of(source).entries
+
+
+def test_manifest_is_optional(identities_source, load, tmp_path):
+    cache_dir = tmp_path.joinpath("no_manifest_cache")
+    dataset = load(identities_source, use_manifest=False, cache_dir=str(cache_dir))
+    assert len(dataset) > 0
+    assert not cache_dir.exists()
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from datagen.components.prefetch import Prefetcher
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_dataset_iter(identities_source, load, prefetch):
+    dataset = load(identities_source)
+    loaded = list(dataset.iter(prefetch=prefetch, modalities=("visible_spectrum", "keypoints"), workers=2))
+    assert [dp for dp, _ in loaded] == list(dataset)
+    for dp, modalities in loaded:
+        np.testing.assert_array_equal(modalities["visible_spectrum"], dp.visible_spectrum)
+        np.testing.assert_array_equal(modalities["keypoints"].face.dense.coords_2d, dp.keypoints.face.dense.coords_2d)
+
+
+def test_view_iter(identities_source, load):
+    view = load(identities_source).filter(camera="camera_2")
+    assert [dp for dp, _ in view.iter(prefetch=2, modalities=())] == list(view)
+
+
+def test_prefetch_is_bounded():
+    consumed = []
+
+    def datapoints():
+        for idx in range(10):
+            consumed.append(idx)
+            yield SimpleNamespace(idx=idx)
+
+    loaded = Prefetcher(prefetch=3, workers=2).iter(datapoints(), modalities=("idx",))
+    assert next(loaded)[1] == {"idx": 0}
+    # The read ahead datapoints and the one replacing the yielded datapoint
+    assert len(consumed) == 4
+    loaded.close()
+    assert len(consumed) == 4
+
+
+def test_prefetch_errors_are_raised_in_order():
+    class Failing:
+        @property
+        def value(self):
+            raise RuntimeError("Cannot read")
+
+    loaded = Prefetcher(prefetch=2).iter([SimpleNamespace(value=1), Failing()], modalities=("value",))
+    assert next(loaded)[1] == {"value": 1}
+    with pytest.raises(RuntimeError):
+        next(loaded)
+
+
+def test_invalid_prefetch():
+    with pytest.raises(ValueError):
+        Prefetcher(prefetch=-1)
+    with pytest.raises(ValueError):
+        Prefetcher(workers=0)
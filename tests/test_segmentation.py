@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from datagen.modalities.textual.base.segmentation import UNLABELED_CLASS_ID, SegmentationLabels
+
+# The fixtures' segmentation image - head on top, body on the bottom left & background on the bottom right
+HEAD, BODY, BACKGROUND = (0, 0), (-1, 0), (-1, -1)
+
+
+def test_semantic_label_map(identities_source, load):
+    dp = load(identities_source)[0]
+    label_map, segments = dp.semantic_label_map()
+    assert segments == {1: "human/head", 2: "human/body", 3: "background"}
+    assert label_map.dtype == np.uint16 and label_map.shape == dp.semantic_segmentation.shape[:2]
+    assert [label_map[pixel] for pixel in (HEAD, BODY, BACKGROUND)] == [1, 2, 3]
+
+
+def test_semantic_label_map_of_given_segments(identities_source, load):
+    dp = load(identities_source)[0]
+    label_map, segments = dp.semantic_label_map(["background", "human/head"])
+    assert segments == {1: "background", 2: "human/head"}
+    assert [label_map[pixel] for pixel in (HEAD, BODY, BACKGROUND)] == [2, UNLABELED_CLASS_ID, 1]
+    with pytest.raises(ValueError):
+        dp.semantic_label_map(["human"])
+
+
+@pytest.mark.parametrize("dtype", ["float16", "float32"])
+def test_semantic_label_map_of_visual_dtypes(identities_source, load, dtype):
+    expected = load(identities_source)[0].semantic_label_map()
+    dp = load(identities_source, visual_dtypes={"semantic_segmentation": dtype})[0]
+    label_map, segments = dp.semantic_label_map()
+    np.testing.assert_array_equal(label_map, expected[0])
+    assert segments == expected[1]
+
+
+def test_segmentation_labels():
+    labels = SegmentationLabels.create({"a": np.array([1, 2, 3]), "b": np.array([255, 0, 0]), "c": np.array([1, 2, 3])})
+    img = np.array([[[1, 2, 3], [255, 0, 0], [9, 9, 9]]], dtype=np.uint8)
+    # Segments sharing a color are labeled as the first of them
+    np.testing.assert_array_equal(labels.apply(img), [[1, 2, UNLABELED_CLASS_ID]])
+    np.testing.assert_array_equal(labels.apply(img[..., ::-1], channel_order="bgr"), [[1, 2, UNLABELED_CLASS_ID]])
+    np.testing.assert_array_equal(labels.apply(img.astype(np.uint16) * 257), [[1, 2, UNLABELED_CLASS_ID]])
@@ -0,0 +1,148 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from datagen.modalities.sidecar import SidecarCache, SidecarEncodingError, decode, encode
+from datagen.modalities.textual.common.flatten import flatten
+
+TEXTUAL_MODALITIES = ("keypoints", "camera_metadata", "actor_metadata", "lights_metadata")
+
+
+class Unsupported:
+    pass
+
+
+def _assert_equal_modalities(modality, other):
+    assert type(modality) is type(other)
+    leaves, other_leaves = flatten(modality), flatten(other)
+    assert [path for path, _ in leaves] == [path for path, _ in other_leaves]
+    for (_, leaf), (_, other_leaf) in zip(leaves, other_leaves):
+        assert leaf.dtype == other_leaf.dtype
+        np.testing.assert_array_equal(leaf, other_leaf)
+
+
+@pytest.mark.parametrize("source_name", ["identities", "identities_v1", "hic"])
+def test_encode_decode_round_trip(sources_dir, load, source_name):
+    dp = load(sources_dir.joinpath(source_name))[0]
+    for modality_name in TEXTUAL_MODALITIES:
+        modality = getattr(dp, modality_name)
+        arrays = {}
+        structure = json.loads(json.dumps(encode(modality, arrays)))
+        _assert_equal_modalities(decode(structure, arrays), modality)
+
+
+def test_decoded_named_segments_are_indexed(identities_source, load):
+    keypoints = load(identities_source)[0].keypoints
+    arrays = {}
+    decoded = decode(encode(keypoints, arrays), arrays)
+    np.testing.assert_array_equal(decoded["face/dense"].coords_2d, keypoints.face.dense.coords_2d)
+
+
+def test_encode_refuses_unsupported_values():
+    with pytest.raises(SidecarEncodingError):
+        encode(Unsupported(), {})
+    with pytest.raises(SidecarEncodingError):
+        encode({"a": np.array([object()])}, {})
+
+
+def test_decode_only_rebuilds_the_sdks_classes():
+    for class_name in ("os:system", "subprocess:Popen", "datagen_evil:Payload"):
+        with pytest.raises(SidecarEncodingError):
+            decode({"object": class_name, "fields": {}}, {})
+    with pytest.raises(SidecarEncodingError):
+        decode({"dataclass": "datagen.modalities.sidecar:SidecarCache", "fields": {}}, {})
+
+
+@pytest.fixture
+def modality_file(tmp_path):
+    path = tmp_path.joinpath("modality.json")
+    path.write_text(json.dumps({"coords": [1, 2]}))
+    return path
+
+
+def _create_counter():
+    calls = []
+
+    def create():
+        calls.append(None)
+        return {"coords": np.array([1, 2]), "name": "nose", "visible": True}
+
+    return calls, create
+
+
+def test_sidecar_cache_reuses_sidecars(tmp_path, modality_file):
+    calls, create = _create_counter()
+    first = SidecarCache(str(tmp_path)).get_or_create("factory", [str(modality_file)], create)
+    second = SidecarCache(str(tmp_path)).get_or_create("factory", [str(modality_file)], create)
+    assert len(calls) == 1
+    assert second["name"] == "nose" and second["visible"] is True
+    np.testing.assert_array_equal(second["coords"], first["coords"])
+
+
+def test_sidecar_cache_parses_modified_files_again(tmp_path, modality_file):
+    calls, create = _create_counter()
+    cache = SidecarCache(str(tmp_path))
+    cache.get_or_create("factory", [str(modality_file)], create)
+    modality_file.write_text(json.dumps({"coords": [1, 2, 3]}))
+    stat = modality_file.stat()
+    os.utime(modality_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    cache.get_or_create("factory", [str(modality_file)], create)
+    # Keyed by the modality factory as well
+    cache.get_or_create("other_factory", [str(modality_file)], create)
+    assert len(calls) == 3
+
+
+def test_sidecar_cache_ignores_unreadable_sidecars(tmp_path, modality_file):
+    calls, create = _create_counter()
+    cache = SidecarCache(str(tmp_path))
+    cache.get_or_create("factory", [str(modality_file)], create)
+    for sidecar_path in cache.path.rglob("*.npz"):
+        sidecar_path.write_bytes(b"corrupted")
+    assert cache.get_or_create("factory", [str(modality_file)], create)["name"] == "nose"
+    assert len(calls) == 2
+
+
+def test_sidecar_cache_skips_unsupported_modalities(tmp_path, modality_file):
+    cache = SidecarCache(str(tmp_path))
+    for _ in range(2):
+        assert isinstance(cache.get_or_create("factory", [str(modality_file)], Unsupported), Unsupported)
+    assert not list(cache.path.rglob("*.npz"))
+
+
+def test_sidecar_cache_of_missing_files(tmp_path):
+    calls, create = _create_counter()
+    SidecarCache(str(tmp_path)).get_or_create("factory", [str(tmp_path.joinpath("missing.json"))], create)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("source_name", ["identities", "identities_v1", "hic"])
+def test_dataset_sidecars(sources_dir, load, tmp_path, source_name):
+    source = sources_dir.joinpath(source_name)
+    parsed = load(source, use_sidecars=True)[0]
+    expected = {modality_name: getattr(parsed, modality_name) for modality_name in TEXTUAL_MODALITIES}
+    assert list(tmp_path.joinpath("cache", "modalities").rglob("*.npz"))
+    dp = load(source, use_sidecars=True)[0]
+    for modality_name, modality in expected.items():
+        _assert_equal_modalities(getattr(dp, modality_name), modality)
+
+
+def _has_value(modality, value):
+    return any(np.any(leaf == value) for _, leaf in flatten(modality))
+
+
+def test_v1_keypoints_sidecars_are_invalidated_by_their_dense_files(copy_source, load):
+    source = copy_source("identities_v1")
+    dense_path = next(source.glob("*/camera_*/dense_keypoints.json"))
+
+    def read_keypoints():
+        return next(dp for dp in load(source, use_sidecars=True) if dp.camera_path == dense_path.parent).keypoints
+
+    assert not _has_value(read_keypoints(), 7)
+    dense = json.loads(dense_path.read_text())
+    dense["keypoints_2d_coordinates"][0] = [7.0, 7.0]
+    dense_path.write_text(json.dumps(dense))
+    stat = dense_path.stat()
+    os.utime(dense_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert _has_value(read_keypoints(), 7)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from datagen.modalities.cache import LRUCache, estimate_size
+
+
+def test_lru_cache_only_sizes_values_when_bounded_by_size():
+    def sizeof(value):
+        raise AssertionError("Sized a value of a cache without a size limit")
+
+    cache = LRUCache(max_entries=10, sizeof=sizeof)
+    cache.get_or_create("a", lambda: "x")
+    assert cache.stats.size == 0
+
+
+def test_estimate_size_accounts_for_arrays_and_references():
+    array = np.zeros(1000)
+    assert estimate_size(array) >= array.nbytes
+    assert estimate_size({"a": [array, array[:10]]}) >= array.nbytes + array[:10].nbytes
+    # Shared objects are accounted for once.
+    assert estimate_size([array, array]) < 2 * array.nbytes
+
+
+def test_dataset_textual_cache_is_unbounded_by_default(identities_source, load):
+    dataset = load(identities_source)
+    keypoints = dataset[0].keypoints
+    assert dataset[0].keypoints is keypoints
+    stats = dataset.get_cache_stats()
+    assert "visual" not in stats
+    assert stats["textual"].max_size is None and stats["textual"].max_entries is None
+
+
+def test_dataset_textual_cache_limits(identities_source, load):
+    dataset = load(identities_source, textual_cache_size=2 ** 20, textual_cache_entries=3)
+    for dp in dataset:
+        dp.keypoints
+    stats = dataset.get_cache_stats()["textual"]
+    assert stats.entries <= 3 and 0 < stats.size <= 2 ** 20
+    assert "textual" not in load(identities_source, textual_cache_size=0).get_cache_stats()